@@ -3,7 +3,24 @@ from PyInstaller.utils.hooks import collect_all
 
 datas = [('config', 'config'), ('data', 'data'), ('app\\config', 'app\\config')]
 binaries = []
-hiddenimports = []
+# 画面は app_shell.SCREEN_REGISTRY から importlib で遅延 import するので明示する
+hiddenimports = [
+    'app.gui.screens.home_screen',
+    'app.gui.screens.face_clock_screen',
+    'app.gui.screens.shift_submit_screen',
+    'app.gui.screens.my_attendance_screen',
+    'app.gui.screens.shift_view_screen',
+    'app.gui.screens.admin_login_screen',
+    'app.gui.screens.attendance_list_screen',
+    'app.gui.screens.face_data_screen',
+    'app.gui.screens.employee_register_screen',
+    'app.gui.screens.camera_settings_screen',
+    'app.gui.screens.multi_camera_screen',
+    'app.gui.screens.admin_account_register_screen',
+    'app.gui.screens.shift_editor_screen',
+    'app.gui.screens.shift_weekly_review_screen',
+    'app.gui.screens.employee_su_overview_screen',
+]
 tmp_ret = collect_all('cv2')
 datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
 tmp_ret = collect_all('tkcalendar')
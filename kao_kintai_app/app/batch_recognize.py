@@ -0,0 +1,208 @@
+# app/batch_recognize.py
+"""
+録画・静止画の一括顔認識（入口の録画と打刻記録の突き合わせ用）。
+打刻画面と同じ顔データ・しきい値で 1 フレームずつ照合し、CSV に書き出す。
+フレームはチャンクに分けてプロセスプールで並列処理する（コア数に応じて速くなる）。
+
+  python -m app.batch_recognize data/footage/entrance.mp4 -o result.csv --step 5
+  python app/batch_recognize.py data/footage/frames -o result.csv --workers 4
+
+CSV: frame, code, best, second, decision
+  decision = match / unknown / low_quality / no_face / error
+  frame    = 動画ならフレーム番号、フォルダならファイル名
+"""
+import argparse
+import csv
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# --- 直実行でも -m 実行でもインポートが通るようにパス調整 ---
+if __package__ is None or __package__ == "":
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import cv2
+
+from app.infra.camera.file_source import IMAGE_EXTS
+from app.services import face_features
+from app.services.config_service import ConfigService
+from app.services.face_gallery_service import FaceGalleryService
+from app.services.face_detector import create_detector
+from app.services.face_matcher import create_matcher
+from app.services.recognition_pipeline import RecognitionPipeline
+
+CSV_HEADER = ["frame", "code", "best", "second", "decision"]
+
+# ワーカープロセスごとに 1 回だけ作る（ギャラリーは initializer で受け取る）
+_pipeline: RecognitionPipeline | None = None
+
+
+def _init_worker(vcfg: dict, gallery: tuple) -> None:
+    global _pipeline
+    # 並列はプロセスで取るので、各プロセス内の OpenCV スレッドは 1 本にする
+    cv2.setNumThreads(1)
+    matcher = create_matcher(vcfg)
+    matcher.set_gallery(*gallery)  # matcher.export() の戻り値
+    _pipeline = RecognitionPipeline(matcher, {**vcfg, "motion_gate": False}, span_prefix="batch")
+
+
+def recognize_frame(pipeline: RecognitionPipeline, frame_bgr) -> tuple:
+    """1 枚 → (code, best, second, decision)。連続フレームの確定判定は行わない。"""
+    if frame_bgr is None:
+        return "", 0, 0, "error"
+    gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+    try:
+        rect, msgs = pipeline.analyze(gray, frame_bgr)
+    except cv2.error:
+        return "", 0, 0, "error"
+    if rect is None:
+        return "", 0, 0, "no_face"
+
+    x, y, w, h = rect
+    roi = frame_bgr if pipeline.matcher.wants_color else gray
+    code, best, second = pipeline.matcher.recognize(roi[y: y + h, x: x + w])
+    if msgs:
+        decision = "low_quality"
+    elif pipeline.matcher.is_unknown(code, best, second):
+        decision = "unknown"
+    else:
+        decision = "match"
+    return code or "", best, second, decision
+
+
+def _image_job(paths: list) -> list:
+    return [(Path(p).name, *recognize_frame(_pipeline, cv2.imread(p))) for p in paths]
+
+
+def _video_job(job: tuple) -> list:
+    path, start, end, step = job
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    rows = []
+    try:
+        for idx in range(start, end):
+            # 間引くフレームはデコードしない（grab だけ進める）
+            if (idx - start) % step:
+                if not cap.grab():
+                    break
+                continue
+            ok, frame = cap.read()
+            if not ok:
+                break
+            rows.append((idx, *recognize_frame(_pipeline, frame)))
+    finally:
+        cap.release()
+    return rows
+
+
+def _plan_jobs(source: Path, chunk: int, step: int):
+    """(ジョブ関数, ジョブのリスト, 総フレーム数) を返す。"""
+    if source.is_dir():
+        files = sorted(str(p) for p in source.iterdir() if p.suffix.lower() in IMAGE_EXTS)
+        files = files[::step]
+        jobs = [files[i: i + chunk] for i in range(0, len(files), chunk)]
+        return _image_job, jobs, len(files)
+
+    cap = cv2.VideoCapture(str(source))
+    if not cap.isOpened():
+        raise SystemExit(f"動画を開けませんでした: {source}")
+    n = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    cap.release()
+    if n <= 0:
+        raise SystemExit(f"フレーム数を取得できませんでした: {source}")
+    span = chunk * step
+    jobs = [(str(source), s, min(s + span, n), step) for s in range(0, n, span)]
+    return _video_job, jobs, (n + step - 1) // step
+
+
+def run(source: str, out_csv: str, workers: int | None = None, chunk: int = 32, step: int = 1,
+        progress=None) -> dict:
+    cfg = ConfigService()
+    vcfg = cfg.get_vision()
+
+    # ワーカーを起こす前に、検出器・照合のモデルが読めるかだけ確かめる
+    detector = create_detector(vcfg)
+    if detector.empty():
+        raise SystemExit(f"顔検出器を読み込めませんでした（{detector.error}）")
+
+    # 顔データは親で 1 回だけ組み立て（キャッシュ利用・重複除去済み）、各ワーカーへ配る
+    t0 = time.perf_counter()
+    matcher = create_matcher(vcfg)
+    if matcher.empty():
+        raise SystemExit(f"照合モデルを読み込めませんでした（{matcher.error}）")
+    matcher.load(FaceGalleryService(), int(vcfg.get("top_k_images", 5)))
+    gallery = matcher.export()
+    gallery_s = time.perf_counter() - t0
+
+    job_fn, jobs, total = _plan_jobs(Path(source), max(1, chunk), max(1, step))
+    workers = workers or face_features.default_workers()
+
+    counts: dict[str, int] = {}
+    done = 0
+    t1 = time.perf_counter()
+    with open(out_csv, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        if workers <= 1:
+            _init_worker(vcfg, gallery)
+            results = map(job_fn, jobs)
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(vcfg, gallery),
+            )
+            results = pool.map(job_fn, jobs)
+        try:
+            # map は投入順に結果を返すので CSV はフレーム順になる
+            for rows in results:
+                writer.writerows(rows)
+                for r in rows:
+                    counts[r[4]] = counts.get(r[4], 0) + 1
+                done += len(rows)
+                if progress:
+                    progress(done, total)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+    elapsed = time.perf_counter() - t1
+
+    return {
+        "frames": done,
+        "workers": workers,
+        "gallery_s": round(gallery_s, 2),
+        "elapsed_s": round(elapsed, 2),
+        "fps": round(done / elapsed, 1) if elapsed > 0 else 0.0,
+        "decisions": counts,
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="録画・静止画の一括顔認識（CSV 出力）")
+    ap.add_argument("source", help="動画ファイル または 画像フォルダ")
+    ap.add_argument("-o", "--out", default="recognition.csv", help="出力 CSV（既定: recognition.csv）")
+    ap.add_argument("--workers", type=int, default=0, help="並列プロセス数（既定: CPU数-1）")
+    ap.add_argument("--chunk", type=int, default=32, help="1 ジョブあたりのフレーム数")
+    ap.add_argument("--step", type=int, default=1, help="N フレームごとに 1 枚だけ処理する")
+    args = ap.parse_args(argv)
+
+    def on_progress(done, total):
+        print(f"\r{done}/{total}", end="", file=sys.stderr, flush=True)
+
+    r = run(args.source, args.out, workers=args.workers or None, chunk=args.chunk,
+            step=args.step, progress=on_progress)
+    print(file=sys.stderr)
+    print(f"{r['frames']} フレーム / {r['elapsed_s']} 秒（{r['fps']} fps, {r['workers']} プロセス）"
+          f"  顔データ読込 {r['gallery_s']} 秒")
+    print("  ".join(f"{k}={v}" for k, v in sorted(r["decisions"].items())))
+    print(f"→ {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    # exe化後にプロセスプールを使うため
+    multiprocessing.freeze_support()
+    sys.exit(main())
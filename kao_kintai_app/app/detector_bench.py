@@ -0,0 +1,130 @@
+# app/detector_bench.py
+"""
+顔検出器の比較ベンチマーク（画面なし）。録画クリップ・連番画像フォルダを各検出器に流して
+1 フレームあたりの検出時間と検出率を出す。照明の違う現場ごとに、使える中でいちばん速い
+検出器（vision.detector）を選ぶための材料。
+
+  python -m app.detector_bench data/bench/entrance.mp4 data/bench/night --detectors haar,yunet
+  python app/detector_bench.py data/bench/clip.mp4 --frames 300 --json det.json
+
+正解ラベル（任意）: 動画なら <動画>.labels.csv、フォルダなら <フォルダ>/labels.csv
+  frame,has_face     … frame は 0 始まりの通し番号、has_face は 0/1
+ラベルがあれば再現率（顔のあるフレームで見つけた割合）と誤検出（顔の無いフレームで見つけた数）、
+無ければ「顔を見つけたフレームの割合」だけを出す（人が映り続けるクリップならこれが再現率）。
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+# --- 直実行でも -m 実行でもインポートが通るようにパス調整 ---
+if __package__ is None or __package__ == "":
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import cv2
+
+from app.infra.camera.capture import open_source
+from app.services.config_service import ConfigService
+from app.services.face_detector import DETECTORS, create_detector
+from app.services.instrumentation import RollingWindow
+
+
+def load_labels(source: str) -> dict[int, bool] | None:
+    p = Path(source)
+    path = p / "labels.csv" if p.is_dir() else p.with_name(p.name + ".labels.csv")
+    if not path.exists():
+        return None
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return {int(r["frame"]): r["has_face"].strip() not in ("", "0") for r in csv.DictReader(f)}
+
+
+def run_one(source: str, detector_name: str, vcfg: dict, camera_cfg: dict, max_frames: int = 0) -> dict:
+    det = create_detector(vcfg, detector_name)
+    if det.empty():
+        return {"source": source, "detector": detector_name, "error": det.error}
+
+    labels = load_labels(source)
+    cap = open_source(source, camera_cfg, realtime=False)
+    if not cap.isOpened():
+        raise SystemExit(f"取得元を開けませんでした: {source}")
+
+    times = RollingWindow(1_000_000)
+    frames = found = tp = fn = fp = 0
+    try:
+        while not (max_frames and frames >= max_frames):
+            ok, frame = cap.read()
+            if not ok or frame is None:
+                break
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            t0 = time.perf_counter()
+            faces = det.detect(frame, gray)
+            times.add((time.perf_counter() - t0) * 1000.0)
+            hit = len(faces) > 0
+            found += int(hit)
+            if labels is not None and frames in labels:
+                if labels[frames]:
+                    tp += int(hit)
+                    fn += int(not hit)
+                else:
+                    fp += int(hit)
+            frames += 1
+    finally:
+        cap.release()
+
+    p50, p95 = times.percentiles(50, 95) if frames else (0.0, 0.0)
+    r = {
+        "source": source,
+        "detector": detector_name,
+        "frames": frames,
+        "mean_ms": round(times.mean(), 2),
+        "p50_ms": round(p50, 2),
+        "p95_ms": round(p95, 2),
+        "face_rate": round(found / frames, 3) if frames else 0.0,
+    }
+    if labels is not None:
+        r["recall"] = round(tp / (tp + fn), 3) if (tp + fn) else None
+        r["false_positives"] = fp
+    return r
+
+
+def format_table(rows: list[dict]) -> str:
+    lines = [f"{'source':<28} {'detector':<8} {'frames':>6} {'p50 ms':>8} {'p95 ms':>8} {'顔率':>6} {'再現率':>6} {'誤検出':>6}"]
+    for r in rows:
+        if "error" in r:
+            lines.append(f"{Path(r['source']).name:<28} {r['detector']:<8} {r['error']}")
+            continue
+        recall = "-" if r.get("recall") is None else f"{r['recall']:.3f}"
+        fp = r.get("false_positives", "-")
+        lines.append(
+            f"{Path(r['source']).name:<28} {r['detector']:<8} {r['frames']:>6} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['face_rate']:>6.3f} {recall:>6} {fp!s:>6}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="顔検出器の比較ベンチマーク（画面なし）")
+    ap.add_argument("sources", nargs="+", help="動画ファイル / 連番画像フォルダ")
+    ap.add_argument("--detectors", default=",".join(DETECTORS), help="比べる検出器（カンマ区切り）")
+    ap.add_argument("--frames", type=int, default=0, help="取得元ごとのフレーム数の上限")
+    ap.add_argument("--json", help="結果を JSON で書き出すパス")
+    args = ap.parse_args(argv)
+
+    cfg = ConfigService()
+    vcfg, camera_cfg = cfg.get_vision(), cfg.get_camera()
+    names = [n.strip().lower() for n in args.detectors.split(",") if n.strip()]
+    for n in names:
+        if n not in DETECTORS:
+            ap.error(f"未対応の検出器: {n}（{' / '.join(DETECTORS)}）")
+
+    rows = [run_one(src, n, vcfg, camera_cfg, args.frames) for src in args.sources for n in names]
+    print(format_table(rows))
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,20 +3,53 @@ import os
 import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
+import importlib.util
+import sys
 
-from .screens.home_screen import HomeScreen
-from .screens.face_clock_screen import FaceClockScreen
-from .screens.attendance_list_screen import AttendanceListScreen
-from .screens.my_attendance_screen import MyAttendanceScreen
-from .screens.admin_login_screen import AdminLoginScreen
-from .screens.shift_view_screen import ShiftViewScreen
-
-from .screens.shift_submit_screen import ShiftSubmitScreen
-
-from app.infra.db.attendance_repo import AttendanceRepo
+from app.services import startup_timer
+from app.services import instrumentation as inst
+from app.services.config_service import ConfigService
 
 __all__ = ["AppShell", "run_app"]  # ← 追加：エクスポートを明示
 
+# 画面キー → (モジュール, クラス名)
+# 画面モジュールは初めて開いたときに import する（起動時に cv2 / numpy / bcrypt を読まない）
+SCREEN_REGISTRY: dict[str, tuple[str, str]] = {
+    "home": (".screens.home_screen", "HomeScreen"),
+    "face": (".screens.face_clock_screen", "FaceClockScreen"),
+    "list": (".screens.shift_submit_screen", "ShiftSubmitScreen"),   # 従業員のシフト提出
+    "my": (".screens.my_attendance_screen", "MyAttendanceScreen"),
+    "shift": (".screens.shift_view_screen", "ShiftViewScreen"),
+    "admin_login": (".screens.admin_login_screen", "AdminLoginScreen"),
+    # 管理者サブナビ
+    "attendance_list": (".screens.attendance_list_screen", "AttendanceListScreen"),
+    "face_data": (".screens.face_data_screen", "FaceDataScreen"),
+    "employee_register": (".screens.employee_register_screen", "EmployeeRegisterScreen"),
+    "camera_settings": (".screens.camera_settings_screen", "CameraSettingsScreen"),
+    "multi_camera": (".screens.multi_camera_screen", "MultiCameraScreen"),
+    "admin_account_register": (".screens.admin_account_register_screen", "AdminAccountRegisterScreen"),
+    "shift_editor": (".screens.shift_editor_screen", "ShiftEditorScreen"),
+    "shift_weekly_review": (".screens.shift_weekly_review_screen", "ShiftWeeklyReviewScreen"),
+    "employee_su_overview": (".screens.employee_su_overview_screen", "EmployeeSuOverviewScreen"),
+}
+
+
+def screen_class(key: str):
+    mod_name, cls_name = SCREEN_REGISTRY.get(key, SCREEN_REGISTRY["home"])
+    full_name = importlib.util.resolve_name(mod_name, __package__)
+    mod = sys.modules.get(full_name)
+    if mod is None:
+        with inst.span(f"screen.import.{key}"):
+            mod = importlib.import_module(full_name)
+    return getattr(mod, cls_name)
+
+
+def build_screen(key: str, parent, *args, **kwargs):
+    """画面を import（初回のみ）して生成する。生成時間は screen.init.<key> で計測。"""
+    cls = screen_class(key)
+    with inst.span(f"screen.init.{key}"):
+        return cls(parent, *args, **kwargs)
+
 # ★ 開発中だけ True にする。本番運用するときは必ず False に戻すこと。
 DEV_SKIP_ADMIN_LOGIN = False
 
@@ -36,8 +69,8 @@ class AppShell(ctk.CTkFrame):
         self._is_history_nav = False
         self.current_screen = None
 
-        # 検索サジェスト
-        self.att_repo = AttendanceRepo()
+        # 検索サジェスト（AttendanceRepo は初回検索時に作る）
+        self._att_repo = None
         self.search_popup: tk.Toplevel | None = None
 
         # ===== Treeview 共通スタイル =====
@@ -200,6 +233,13 @@ class AppShell(ctk.CTkFrame):
         initial_key = "admin" if self.dev_skip_admin_login else "home"
         self.show(initial_key)
 
+    @property
+    def att_repo(self):
+        if self._att_repo is None:
+            from app.infra.db.attendance_repo import AttendanceRepo
+            self._att_repo = AttendanceRepo()
+        return self._att_repo
+
     def _on_root_focus_out(self, event: tk.Event):
         self._destroy_search_popup()
         self._destroy_profile_menu()
@@ -500,6 +540,7 @@ class AppShell(ctk.CTkFrame):
     def _clear_search(self):
         self.search_var.set("")
         self._destroy_search_popup()
+        from .screens.attendance_list_screen import AttendanceListScreen
         if isinstance(self.current_screen, AttendanceListScreen):
             self.current_screen.on_search("")
 
@@ -524,77 +565,78 @@ class AppShell(ctk.CTkFrame):
             font=("Meiryo UI", 13),
         )
 
-        from .screens.attendance_list_screen import AttendanceListScreen
         ctk.CTkButton(
             self.subnav,
             text="📑 勤怠一覧 / 検索",
-            command=lambda: self._swap_right(AttendanceListScreen),
+            command=lambda: self._swap_right(self._lazy_screen("attendance_list")),
             **admin_btn_style,
         ).pack(padx=8, pady=4)
 
         if role != "su":
-            from .screens.face_data_screen import FaceDataScreen
             ctk.CTkButton(
                 self.subnav,
                 text="🖼 顔データ管理",
-                command=lambda: self._swap_right(FaceDataScreen),
+                command=lambda: self._swap_right(self._lazy_screen("face_data")),
                 **admin_btn_style,
             ).pack(padx=8, pady=4)
             return
 
-        from .screens.employee_register_screen import EmployeeRegisterScreen
-        from .screens.camera_settings_screen import CameraSettingsScreen
-        from .screens.admin_account_register_screen import AdminAccountRegisterScreen
-        from .screens.face_data_screen import FaceDataScreen
-        from .screens.shift_editor_screen import ShiftEditorScreen
-        from .screens.shift_weekly_review_screen import ShiftWeeklyReviewScreen
-        from .screens.employee_su_overview_screen import EmployeeSuOverviewScreen
-
         ctk.CTkButton(
             self.subnav,
             text="👥 従業員登録 / 編集",
-            command=lambda: self._swap_right(EmployeeRegisterScreen),
+            command=lambda: self._swap_right(self._lazy_screen("employee_register")),
             **admin_btn_style,
         ).pack(padx=8, pady=4)
         ctk.CTkButton(
             self.subnav,
             text="🎥 カメラ・顔認証設定",
-            command=lambda: self._swap_right(CameraSettingsScreen),
+            command=lambda: self._swap_right(self._lazy_screen("camera_settings")),
+            **admin_btn_style,
+        ).pack(padx=8, pady=4)
+        ctk.CTkButton(
+            self.subnav,
+            text="📹 複数カメラ打刻",
+            command=lambda: self._swap_right(self._lazy_screen("multi_camera")),
             **admin_btn_style,
         ).pack(padx=8, pady=4)
         ctk.CTkButton(
             self.subnav,
             text="🔐 管理者アカウント",
             command=lambda: self._swap_right(
-                lambda parent: AdminAccountRegisterScreen(parent, self.current_admin)
+                lambda parent: build_screen("admin_account_register", parent, self.current_admin)
             ),
             **admin_btn_style,
         ).pack(padx=8, pady=4)
         ctk.CTkButton(
             self.subnav,
             text="🖼 顔データ管理",
-            command=lambda: self._swap_right(FaceDataScreen),
+            command=lambda: self._swap_right(self._lazy_screen("face_data")),
             **admin_btn_style,
         ).pack(padx=8, pady=4)
         ctk.CTkButton(
             self.subnav,
             text="🗓 シフト作成 / 編集",
-            command=lambda: self._swap_right(ShiftEditorScreen),
+            command=lambda: self._swap_right(self._lazy_screen("shift_editor")),
             **admin_btn_style,
         ).pack(padx=8, pady=4)
         ctk.CTkButton(
             self.subnav,
             text="🗂 提出シフトビュー",
-            command=lambda: self._swap_right(ShiftWeeklyReviewScreen),
+            command=lambda: self._swap_right(self._lazy_screen("shift_weekly_review")),
             **admin_btn_style,
         ).pack(padx=8, pady=4)
         ctk.CTkButton(
             self.subnav,
             text="📊 従業員一覧（時給）",
-            command=lambda: self._swap_right(EmployeeSuOverviewScreen),
+            command=lambda: self._swap_right(self._lazy_screen("employee_su_overview")),
             **admin_btn_style,
         ).pack(padx=8, pady=4)
 
+    @staticmethod
+    def _lazy_screen(key: str):
+        # クリックされた時点で初めてモジュールを import する
+        return lambda parent: build_screen(key, parent)
+
     def _swap_right(self, widget_class_or_factory):
         for child in self.body.winfo_children():
             child.destroy()
@@ -619,6 +661,10 @@ class AppShell(ctk.CTkFrame):
             self._is_history_nav = False
 
     def show(self, key: str):
+        with inst.span("shell.show", screen=key):
+            self._show(key)
+
+    def _show(self, key: str):
         # 画面本体をいったんクリア
         for child in self.body.winfo_children():
             child.destroy()
@@ -655,44 +701,30 @@ class AppShell(ctk.CTkFrame):
                         "role": "su",
                     }
                     self._build_admin_subnav()
-                from .screens.employee_register_screen import EmployeeRegisterScreen
-                screen = EmployeeRegisterScreen(self.body)
+                screen = build_screen("employee_register", self.body)
             else:
                 def to_menu(user):
                     self.current_admin = user
                     self._build_admin_subnav()
                     if user.get("role") == "su":
-                        from .screens.employee_register_screen import EmployeeRegisterScreen
-                        self._swap_right(EmployeeRegisterScreen)
+                        self._swap_right(self._lazy_screen("employee_register"))
                     else:
-                        from .screens.face_data_screen import FaceDataScreen
-                        self._swap_right(FaceDataScreen)
+                        self._swap_right(self._lazy_screen("face_data"))
 
-                screen = AdminLoginScreen(self.body, switch_to_menu_callback=to_menu)
-
-        elif key == "home":
-            screen = HomeScreen(self.body)
-
-        elif key == "face":
-            screen = FaceClockScreen(self.body)
-
-        elif key == "list":
-            screen = ShiftSubmitScreen(self.body)  # 従業員のシフト提出
-
-        elif key == "my":
-            screen = MyAttendanceScreen(self.body)
-
-        elif key == "shift":
-            screen = ShiftViewScreen(self.body)
+                screen = build_screen("admin_login", self.body, switch_to_menu_callback=to_menu)
 
         else:
-            screen = HomeScreen(self.body)
+            screen = build_screen(key, self.body)
 
         screen.grid(row=0, column=0, sticky="nsew")
         self.current_screen = screen
 
 
 def run_app(cfg: dict):
+    # 計測（app_config.json の instrumentation で有効化）
+    inst_cfg = ConfigService().get_instrumentation()
+    inst.configure(inst_cfg)
+
     # 見た目統一
     ctk.set_appearance_mode("light")
     ctk.set_default_color_theme("blue")
@@ -704,10 +736,27 @@ def run_app(cfg: dict):
     root.title(cfg.get("app_name", "Kao-Kintai"))
     root.grid_rowconfigure(0, weight=1)
     root.grid_columnconfigure(0, weight=1)
+    startup_timer.mark("root window created")
 
     # シェル
     shell = AppShell(master=root, cfg=cfg)
     shell.grid(row=0, column=0, sticky="nsew")
+    startup_timer.mark("shell built")
+
+    # mainloop が回り始めた最初のタイミング ≒ 最初のウィンドウ表示
+    def _first_window():
+        startup_timer.mark("first window")
+        startup_timer.report(echo=inst.enabled())
+        inst.record("startup.first_window", startup_timer.elapsed_ms())
+        # 打刻キューは最初の画面を出してから起こす（DB の準備・ジャーナルの再生で表示を遅らせない）。
+        # 前回 DB に入る前に落ちた打刻があれば、打刻画面を開かなくてもここで書き込みが始まる
+        root.after(200, _start_punch_queue)
+
+    def _start_punch_queue():
+        from app.services.punch_queue import shared_punch_queue
+        shared_punch_queue()
+
+    root.after(0, _first_window)
 
     # 最大化
     def _maximize_window():
@@ -723,4 +772,17 @@ def run_app(cfg: dict):
     root.bind("<Control-Left>", lambda e: shell._hist(-1))
     root.bind("<Control-Right>", lambda e: shell._hist(+1))
 
-    root.mainloop()
+    # F12: 計測オーバーレイ
+    if inst.enabled() and inst_cfg.get("overlay", True):
+        from .components import perf_overlay
+        overlay = [None]
+
+        def _toggle_overlay(_e=None):
+            overlay[0] = perf_overlay.toggle(root, overlay[0])
+
+        root.bind("<F12>", _toggle_overlay)
+
+    try:
+        root.mainloop()
+    finally:
+        inst.shutdown()
@@ -0,0 +1,54 @@
+import tkinter as tk
+from tkinter import ttk
+
+from app.services import instrumentation as inst
+
+
+class PerfOverlay(tk.Toplevel):
+    """計測オーバーレイ（スパン名ごとの p50 / p95 / p99 / max を 1 秒ごとに更新）"""
+
+    REFRESH_MS = 1000
+    COLUMNS = ("name", "count", "p50", "p95", "p99", "max")
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("計測（ms）")
+        self.attributes("-topmost", True)
+        self.geometry("640x420")
+
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show="headings")
+        for col, width in zip(self.COLUMNS, (280, 70, 70, 70, 70, 70)):
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=width, anchor="w" if col == "name" else "e")
+        self.tree.pack(fill="both", expand=True)
+
+        btns = tk.Frame(self)
+        btns.pack(fill="x")
+        tk.Button(btns, text="リセット", command=inst.reset).pack(side="right", padx=6, pady=4)
+
+        self._after_id = None
+        self._refresh()
+
+    def _refresh(self):
+        snap = inst.snapshot()
+        self.tree.delete(*self.tree.get_children())
+        for name in sorted(snap):
+            s = snap[name]
+            self.tree.insert("", "end", values=(
+                name, s["count"],
+                f"{s['p50']:.1f}", f"{s['p95']:.1f}", f"{s['p99']:.1f}", f"{s['max']:.1f}",
+            ))
+        self._after_id = self.after(self.REFRESH_MS, self._refresh)
+
+    def destroy(self):
+        if self._after_id:
+            self.after_cancel(self._after_id)
+        super().destroy()
+
+
+def toggle(master, current: "PerfOverlay | None") -> "PerfOverlay | None":
+    """開いていれば閉じ、閉じていれば開く。新しい状態を返す。"""
+    if current is not None and current.winfo_exists():
+        current.destroy()
+        return None
+    return PerfOverlay(master)
@@ -0,0 +1,43 @@
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+
+class PreviewRenderer:
+    """
+    カメラ映像をラベルに表示する（フレームごとの確保を避ける版）。
+      - リサイズ先 / RGBA 変換先のバッファは表示サイズが変わったときだけ確保
+      - PhotoImage は 1 つだけ作り、毎フレーム paste で中身だけ書き換える
+      - RGBA は Image.frombuffer がコピーせずに参照できるモード
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self._size: tuple[int, int] | None = None
+        self._resized: np.ndarray | None = None
+        self._rgba: np.ndarray | None = None
+        self._pil: Image.Image | None = None
+        self._photo: ImageTk.PhotoImage | None = None
+
+    def _allocate(self, w: int, h: int) -> None:
+        self._size = (w, h)
+        self._resized = np.empty((h, w, 3), dtype=np.uint8)
+        self._rgba = np.empty((h, w, 4), dtype=np.uint8)
+        # _rgba のメモリをそのまま参照する PIL 画像（以降の変換結果が自動で反映される）
+        self._pil = Image.frombuffer("RGBA", (w, h), self._rgba, "raw", "RGBA", 0, 1)
+        self._photo = ImageTk.PhotoImage("RGBA", (w, h))
+        self.label.configure(image=self._photo)
+
+    def render(self, frame_bgr, size: tuple[int, int] | None = None) -> None:
+        """frame_bgr を size=(w, h) で表示。size 省略時はフレームの大きさのまま。"""
+        fh, fw = frame_bgr.shape[:2]
+        w, h = size if size else (fw, fh)
+        if self._size != (w, h):
+            self._allocate(w, h)
+
+        src = frame_bgr
+        if (fw, fh) != (w, h):
+            cv2.resize(frame_bgr, (w, h), dst=self._resized, interpolation=cv2.INTER_LINEAR)
+            src = self._resized
+        cv2.cvtColor(src, cv2.COLOR_BGR2RGBA, dst=self._rgba)
+        self._photo.paste(self._pil)
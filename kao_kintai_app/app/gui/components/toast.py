@@ -0,0 +1,43 @@
+import customtkinter as ctk
+
+
+class Toast:
+    """
+    画面に重ねて出す通知（モーダルにしないので、表示中もカメラのループと認識は止まらない）。
+    表示中に次の通知が来たら差し替え、duration_ms 後に自動で消える。
+    """
+
+    DURATION_MS = 2500
+    COLORS = {
+        "ok": ("#1E8449", "#FFFFFF"),
+        "warn": ("#B03A2E", "#FFFFFF"),
+        "info": ("#111827", "#F9FAFB"),
+    }
+
+    def __init__(self, parent, font=("Meiryo UI", 18, "bold"), duration_ms: int | None = None, wraplength: int = 720):
+        self.parent = parent
+        self.duration_ms = int(duration_ms or self.DURATION_MS)
+        self.label = ctk.CTkLabel(parent, text="", font=font, height=48, corner_radius=8, wraplength=wraplength)
+        self._after_id = None
+
+    def show(self, text: str, kind: str = "ok", duration_ms: int | None = None) -> None:
+        fg, tc = self.COLORS.get(kind, self.COLORS["info"])
+        self.label.configure(text=f"  {text}  ", fg_color=fg, text_color=tc)
+        self.label.place(relx=0.5, y=24, anchor="n")
+        self.label.lift()
+        if self._after_id:
+            self.parent.after_cancel(self._after_id)
+        self._after_id = self.parent.after(duration_ms or self.duration_ms, self.hide)
+
+    def hide(self) -> None:
+        self._after_id = None
+        self.label.place_forget()
+
+    def cancel(self) -> None:
+        """画面を閉じるときに呼ぶ（消すための予約を取り消す）。"""
+        if self._after_id:
+            try:
+                self.parent.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
@@ -0,0 +1,68 @@
+import queue
+import threading
+import traceback
+
+
+class UiDispatcher:
+    """
+    別スレッドから Tk の処理を頼むための受け口（Tk のウィジェットは Tk のスレッド以外から触らない。
+    self.after もスレッドからは呼ばない）。
+      - post(fn, *args) はどのスレッドからでも呼べる（キューに積むだけ）
+      - Tk のスレッドが POLL_MS ごとにキューを空にして順に実行する
+      - key を付けると、まだ実行されていない同じ key の依頼は最新の 1 件に置き換わる（進捗表示用）
+    画面の destroy で stop() を呼ぶこと（以後の post は捨てられる）。
+    """
+
+    POLL_MS = 30
+
+    def __init__(self, widget, poll_ms: int | None = None):
+        self.widget = widget
+        self.poll_ms = int(poll_ms or self.POLL_MS)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._latest: dict = {}
+        self._lock = threading.Lock()
+        self._after_id = None
+        self._stopped = False
+
+    def start(self) -> "UiDispatcher":
+        self._after_id = self.widget.after(self.poll_ms, self._drain)
+        return self
+
+    def post(self, fn, *args, key=None) -> None:
+        if self._stopped:
+            return
+        if key is None:
+            self._queue.put((None, fn, args))
+            return
+        with self._lock:
+            queued = key in self._latest
+            self._latest[key] = (fn, args)
+        if not queued:
+            self._queue.put((key, None, None))
+
+    def _drain(self) -> None:
+        # 実行中に積まれた分は次回に回す（ここで Tk のイベント処理を止め続けない）
+        for _ in range(self._queue.qsize()):
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            key, fn, args = item
+            if key is not None:
+                with self._lock:
+                    fn, args = self._latest.pop(key)
+            try:
+                fn(*args)
+            except Exception:
+                traceback.print_exc()
+        if not self._stopped:
+            self._after_id = self.widget.after(self.poll_ms, self._drain)
+
+    def stop(self) -> None:
+        self._stopped = True
+        if self._after_id:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
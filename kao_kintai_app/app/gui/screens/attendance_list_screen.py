@@ -9,6 +9,7 @@ import csv
 from app.infra.db.employee_repo import EmployeeRepo
 from app.infra.db.attendance_repo import AttendanceRepo
 from app.services.attendance_service import AttendanceService  # 未使用だがそのまま
+from app.services import instrumentation as inst
 
 
 # ===============================================================
@@ -264,6 +265,7 @@ class AttendanceListScreen(ctk.CTkFrame):
             return None
 
     # ==== メイン検索処理 ====
+    @inst.timed("tree_fill.attendance_list")
     def search(self):
         start = self._parse_date(self.start_var.get())
         end = self._parse_date(self.end_var.get())
@@ -16,10 +16,17 @@ class CameraSettingsScreen(ctk.CTkFrame):
     CARD_BG = "#E5E7EB"     # 薄灰色（項目・ボタンと同系）
     BORDER  = "#D1D5DB"
 
+    # ===== カメラ選択肢 =====
+    RESOLUTIONS = ["640x480", "800x600", "1280x720", "1920x1080"]
+    BACKENDS = ["auto", "dshow", "msmf", "v4l2"]
+    FOURCC_DEFAULT = "(ドライバ既定)"
+    FOURCCS = ["MJPG", "YUY2", FOURCC_DEFAULT]
+
     def __init__(self, master):
         super().__init__(master)
         self.cfg = ConfigService()
         v = self.cfg.get_vision()
+        c = self.cfg.get_camera()
 
         # ===== 変数 =====
         self.var_area   = tk.DoubleVar(value=float(v["min_area_ratio"]))
@@ -29,6 +36,19 @@ class CameraSettingsScreen(ctk.CTkFrame):
         self.var_match  = tk.IntVar(value=int(v["match_threshold"]))
         self.var_topk   = tk.IntVar(value=int(v["top_k_images"]))
         self.var_intvl  = tk.IntVar(value=int(v["recog_interval"]))
+        self.var_fps    = tk.IntVar(value=int(v["target_fps"]))
+        self.var_idlefps = tk.IntVar(value=int(v["idle_fps"]))
+        self.var_idlesec = tk.IntVar(value=int(v["idle_after_sec"]))
+        self.var_hud    = tk.BooleanVar(value=bool(v.get("show_hud", False)))
+
+        self.var_device = tk.StringVar(value=str(c["device"]))  # カメラ番号 or 動画ファイル / 連番画像フォルダ
+        self.var_backend = tk.StringVar(value=str(c["backend"]))
+        self.var_res    = tk.StringVar(value=f'{int(c["width"])}x{int(c["height"])}')
+        self.var_camfps = tk.IntVar(value=int(c["fps"]))
+        self.var_fourcc = tk.StringVar(value=str(c["fourcc"]) or self.FOURCC_DEFAULT)
+        self.var_bufsz  = tk.IntVar(value=int(c["buffer_size"]))
+        self.var_latest = tk.BooleanVar(value=bool(c["grab_latest"]))
+        self.var_sources = tk.StringVar(value=", ".join(str(x) for x in c["sources"]))
 
         # ===== タイトル =====
         ctk.CTkLabel(
@@ -38,12 +58,13 @@ class CameraSettingsScreen(ctk.CTkFrame):
         ).pack(anchor="w", padx=16, pady=(16, 6))
 
         # ===== BODY（薄灰色）=====
-        body = ctk.CTkFrame(
+        # 項目が増えたのでスクロール可能にする
+        body = ctk.CTkScrollableFrame(
             self,
             fg_color=self.BODY_BG,
             corner_radius=10
         )
-        body.pack(fill="x", padx=16, pady=(6, 12))
+        body.pack(fill="both", expand=True, padx=16, pady=(6, 12))
 
         # ===== 行UI（カード化）=====
         def make_card(parent):
@@ -107,6 +128,41 @@ class CameraSettingsScreen(ctk.CTkFrame):
             s.configure(command=on_slide)
             s.pack(fill="x", padx=12, pady=6)
 
+        def row_switch(parent, label, var):
+            card = make_card(parent)
+
+            ctk.CTkLabel(
+                card, text=label, width=220, anchor="w", font=self.BASE_FONT
+            ).pack(side="left", padx=(12, 0), pady=8)
+
+            ctk.CTkSwitch(
+                card, text="", variable=var, onvalue=True, offvalue=False
+            ).pack(side="right", padx=(0, 12), pady=8)
+
+        def row_option(parent, label, var, values):
+            card = make_card(parent)
+
+            ctk.CTkLabel(
+                card, text=label, width=220, anchor="w", font=self.BASE_FONT
+            ).pack(side="left", padx=(12, 0), pady=8)
+
+            if var.get() not in values:
+                values = values + [var.get()]
+            ctk.CTkOptionMenu(
+                card, values=values, variable=var, font=self.BASE_FONT, width=180
+            ).pack(side="right", padx=(0, 12), pady=8)
+
+        def row_entry(parent, label, var):
+            card = make_card(parent)
+
+            ctk.CTkLabel(
+                card, text=label, width=220, anchor="w", font=self.BASE_FONT
+            ).pack(side="left", padx=(12, 0), pady=8)
+
+            ctk.CTkEntry(
+                card, textvariable=var, font=self.BASE_FONT
+            ).pack(side="left", fill="x", expand=True, padx=12, pady=8)
+
         def row_int(parent, label, var, minv, maxv):
             card = make_card(parent)
 
@@ -140,6 +196,22 @@ class CameraSettingsScreen(ctk.CTkFrame):
         row_int (body, "認識マッチ閾値（良マッチ数）", self.var_match, 5, 100)
         row_int (body, "学習に使う登録画像数", self.var_topk, 1, 15)
         row_int (body, "認識の間引き（フレーム）", self.var_intvl, 1, 10)
+        row_int (body, "目標FPS", self.var_fps, 5, 60)
+        row_int (body, "無人時のFPS", self.var_idlefps, 1, 15)
+        row_int (body, "無人判定までの秒数", self.var_idlesec, 1, 120)
+        row_switch(body, "性能HUDを表示（FPS / 処理時間）", self.var_hud)
+
+        ctk.CTkLabel(
+            body, text="カメラ入力", font=self.BTN_FONT
+        ).pack(anchor="w", padx=12, pady=(12, 0))
+        row_entry(body, "カメラ番号（または動画/画像フォルダ）", self.var_device)
+        row_option(body, "キャプチャAPI", self.var_backend, self.BACKENDS)
+        row_option(body, "解像度", self.var_res, self.RESOLUTIONS)
+        row_int (body, "カメラFPS（要求値）", self.var_camfps, 5, 60)
+        row_option(body, "圧縮形式（FOURCC）", self.var_fourcc, self.FOURCCS)
+        row_int (body, "ドライバのバッファ数", self.var_bufsz, 1, 8)
+        row_switch(body, "常に最新フレームだけを処理", self.var_latest)
+        row_entry(body, "複数カメラ（番号/動画をカンマ区切り）", self.var_sources)
 
         # ===== ボタン行（同じカード思想）=====
         btns = ctk.CTkFrame(
@@ -180,7 +252,25 @@ class CameraSettingsScreen(ctk.CTkFrame):
             "bright_max": int(self.var_bmax.get()),
             "match_threshold": int(self.var_match.get()),
             "top_k_images": int(self.var_topk.get()),
-            "recog_interval": int(self.var_intvl.get())
+            "recog_interval": int(self.var_intvl.get()),
+            "target_fps": int(self.var_fps.get()),
+            "idle_fps": int(self.var_idlefps.get()),
+            "idle_after_sec": int(self.var_idlesec.get()),
+            "show_hud": bool(self.var_hud.get()),
+        })
+
+        w, h = (int(x) for x in self.var_res.get().split("x"))
+        fourcc = self.var_fourcc.get()
+        self.cfg.save_camera({
+            "device": self._parse_source(self.var_device.get()),
+            "backend": self.var_backend.get(),
+            "width": w,
+            "height": h,
+            "fps": int(self.var_camfps.get()),
+            "fourcc": "" if fourcc == self.FOURCC_DEFAULT else fourcc,
+            "buffer_size": int(self.var_bufsz.get()),
+            "grab_latest": bool(self.var_latest.get()),
+            "sources": self._parse_sources(self.var_sources.get()),
         })
 
         messagebox.showinfo(
@@ -188,6 +278,19 @@ class CameraSettingsScreen(ctk.CTkFrame):
             "設定を保存しました。顔登録/認証画面を開き直すと反映されます。"
         )
 
+    @staticmethod
+    def _parse_source(text: str):
+        # 数字はカメラ番号、それ以外は動画ファイル / 連番画像フォルダのパスとして扱う（空ならカメラ 0）
+        text = text.strip()
+        if not text:
+            return 0
+        return int(text) if text.isdigit() else text
+
+    @classmethod
+    def _parse_sources(cls, text: str) -> list:
+        out = [cls._parse_source(part) for part in text.split(",") if part.strip()]
+        return out or [0]
+
     def reset_default(self):
         from app.services.config_service import DEFAULT_CFG
         v = DEFAULT_CFG["vision"]
@@ -199,5 +302,19 @@ class CameraSettingsScreen(ctk.CTkFrame):
         self.var_match.set(int(v["match_threshold"]))
         self.var_topk.set(int(v["top_k_images"]))
         self.var_intvl.set(int(v["recog_interval"]))
+        self.var_fps.set(int(v["target_fps"]))
+        self.var_idlefps.set(int(v["idle_fps"]))
+        self.var_idlesec.set(int(v["idle_after_sec"]))
+        self.var_hud.set(bool(v["show_hud"]))
+
+        c = DEFAULT_CFG["camera"]
+        self.var_device.set(str(c["device"]))
+        self.var_backend.set(str(c["backend"]))
+        self.var_res.set(f'{int(c["width"])}x{int(c["height"])}')
+        self.var_camfps.set(int(c["fps"]))
+        self.var_fourcc.set(str(c["fourcc"]) or self.FOURCC_DEFAULT)
+        self.var_bufsz.set(int(c["buffer_size"]))
+        self.var_latest.set(bool(c["grab_latest"]))
+        self.var_sources.set(", ".join(str(x) for x in c["sources"]))
 
         self.save()
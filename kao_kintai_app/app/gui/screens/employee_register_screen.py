@@ -1,8 +1,11 @@
 import customtkinter as ctk
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime  # ← 追加
+import threading
 from app.infra.db.employee_repo import EmployeeRepo
+from app.services import instrumentation as inst
+from app.gui.components.ui_dispatcher import UiDispatcher
 
 
 class EmployeeRegisterScreen(ctk.CTkFrame):
@@ -80,7 +83,7 @@ class EmployeeRegisterScreen(ctk.CTkFrame):
         # ボタン列（上との余白少なめ、下の表との余白も少なめ）
         btns = ctk.CTkFrame(self)
         btns.grid(row=2, column=0, sticky="ew", padx=16, pady=(4, 2))
-        for i in range(5):
+        for i in range(6):
             btns.grid_columnconfigure(i, weight=1)
 
         ctk.CTkButton(
@@ -130,6 +133,15 @@ class EmployeeRegisterScreen(ctk.CTkFrame):
             corner_radius=self.BTN_RADIUS,
         ).grid(row=0, column=4, padx=6, pady=6, sticky="ew")
 
+        self.btn_import = ctk.CTkButton(
+            btns,
+            text="CSV一括登録",
+            command=self.on_import_csv,
+            font=self.BTN_FONT,
+            height=self.BTN_HEIGHT,
+            corner_radius=self.BTN_RADIUS,
+        )
+        self.btn_import.grid(row=0, column=5, padx=6, pady=6, sticky="ew")
 
         # 下段：一覧（Treeview） – 余白を減らし、画面いっぱいに広げる
         table_wrap = ctk.CTkFrame(self)
@@ -229,6 +241,58 @@ class EmployeeRegisterScreen(ctk.CTkFrame):
 
         self.refresh_table()
 
+    def on_import_csv(self):
+        csv_path = filedialog.askopenfilename(
+            title="従業員CSVを選択",
+            filetypes=[("CSVファイル", "*.csv")],
+        )
+        if not csv_path:
+            return
+        faces_dir = None
+        if messagebox.askyesno("顔写真", "顔写真フォルダも取り込みますか？\n（<フォルダ>/<face_key>/*.jpg）"):
+            faces_dir = filedialog.askdirectory(title="顔写真フォルダを選択") or None
+
+        from app.services.employee_import_service import EmployeeImportService
+        svc = EmployeeImportService(repo=self.repo)
+        stage_labels = {"employees": "登録", "photos": "写真", "features": "特徴量"}
+        self.btn_import.configure(state="disabled", text="取込中…")
+
+        # 取込スレッドからの表示更新は UiDispatcher 経由（取込が終わるまでの間だけ動かす）
+        ui = UiDispatcher(self).start()
+
+        def on_progress(stage, done, total):
+            text = f"{stage_labels.get(stage, stage)} {done}/{total}"
+            ui.post(lambda: self.btn_import.configure(text=text), key="import_progress")
+
+        def finish(res, error):
+            ui.stop()
+            self._on_import_done(res, error)
+
+        def worker():
+            try:
+                res = svc.run(csv_path, faces_dir, progress=on_progress)
+                ui.post(finish, res, None)
+            except Exception as ex:
+                ui.post(finish, None, ex)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _on_import_done(self, res, error):
+        self.btn_import.configure(state="normal", text="CSV一括登録")
+        if error is not None:
+            messagebox.showerror("CSV一括登録", f"取り込みに失敗しました。\n{error}")
+            return
+        self.refresh_table()
+        msg = (
+            f"従業員 {len(res['created'])} 名を登録しました。\n"
+            f"顔写真 {res['images']} 枚（特徴量あり {res['faces']} 枚）"
+        )
+        if res["errors"]:
+            head = "\n".join(res["errors"][:10])
+            more = f"\n…ほか {len(res['errors']) - 10} 件" if len(res["errors"]) > 10 else ""
+            msg += f"\n\n注意:\n{head}{more}"
+        messagebox.showinfo("CSV一括登録", msg)
+
     def on_toggle_active(self, active: bool):
         code = self.code_var.get().strip()
         if not code:
@@ -252,6 +316,7 @@ class EmployeeRegisterScreen(ctk.CTkFrame):
         self.role_var.set(emp["role"])
         self.active_var.set(emp["active"])
 
+    @inst.timed("tree_fill.employee_register")
     def refresh_table(self):
         # いったん全削除
         for i in self.tree.get_children():
@@ -3,17 +3,24 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
-import glob
-from pathlib import Path
 import cv2
-import numpy as np
-from PIL import Image
 import threading  # ★追加（顔データ読込を非同期化）
+import time
 
 from app.infra.db.employee_repo import EmployeeRepo
-from app.infra.db.attendance_repo import AttendanceRepo
-from app.services.attendance_service import AttendanceService
 from app.services.config_service import ConfigService
+from app.services.face_gallery_service import FaceGalleryService
+from app.services import instrumentation as inst
+from app.services.pipeline_stats import PipelineStats
+from app.services.frame_pacer import FramePacer
+from app.services.face_matcher import create_matcher
+from app.services.recognition_pipeline import RecognitionPipeline
+from app.services.punch_queue import shared_punch_queue
+from app.services.auto_punch_gate import AutoPunchGate
+from app.infra.camera.capture import open_source
+from app.gui.components.preview_renderer import PreviewRenderer
+from app.gui.components.ui_dispatcher import UiDispatcher
+from app.gui.components.toast import Toast
 
 
 class FaceClockScreen(ctk.CTkFrame):
@@ -37,47 +44,42 @@ class FaceClockScreen(ctk.CTkFrame):
 
         # --- 依存関係 ---
         self.emp_repo = EmployeeRepo()
-        self.att_repo = AttendanceRepo()
-        self.att_svc = AttendanceService(self.att_repo)
+        # 打刻は DB の書き込みを待たずに受け付ける（AttendanceService と同じ形で使える）
+        self.att_svc = shared_punch_queue()
 
-        # Haar / ORB
-        self.face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-        )
-
-        # ★ 追加：Cascadeロード確認
-        if self.face_cascade.empty():
-            cascade_path = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-            messagebox.showerror(
-                "Cascade 読み込み失敗",
-                f"haarcascade_frontalface_default.xml を読み込めませんでした。\n{cascade_path}"
-            )
-
-        self.orb = cv2.ORB_create(nfeatures=700)
-
-        # ✅ 変更：KNN を使うので crossCheck=False
-        self.bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=False)
+        self.gallery = FaceGalleryService(emp_repo=self.emp_repo)
 
         # しきい値（Config）
-        vcfg = ConfigService().get_vision()
-        self.MIN_AREA_RATIO = float(vcfg.get("min_area_ratio", 0.10))
-        self.MIN_BLUR_VAR = float(vcfg.get("min_blur_var", 80.0))
-        self.BRIGHT_MIN = int(vcfg.get("bright_min", 50))
-        self.BRIGHT_MAX = int(vcfg.get("bright_max", 210))
-        self.MATCH_THRESHOLD = int(vcfg.get("match_threshold", 22))
+        cfg_service = ConfigService()
+        vcfg = cfg_service.get_vision()
+        self.camera_cfg = cfg_service.get_camera()
         self.TOP_K_IMAGES = int(vcfg.get("top_k_images", 5))
-        self.RECOG_INTERVAL = int(vcfg.get("recog_interval", 3))
-        self.UNKNOWN_MIN_GAP = int(vcfg.get("unknown_min_gap", 8))
-        self.UNKNOWN_MARGIN_RATIO = float(vcfg.get("unknown_margin_ratio", 0.25))
-        self.ID_OK_FRAMES = int(vcfg.get("id_ok_frames", 2))
-        self.QUALITY_OK_FRAMES = int(vcfg.get("quality_ok_frames", 2))
+        pcfg = cfg_service.get_punch()
+        self.auto_punch = AutoPunchGate.from_config(pcfg)
+        self.TOAST_MS = int(float(pcfg.get("toast_sec", 2.5)) * 1000)
 
-        # ✅ 追加：RatioTest の厳しさ（小さいほど厳しい＝誤認識減）
-        # 0.70〜0.85 あたりで調整。まずは 0.75 推奨
-        self.RATIO_TEST = float(vcfg.get("ratio_test", 0.75))
+        # 照合（ギャラリー + Unknown 判定）と 1 フレーム分の処理（動き検知 → 検出 → 照合）
+        self.matcher = create_matcher(vcfg)  # vision.recognizer: orb / embedding
+        self.pipeline = RecognitionPipeline(self.matcher, vcfg)
+
+        # ★ 追加：顔検出器（Cascade / DNN モデル）のロード確認
+        if self.pipeline.detector.empty():
+            messagebox.showerror(
+                "顔検出器の読み込み失敗",
+                f"顔検出器（{self.pipeline.detector.name}）を読み込めませんでした。\n{self.pipeline.detector.error}"
+            )
+        if self.matcher.empty():
+            messagebox.showerror(
+                "照合モデルの読み込み失敗",
+                f"顔照合のモデルを読み込めませんでした（すべて Unknown になります）。\n{self.matcher.error}"
+            )
 
-        # ✅ 追加：best / second の比（小さいほど厳しい＝誤認識減）
-        self.BEST_SECOND_RATIO = float(vcfg.get("best_second_ratio", 1.35))
+        # フレーム間隔（目標FPS / 無人時のFPS）
+        self.pacer = FramePacer.from_config(vcfg)
+        self._face_seen = False
+
+        # 性能 HUD（認識間引き・解像度のチューニング用。無効時は計測自体しない）
+        self.SHOW_HUD = bool(vcfg.get("show_hud", False))
 
         # 表示用変数
         self.message_var = tk.StringVar(value="起動中…（顔データを読み込みます）")
@@ -85,21 +87,12 @@ class FaceClockScreen(ctk.CTkFrame):
         self.rec_name_var = tk.StringVar(value="--")
 
         # 状態
-        self.frame_count = 0
-        self.last_best = ("", 0)  # (code, best_matches)
         self.allowed_next_set = set()
         self._current_code_ui = ""
-        self._quality_ok_streak = 0
-        self._id_ok_streak = 0
-        self._last_candidate = ""
 
         # カメラ出力サイズ（リサイズで更新）
         self.cam_w = 960
         self.cam_h = 540
-        self._cam_image: ctk.CTkImage | None = None
-
-        # ★ 顔データ準備フラグ（非同期で読み込み）
-        self._dataset_ready = False
 
         # ===== レイアウト（勤怠一覧と同じ 3 行構成） =====
         # 行: 0=タイトル, 1=ツールバー（薄灰）, 2=メイン
@@ -272,20 +265,41 @@ class FaceClockScreen(ctk.CTkFrame):
             anchor="center",
         )
         self.preview.pack(padx=8, pady=8)
+        self.renderer = PreviewRenderer(self.preview)
 
-        # ---- 顔データ（非同期） ----
-        self.name_map: dict[str, str] = {}
-        self.des_map: dict[str, list[np.ndarray]] = {}
+        # 打刻結果の通知（映像の上に重ねて出し、自動で消える。カメラのループは止めない）
+        self.toast = Toast(self.cam_border, duration_ms=self.TOAST_MS)
 
         # ---- カメラ起動 ----
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+        with inst.span("clock.camera_open"):
+            # device は カメラ番号 / 動画ファイル / 連番画像フォルダ のどれでもよい（再現テスト用）
+            self.cap = open_source(self.camera_cfg.get("device", 0), self.camera_cfg)
         self._after_id: str | None = None
 
+        # ---- 性能 HUD ----
+        self._hud: PipelineStats | None = None
+        self._hud_next_t = 0.0
+        if self.SHOW_HUD:
+            self._hud = PipelineStats(camera_fps=float(self.cap.get(cv2.CAP_PROP_FPS) or 0.0))
+            self.pipeline.stats = self._hud
+            self.hud_var = tk.StringVar(value="")
+            ctk.CTkLabel(
+                self.cam_border,
+                textvariable=self.hud_var,
+                font=("Consolas", 12),
+                fg_color="#111827",
+                text_color="#F9FAFB",
+                corner_radius=6,
+                justify="left",
+                anchor="w",
+            ).place(x=16, y=16)
+
         # リサイズ連動（中央カラム幅に合わせる）
         self.bind("<Configure>", self._on_resize)
 
+        # 読込スレッドからの表示更新は UiDispatcher 経由（Tk にはスレッドから触らない）
+        self.ui = UiDispatcher(self).start()
+
         # ★ 非同期：顔データ読み込み開始（UIを先に表示して固まりを防ぐ）
         self._update_buttons(can_enable=False)
         self.after(50, self._start_reload_dataset_async)
@@ -295,15 +309,26 @@ class FaceClockScreen(ctk.CTkFrame):
 
     # ---------- 顔データ読み込み：非同期開始 ----------
     def _start_reload_dataset_async(self):
+        last_pct = [-1]
+
+        def on_progress(done, total):
+            pct = int(done * 100 / max(total, 1))
+            if pct == last_pct[0]:
+                return
+            last_pct[0] = pct
+            self.ui.post(
+                self.message_var.set, f"起動中…（顔データを読み込んでいます {done}/{total}）",
+                key="load_progress",
+            )
+
         def worker():
+            # 照合はこの間も旧ギャラリーで続く（matcher.load は組み上がった版を 1 回で差し替える）
             try:
-                self._reload_dataset(initial=True)
-                self._dataset_ready = True
-                self.after(0, lambda: self.message_var.set("カメラに顔を向けてください。"))
+                self._reload_dataset(initial=True, progress=on_progress)
+                self.ui.post(self.message_var.set, "カメラに顔を向けてください。")
             except Exception:
-                self._dataset_ready = False
-                self.after(0, lambda: self.message_var.set("顔データの読み込みに失敗しました。"))
-        threading.Thread(target=worker, daemon=True).start()
+                self.ui.post(self.message_var.set, "顔データの読み込みに失敗しました。")
+        threading.Thread(target=worker, name="gallery-load", daemon=True).start()
 
     # ---------- 推定情報（横並びペア） ----------
     def _kv_inline(self, parent, label, var):
@@ -336,312 +361,120 @@ class FaceClockScreen(ctk.CTkFrame):
 
     # ---------- UIリセット ----------
     def _reset_recognition_ui(self, reason=None):
-        self.last_best = ("", 0)
         self._current_code_ui = ""
+        self.auto_punch.reset()
         self.allowed_next_set = set()
         self.rec_code_var.set("--")
         self.rec_name_var.set("--")
-        self._id_ok_streak = 0
-        self._last_candidate = ""
         if reason:
             self.message_var.set(reason)
         self._update_buttons(can_enable=False)
 
     # ---------- カメラループ ----------
     def _loop(self):
-        ok, frame = self.cap.read()
+        self.pacer.begin()
+        with inst.span("clock.loop"):
+            self._tick()
+        # 処理時間を差し引いて次回を予約（無人のときは低頻度に落とす）
+        self._after_id = self.after(self.pacer.next_delay_ms(self._face_seen), self._loop)
+
+    def _tick(self):
+        hud = self._hud
+        self._face_seen = False
+        with inst.span("clock.read"):
+            ok, frame = self.cap.read()
 
         # ★ frame が取れないときは落ちずに次へ
         if not ok or frame is None:
-            self._after_id = self.after(30, self._loop)
+            if hud is not None:
+                hud.on_read_failed()
             return
 
-        annotated, stable_ok, face_rect, gray = self._evaluate_and_draw(frame)
-
-        # ★ 顔データがまだ準備できていない間は、映像表示だけして認識はしない
-        if not self._dataset_ready:
-            self._update_buttons(can_enable=False)
+        if hud is not None:
+            hud.on_frame()
 
-            rgb = cv2.cvtColor(annotated, cv2.COLOR_BGR2RGB)
-            rgb = cv2.resize(rgb, (self.cam_w, self.cam_h))
-            pil_img = Image.fromarray(rgb)
-            self._cam_image = ctk.CTkImage(
-                light_image=pil_img,
-                dark_image=pil_img,
-                size=(self.cam_w, self.cam_h),
-            )
-            self.preview.configure(image=self._cam_image)
-
-            self.frame_count += 1
-            self._after_id = self.after(30, self._loop)
-            return
-
-        # 認識は間引き実行
-        if (
-            stable_ok
-            and face_rect is not None
-            and gray is not None
-            and (self.frame_count % self.RECOG_INTERVAL == 0)
-        ):
-            x, y, w, h = face_rect
-            face_roi = gray[y: y + h, x: x + w]
-
-            code, best, second = self._recognize(face_roi)
-            self.last_best = (code or "", best)
-
-            # ✅ 誤認識を減らす：Unknown 判定を強める
-            unknown = False
-            if code is None or best < self.MATCH_THRESHOLD:
-                unknown = True
-            else:
-                gap = best - second
-
-                # margin_ratio: (best-second)/best（大きいほど「独走」）
-                margin_ratio = (best - second) / max(best, 1)
-
-                # best/second の比（大きいほど「独走」）
-                best_second_ratio = best / max(second, 1)
-
-                # ★重要：AND → OR（どちらか弱ければ Unknown に倒す）
-                if (gap < self.UNKNOWN_MIN_GAP) or (margin_ratio < self.UNKNOWN_MARGIN_RATIO) or (best_second_ratio < self.BEST_SECOND_RATIO):
-                    unknown = True
-
-            if unknown:
-                self._reset_recognition_ui(
-                    "未登録の顔、または一致度が低いため認証できません。"
-                )
-            else:
-                if code == self._last_candidate:
-                    self._id_ok_streak += 1
-                else:
-                    self._last_candidate = code
-                    self._id_ok_streak = 1
-
-                if self._id_ok_streak < self.ID_OK_FRAMES:
-                    self.rec_code_var.set(code)
-                    self.rec_name_var.set(self.name_map.get(code, "--"))
-                    self.message_var.set("確認中…（ぶれずに少し静止してください）")
-                else:
-                    name = self.name_map.get(code, "--")
-                    self.rec_code_var.set(code)
-                    self.rec_name_var.set(name)
-                    if code != self._current_code_ui:
-                        self._current_code_ui = code
-                        last = self.att_svc.last_state(code)
-                        self.allowed_next_set = self.att_svc.allowed_next(last)
-                    self.message_var.set("顔を認識しました。打刻が可能です。")
-
-        # ボタン状態
-        can_enable = (
-            stable_ok
-            and (self._id_ok_streak >= self.ID_OK_FRAMES)
-            and (self.last_best[0] != "")
-        )
-        self._update_buttons(can_enable=can_enable)
+        # 動き検知 → 顔検出 + 品質評価 → 間引き照合 → 確定判定
+        res = self.pipeline.process(frame)
+        self._face_seen = self.pipeline.face_seen
+        self._apply_result(res)
 
         # カメラ表示
-        rgb = cv2.cvtColor(annotated, cv2.COLOR_BGR2RGB)
-        rgb = cv2.resize(rgb, (self.cam_w, self.cam_h))
-        pil_img = Image.fromarray(rgb)
-        self._cam_image = ctk.CTkImage(
-            light_image=pil_img,
-            dark_image=pil_img,
-            size=(self.cam_w, self.cam_h),
-        )
-        self.preview.configure(image=self._cam_image)
-
-        self.frame_count += 1
-        self._after_id = self.after(30, self._loop)
-
-    # ---------- 顔検出 + 品質評価 ----------
-    def _evaluate_and_draw(self, frame_bgr):
-        # frame が無効なケースをガード
-        if frame_bgr is None:
-            return frame_bgr, False, None, None
-
-        h, w = frame_bgr.shape[:2]
-        if h <= 0 or w <= 0:
-            return frame_bgr, False, None, None
-
-        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
-        if gray is None or gray.size == 0:
-            return frame_bgr, False, None, gray
-
-        # cascade が空なら落ちないように
-        if self.face_cascade.empty():
-            self._quality_ok_streak = 0
-            if self._dataset_ready:
-                self.message_var.set("顔検出器の読み込みに失敗しました（Cascade が空です）。")
-            return frame_bgr, False, None, gray
-
-        # detectMultiScale は環境によって例外が出ることがあるので保護
-        try:
-            faces = self.face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.1,
-                minNeighbors=5,
-                flags=cv2.CASCADE_SCALE_IMAGE,   # ★追加（互換性向上）
-                minSize=(120, 120),
-            )
-        except cv2.error:
-            self._quality_ok_streak = 0
-            if self._dataset_ready:
-                self.message_var.set("顔検出でエラーが発生しました。カメラ環境を確認してください。")
-            return frame_bgr, False, None, gray
-
-        if len(faces) == 0:
-            self._quality_ok_streak = 0
-            if self._dataset_ready:
-                self.message_var.set("顔を映してください。（正面・適度な距離）")
-            return frame_bgr, False, None, gray
-
-        x, y, fw, fh = max(faces, key=lambda r: r[2] * r[3])
-        roi_gray = gray[y: y + fh, x: x + fw]
-
-        area_ratio = (fw * fh) / (w * h)
-        blur = cv2.Laplacian(roi_gray, cv2.CV_64F).var()
-        bright = float(np.mean(roi_gray))
-
-        ok_size = area_ratio >= self.MIN_AREA_RATIO
-        ok_blur = blur >= self.MIN_BLUR_VAR
-        ok_light = self.BRIGHT_MIN <= bright <= self.BRIGHT_MAX
-
-        msgs = []
-        if not ok_size:
-            msgs.append("顔をもう少し近づけてください。")
-        if not ok_blur:
-            msgs.append("ピントが合っていません（ぶれ/ぼけ）。")
-        if not ok_light:
-            msgs.append("暗すぎ/明るすぎです。照明や露出を調整してください。")
-
-        all_ok = ok_size and ok_blur and ok_light
-        if all_ok:
-            self._quality_ok_streak += 1
-        else:
-            self._quality_ok_streak = 0
-
-        stable_ok = self._quality_ok_streak >= self.QUALITY_OK_FRAMES
-        if not stable_ok and self._dataset_ready:
-            self.message_var.set(" / ".join(msgs) or "調整中…")
-
-        color = (0, 200, 0) if stable_ok else (0, 165, 255) if msgs else (0, 200, 255)
-        cv2.rectangle(frame_bgr, (x, y), (x + fw, y + fh), color, 2)
-
-        return frame_bgr, stable_ok, (x, y, fw, fh), gray
-
-    # ---------- 顔特徴量マッチング（✅KNN + ratio test） ----------
-    def _recognize(self, roi_gray):
-        kp_l, des_l = self.orb.detectAndCompute(roi_gray, None)
-        if des_l is None or len(des_l) == 0:
-            return None, 0, 0
-
-        ratio = self.RATIO_TEST  # 0.70〜0.85 で調整
-
-        def good_count(des_a: np.ndarray, des_b: np.ndarray) -> int:
-            try:
-                knn = self.bf.knnMatch(des_a, des_b, k=2)
-            except cv2.error:
-                return 0
-
-            good = 0
-            for pair in knn:
-                if len(pair) < 2:
-                    continue
-                m, n = pair[0], pair[1]
-                if m.distance < ratio * n.distance:
-                    good += 1
-            return good
-
-        scores: list[tuple[str, int]] = []
-        for code, desc_list in self.des_map.items():
-            best_for_code = 0
-            for des_ref in desc_list:
-                c = good_count(des_l, des_ref)
-                if c > best_for_code:
-                    best_for_code = c
-            scores.append((code, best_for_code))
-
-        if not scores:
-            return None, 0, 0
-
-        scores.sort(key=lambda x: x[1], reverse=True)
-        best_code, best = scores[0]
-        second = scores[1][1] if len(scores) >= 2 else 0
-
-        if best <= 0:
-            return None, 0, 0
-        return best_code, best, second
+        self._render(res.frame)
+
+    def _apply_result(self, res):
+        """パイプラインの結果を表示（推定情報・メッセージ・ボタン）に反映する。"""
+        if res.reset:
+            self._reset_recognition_ui(res.message)
+        elif res.message is not None:
+            self.message_var.set(res.message)
+
+        if res.code:
+            self.rec_code_var.set(res.code)
+            self.rec_name_var.set(self.matcher.name_of(res.code))
+            if res.confirmed and res.code != self._current_code_ui:
+                self._current_code_ui = res.code
+                last = self.att_svc.last_state(res.code)
+                self.allowed_next_set = self.att_svc.allowed_next(last)
+
+        # 動きが無い間はボタンを触らない（ゲートが閉じた時点でリセット済み）
+        if not res.idle:
+            self._update_buttons(can_enable=res.can_punch)
+            if res.can_punch:
+                self._maybe_auto_punch()
+
+    def _maybe_auto_punch(self):
+        # 次に打てる打刻が 1 つだけなら、ボタンを待たずに打刻する（判定は AutoPunchGate）
+        kind = self.auto_punch.choose(self._current_code_ui, self.allowed_next_set)
+        if kind:
+            self._punch(kind, auto=True)
+
+    # ---------- カメラ表示 ----------
+    @inst.timed("clock.render")
+    def _render(self, annotated):
+        hud = self._hud
+        if hud is not None:
+            t0 = time.perf_counter()
+
+        # 確保済みバッファと 1 枚の PhotoImage を使い回す
+        self.renderer.render(annotated, (self.cam_w, self.cam_h))
+
+        if hud is not None:
+            now = time.perf_counter()
+            hud.add("render", (now - t0) * 1000.0)
+            # HUD の文字更新は 0.5 秒ごと（毎フレーム configure しない）
+            if now >= self._hud_next_t:
+                self._hud_next_t = now + 0.5
+                self.hud_var.set("\n".join(hud.lines()))
 
     # ---------- 顔データ再読込 ----------
-    def _reload_dataset(self, initial: bool = False):
-        self.name_map.clear()
-        self.des_map.clear()
-
-        for r in self.emp_repo.list_all():
-            self.name_map[r["code"]] = r["name"]
-
-        root = Path(__file__).resolve().parents[3] / "data" / "faces"
-        root.mkdir(parents=True, exist_ok=True)
-
-        for code in self.name_map.keys():
-            imgs = sorted(glob.glob(str(root / code / "*.jpg")))
-            if not imgs:
-                continue
-            imgs = imgs[-self.TOP_K_IMAGES:]
-
-            desc_list: list[np.ndarray] = []
-            for p in imgs:
-                img = cv2.imread(p)
-                if img is None:
-                    continue
-                gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-                # ★ ここも例外ガード（環境で落ちる可能性があるため）
-                try:
-                    faces = self.face_cascade.detectMultiScale(
-                        gray,
-                        scaleFactor=1.1,
-                        minNeighbors=5,
-                        flags=cv2.CASCADE_SCALE_IMAGE,
-                        minSize=(100, 100),
-                    )
-                except cv2.error:
-                    faces = []
-
-                roi = gray
-                if len(faces) > 0:
-                    x, y, w, h = max(faces, key=lambda r: r[2] * r[3])
-                    roi = gray[y: y + h, x: x + w]
-
-                kp, des = self.orb.detectAndCompute(roi, None)
-                if des is not None and len(des) > 0:
-                    desc_list.append(des)
-
-            if desc_list:
-                self.des_map[code] = desc_list
+    def _reload_dataset(self, initial: bool = False, progress=None):
+        # キャッシュに無い画像はプロセスプールで並列に計算される
+        # 組み上がったものを丸ごと差し替える（読込中も旧データで認識を続けられる）
+        self.matcher.load(self.gallery, self.TOP_K_IMAGES, progress=progress)
 
         if not initial:
             messagebox.showinfo("再読込", "顔データを再読み込みしました。")
 
     # ---------- 打刻 ----------
-    def _punch(self, kind: str):
-        code = self.last_best[0]
-        if not code or self._id_ok_streak < self.ID_OK_FRAMES:
-            messagebox.showwarning("未認識", "顔が確定していません。")
+    def _punch(self, kind: str, auto: bool = False):
+        # 結果は通知（Toast）で出す。モーダルにしないので次の人の認識がすぐ始められる
+        code = self.pipeline.confirmed_code
+        if not code:
+            self.toast.show("顔が確定していません。", kind="warn")
             return
 
         ok, msg, next_allowed = self.att_svc.punch(
             employee_code=code, new_type=kind
         )
+        self.allowed_next_set = next_allowed
         if ok:
-            messagebox.showinfo(
-                "打刻", f"{msg}\n（{code} / {self.name_map.get(code, '')}）"
-            )
-            self.allowed_next_set = next_allowed
+            # 手動で打った直後にも自動打刻しない（休憩開始のすぐ後に休憩終了、などを防ぐ）
+            self.auto_punch.punched(code)
+            prefix = "自動打刻: " if auto else ""
+            self.toast.show(f"{prefix}{msg}（{code} / {self.matcher.name_of(code, '')}）", kind="ok")
             self.message_var.set("打刻しました。")
         else:
-            messagebox.showwarning("打刻できません", msg)
-            self.allowed_next_set = next_allowed
+            self.toast.show(f"打刻できません: {msg}", kind="warn", duration_ms=self.TOAST_MS * 2)
         self._update_buttons(can_enable=True)
 
     # ---------- ボタン状態更新 ----------
@@ -656,6 +489,8 @@ class FaceClockScreen(ctk.CTkFrame):
 
     # ---------- 終了処理 ----------
     def destroy(self):
+        self.ui.stop()
+        self.toast.cancel()
         try:
             if self._after_id:
                 self.after_cancel(self._after_id)
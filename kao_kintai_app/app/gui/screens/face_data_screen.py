@@ -2,12 +2,15 @@ import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
 import cv2
-import numpy as np
-from PIL import Image, ImageTk
 
 from app.infra.db.employee_repo import EmployeeRepo
 from app.infra.storage.face_store import FaceStore
+from app.infra.camera.capture import open_source
 from app.services.config_service import ConfigService
+from app.services.face_detector import create_detector
+from app.gui.components.preview_renderer import PreviewRenderer
+from app.services.frame_pacer import FramePacer
+from app.services import face_quality
 
 
 class FaceDataScreen(ctk.CTkFrame):
@@ -35,10 +38,18 @@ class FaceDataScreen(ctk.CTkFrame):
 
         # ------------------ しきい値 ------------------
         cfg = ConfigService().get_vision()
+        # 顔検出は打刻画面と同じ方式（vision.detector）。Haar 以外が読めなければ Haar で続ける
+        self.detector = create_detector(cfg)
+        if self.detector.empty():
+            self.detector = None
         self.MIN_AREA_RATIO = float(cfg["min_area_ratio"])
         self.MIN_BLUR_VAR   = float(cfg["min_blur_var"])
         self.BRIGHT_MIN     = int(cfg["bright_min"])
         self.BRIGHT_MAX     = int(cfg["bright_max"])
+        self.KEEP_FULL_FRAME = bool(cfg.get("keep_full_frame", False))
+
+        self.pacer = FramePacer.from_config(cfg)
+        self._face_seen = False
 
         self.REQUIRED_OK_FRAMES = 1
         self.ok_streak = 0
@@ -84,6 +95,7 @@ class FaceDataScreen(ctk.CTkFrame):
 
         self.preview = ctk.CTkLabel(camera_wrap, text="")
         self.preview.pack()
+        self.renderer = PreviewRenderer(self.preview)
 
         # ==================================================
         # 右：操作パネル
@@ -208,16 +220,26 @@ class FaceDataScreen(ctk.CTkFrame):
         )
         self.btn_reset.pack(fill="x", padx=12, pady=(0, 0))
 
+        # 手作業でフォルダに画像を足した・消したときだけ使う（通常は保存・削除で索引が更新される）
+        self.btn_rescan = ctk.CTkButton(
+            right,
+            text="画像フォルダを再スキャン",
+            command=self._rescan,
+            font=BTN_FONT,
+        )
+        self.btn_rescan.pack(fill="x", padx=12, pady=(6, 0))
+
         # ------------------ カメラ ------------------
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+        camera_cfg = ConfigService().get_camera()
+        self.cap = open_source(camera_cfg.get("device", 0), camera_cfg)  # カメラ番号 / 動画 / 画像フォルダ
 
         self._after_id = None
         self._loop()
 
     # ================== ループ ==================
     def _loop(self):
+        self.pacer.begin()
+        self._face_seen = False
         ok, frame = self.cap.read()
         if ok:
             annotated, quality_ok = self._evaluate_and_draw(frame)
@@ -227,37 +249,25 @@ class FaceDataScreen(ctk.CTkFrame):
                 state="normal" if self.ok_streak >= self.REQUIRED_OK_FRAMES else "disabled"
             )
 
-            rgb = cv2.cvtColor(annotated, cv2.COLOR_BGR2RGB)
-            imgtk = ImageTk.PhotoImage(Image.fromarray(rgb))
-            self.preview.configure(image=imgtk)
-            self.preview.image = imgtk
+            self.renderer.render(annotated)
 
-        self._after_id = self.after(30, self._loop)
+        self._after_id = self.after(self.pacer.next_delay_ms(self._face_seen), self._loop)
 
     # ================== 品質評価 ==================
     def _evaluate_and_draw(self, frame):
-        h, w = frame.shape[:2]
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-        faces = self.face_cascade.detectMultiScale(gray, 1.1, 5, minSize=(120, 120))
-        if len(faces) == 0:
+        m = face_quality.measure(frame, self.face_cascade, self.eye_cascade, detector=self.detector)
+        self._face_seen = m is not None
+        if m is None:
             self._set_quality(False, None, None, None, None)
             self.message_var.set("顔を映してください。")
             return frame, False
 
-        x, y, fw, fh = max(faces, key=lambda r: r[2] * r[3])
-        roi_gray = gray[y:y+fh, x:x+fw]
-
-        area_ratio = (fw * fh) / (w * h)
-        blur = cv2.Laplacian(roi_gray, cv2.CV_64F).var()
-        bright = np.mean(roi_gray)
-
-        eyes = self.eye_cascade.detectMultiScale(roi_gray, 1.1, 8)
+        x, y, fw, fh = m["face"]
 
-        ok_size = area_ratio >= self.MIN_AREA_RATIO
-        ok_blur = blur >= self.MIN_BLUR_VAR
-        ok_light = self.BRIGHT_MIN <= bright <= self.BRIGHT_MAX
-        ok_eyes = len(eyes) >= 1
+        ok_size = m["area_ratio"] >= self.MIN_AREA_RATIO
+        ok_blur = m["blur"] >= self.MIN_BLUR_VAR
+        ok_light = self.BRIGHT_MIN <= m["brightness"] <= self.BRIGHT_MAX
+        ok_eyes = m["eyes"] >= 1
 
         all_ok = ok_size and ok_blur and ok_light and ok_eyes
         self._set_quality(True, ok_size, ok_blur, ok_light, ok_eyes)
@@ -285,7 +295,11 @@ class FaceDataScreen(ctk.CTkFrame):
             messagebox.showerror("エラー", "撮影に失敗しました")
             return
 
-        self.store.save_image(self.selected_code.get(), frame)
+        # 保存する 1 枚そのものの品質を測って一緒に記録する（ギャラリーの選別に使う）
+        # 顔が見つかれば検出枠で切り抜いた顔だけを保存する
+        metrics = face_quality.measure(frame, self.face_cascade, self.eye_cascade, detector=self.detector)
+        self.store.save_image(self.selected_code.get(), frame, metrics=metrics,
+                              keep_full=self.KEEP_FULL_FRAME)
         self.captured_count += 1
         self.count_label.configure(text=f"保存: {self.captured_count} / {self.target_count}")
 
@@ -293,6 +307,14 @@ class FaceDataScreen(ctk.CTkFrame):
         self.captured_count = 0
         self.count_label.configure(text=f"保存: 0 / {self.target_count}")
 
+    def _rescan(self):
+        r = self.store.sync_index()
+        messagebox.showinfo(
+            "再スキャン",
+            f"画像の索引を更新しました。\n追加: {r['added']} 件 / 削除: {r['removed']} 件\n"
+            "顔認証画面で再読込すると反映されます。"
+        )
+
     # ================== 従業員 ==================
     def _employee_options(self):
         rows = self.repo.list_all()
@@ -0,0 +1,192 @@
+# app/gui/screens/multi_camera_screen.py
+
+import customtkinter as ctk
+import tkinter as tk
+import time
+
+from app.services.punch_queue import shared_punch_queue
+from app.services.config_service import ConfigService
+from app.services.camera_worker import CameraWorkerPool
+from app.gui.components.preview_renderer import PreviewRenderer
+
+
+class _CameraTile(ctk.CTkFrame):
+    """カメラ 1 台分の表示（映像 / 推定者 / メッセージ / 打刻ボタン）"""
+
+    PUNCHES = (
+        ("CLOCK_IN", "出勤", "#1E8449", "#145A32"),
+        ("CLOCK_OUT", "退勤", "#B03A2E", "#7B241C"),
+        ("BREAK_START", "休憩開始", "#CA6F1E", "#A04000"),
+        ("BREAK_END", "休憩終了", "#2874A6", "#1B4F72"),
+    )
+
+    def __init__(self, master, worker, matcher, att_svc, preview_size):
+        super().__init__(
+            master,
+            fg_color="#E5E7EB",
+            corner_radius=6,
+            border_width=1,
+            border_color="#D1D5DB",
+        )
+        self.worker = worker
+        self.matcher = matcher
+        self.att_svc = att_svc
+        self.preview_size = preview_size
+
+        self._seq = 0
+        self._current_code_ui = ""
+        self.allowed_next_set = set()
+
+        self.title_var = tk.StringVar(value=f"{worker.name}（{worker.source}）")
+        self.person_var = tk.StringVar(value="--")
+        self.message_var = tk.StringVar(value="起動中…")
+
+        head = ctk.CTkFrame(self, fg_color="transparent")
+        head.pack(fill="x", padx=8, pady=(6, 0))
+        ctk.CTkLabel(head, textvariable=self.title_var, font=("Meiryo UI", 14, "bold")).pack(side="left")
+        ctk.CTkLabel(head, textvariable=self.person_var, font=("Meiryo UI", 14, "bold"),
+                     text_color="#333333").pack(side="right")
+
+        w, h = preview_size
+        self.preview = ctk.CTkLabel(self, text="", width=w, height=h)
+        self.preview.pack(padx=8, pady=4)
+        self.renderer = PreviewRenderer(self.preview)
+
+        ctk.CTkLabel(self, textvariable=self.message_var, anchor="w", justify="left",
+                     wraplength=w).pack(fill="x", padx=8)
+
+        btn_row = ctk.CTkFrame(self, fg_color="transparent")
+        btn_row.pack(fill="x", padx=8, pady=(4, 8))
+        self.buttons = {}
+        for i, (ptype, text, color, hover) in enumerate(self.PUNCHES):
+            btn_row.grid_columnconfigure(i, weight=1)
+            b = ctk.CTkButton(
+                btn_row, text=text, fg_color=color, hover_color=hover, text_color="#FFFFFF",
+                font=("Meiryo UI", 13, "bold"), height=36, state="disabled",
+                command=lambda t=ptype: self._punch(t),
+            )
+            b.grid(row=0, column=i, padx=4, sticky="ew")
+            self.buttons[ptype] = b
+
+    # ---------- 最新結果の反映（画面のタイマーから呼ぶ） ----------
+    def poll(self):
+        if self.worker.error:
+            self.message_var.set(self.worker.error)
+            return
+        seq, res = self.worker.latest()
+        if res is None or seq == self._seq:
+            return
+        self._seq = seq
+
+        if res.reset:
+            self._current_code_ui = ""
+            self.allowed_next_set = set()
+            self.person_var.set("--")
+            if res.message:
+                self.message_var.set(res.message)
+        elif res.message is not None:
+            self.message_var.set(res.message)
+
+        if res.code:
+            self.person_var.set(f"{res.code} {self.matcher.name_of(res.code)}")
+            if res.confirmed and res.code != self._current_code_ui:
+                self._current_code_ui = res.code
+                self.allowed_next_set = self.att_svc.allowed_next(self.att_svc.last_state(res.code))
+
+        if not res.idle:
+            self._update_buttons(res.can_punch)
+        self.renderer.render(res.frame, self.preview_size)
+
+    def _update_buttons(self, can_enable: bool):
+        for ptype, b in self.buttons.items():
+            b.configure(state="normal" if (can_enable and ptype in self.allowed_next_set) else "disabled")
+
+    def _punch(self, kind: str):
+        code = self._current_code_ui
+        if not code:
+            self.message_var.set("顔が確定していません。")
+            return
+        ok, msg, next_allowed = self.att_svc.punch(employee_code=code, new_type=kind)
+        self.allowed_next_set = next_allowed
+        name = self.matcher.name_of(code, "")
+        self.message_var.set(f"{msg}（{code} / {name}）" if ok else f"打刻できません：{msg}")
+        self._update_buttons(can_enable=True)
+
+
+class MultiCameraScreen(ctk.CTkFrame):
+    """
+    複数カメラの顔認証打刻（1 台の PC で入口カメラを何台も受け持つ）。
+    カメラごとにスレッドで取得・検出・照合し、顔データ（ギャラリー）は 1 回だけ読み込んで共有する。
+    """
+
+    PADX = 16
+    PADY = 8
+    TITLE_FONT = ("Meiryo UI", 22, "bold")
+    POLL_MS = 33
+    COLUMNS = 2
+
+    def __init__(self, master):
+        super().__init__(master)
+
+        cfg = ConfigService()
+        vcfg = cfg.get_vision()
+        camera_cfg = cfg.get_camera()
+        sources = camera_cfg.get("sources") or [camera_cfg.get("device", 0)]
+
+        self.att_svc = shared_punch_queue()  # 打刻画面と同じキュー（DB は専用スレッドが書く）
+        self.pool = CameraWorkerPool(sources, vcfg, camera_cfg)
+
+        self.grid_rowconfigure(2, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        ctk.CTkLabel(self, text="📹 複数カメラ 打刻", font=self.TITLE_FONT).grid(
+            row=0, column=0, sticky="w", padx=self.PADX, pady=(self.PADY * 2, self.PADY)
+        )
+        self.status_var = tk.StringVar(value="顔データを読み込んでいます…")
+        ctk.CTkLabel(self, textvariable=self.status_var, anchor="w").grid(
+            row=1, column=0, sticky="ew", padx=self.PADX, pady=(0, self.PADY)
+        )
+
+        grid = ctk.CTkScrollableFrame(self, fg_color="transparent")
+        grid.grid(row=2, column=0, sticky="nsew", padx=self.PADX, pady=(0, self.PADY * 2))
+        cols = min(self.COLUMNS, max(1, len(self.pool.workers)))
+        for c in range(cols):
+            grid.grid_columnconfigure(c, weight=1)
+
+        size = (640, 360) if cols == 1 else (480, 270)
+        self.tiles = []
+        for i, worker in enumerate(self.pool.workers):
+            tile = _CameraTile(grid, worker, self.pool.matcher, self.att_svc, size)
+            tile.grid(row=i // cols, column=i % cols, padx=6, pady=6, sticky="n")
+            self.tiles.append(tile)
+
+        self.pool.start()
+        self._status_next_t = 0.0
+        self._after_id = self.after(self.POLL_MS, self._poll)
+
+    def _poll(self):
+        for tile in self.tiles:
+            tile.poll()
+
+        # 状態表示の文字更新は 1 秒ごと
+        now = time.perf_counter()
+        if now >= self._status_next_t:
+            self._status_next_t = now + 1.0
+            self._update_status()
+        self._after_id = self.after(self.POLL_MS, self._poll)
+
+    def _update_status(self):
+        if self.pool.load_error:
+            self.status_var.set(f"顔データの読み込みに失敗しました：{self.pool.load_error}")
+        elif self.pool.matcher.ready:
+            fps = " / ".join(f"{w.name} {w.fps():.1f}fps" for w in self.pool.workers)
+            self.status_var.set(f"{len(self.pool.workers)} 台で認識中　{fps}")
+
+    def destroy(self):
+        try:
+            if self._after_id:
+                self.after_cancel(self._after_id)
+        except Exception:
+            pass
+        self.pool.stop()
+        super().destroy()
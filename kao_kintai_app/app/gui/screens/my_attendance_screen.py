@@ -10,6 +10,7 @@ import csv
 from app.infra.db.employee_repo import EmployeeRepo
 from app.infra.db.attendance_repo import AttendanceRepo
 from app.services.attendance_service import AttendanceService
+from app.services import instrumentation as inst
 
 
 # ===============================================================
@@ -362,6 +363,7 @@ class MyAttendanceScreen(ctk.CTkFrame):
         return s or e, e or s
 
     # ====== アクション ======
+    @inst.timed("tree_fill.my_attendance")
     def search(self):
         start, end = self._current_range()
         code = self._emp_code_selected()
@@ -6,6 +6,7 @@ import csv
 
 from app.infra.db.shift_repo import ShiftRepo
 from app.infra.db.employee_repo import EmployeeRepo
+from app.services import instrumentation as inst
 
 
 # =========================
@@ -321,6 +322,7 @@ class ShiftViewScreen(ctk.CTkFrame):
         self.start_var.set(s); self.end_var.set(e)
         self._search()
 
+    @inst.timed("tree_fill.shift_view")
     def _search(self):
         # データ取得
         s, e = self.start_var.get().strip(), self.end_var.get().strip()
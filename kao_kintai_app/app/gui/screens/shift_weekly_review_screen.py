@@ -8,6 +8,7 @@ from datetime import date, timedelta, datetime
 
 from app.infra.db.shift_repo import ShiftRepo
 from app.infra.db.employee_repo import EmployeeRepo
+from app.services import instrumentation as inst
 
 
 def _hhmm_to_minutes(hhmm: str) -> int:
@@ -240,6 +241,7 @@ class ShiftWeeklyReviewScreen(ctk.CTkFrame):
         return f"{s.strftime('%Y/%m/%d')} 〜 {e.strftime('%Y/%m/%d')}"
 
     # ------- ロード -------
+    @inst.timed("tree_fill.shift_weekly_review")
     def reload(self):
         # 週ラベル
         self.week_label.configure(text=self._week_label_text())
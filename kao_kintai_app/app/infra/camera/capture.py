@@ -0,0 +1,150 @@
+from __future__ import annotations
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+
+BACKENDS = {
+    "auto": cv2.CAP_ANY,
+    "dshow": cv2.CAP_DSHOW,   # Windows: 起動が速い
+    "msmf": cv2.CAP_MSMF,     # Windows: 既定
+    "v4l2": cv2.CAP_V4L2,     # Linux
+}
+
+
+def open_video_capture(cfg: Dict[str, Any]) -> cv2.VideoCapture:
+    """
+    設定どおりに VideoCapture を開く。
+    FOURCC は解像度より先に設定する（バックエンドによっては後だと効かない）。
+    """
+    backend = BACKENDS.get(str(cfg.get("backend", "auto")).lower(), cv2.CAP_ANY)
+    cap = cv2.VideoCapture(int(cfg.get("device", 0)), backend)
+    fourcc = str(cfg.get("fourcc") or "")
+    if len(fourcc) == 4:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, int(cfg.get("width", 1280)))
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, int(cfg.get("height", 720)))
+    if cfg.get("fps"):
+        cap.set(cv2.CAP_PROP_FPS, float(cfg["fps"]))
+    if cfg.get("buffer_size"):
+        # ドライバ側に古いフレームが溜まらないようにする（未対応の環境では無視される）
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, int(cfg["buffer_size"]))
+    return cap
+
+
+class CameraCapture:
+    """
+    cv2.VideoCapture と同じ使い方（read / get / isOpened / release）のラッパー。
+
+    grab_latest=True のとき:
+      裏のスレッドが grab() を回し続けてドライバのバッファを空にしておき、
+      read() が呼ばれたら「その直後に取れたフレーム」だけを retrieve（デコード）して返す。
+      → 古いフレームを処理しない / 使わないフレームはデコードしない。
+    read() の待ちの上限は、実際にフレームが届いた間隔から決める（要求 FPS を無視するカメラ・
+    暗所で遅くなるカメラでも取りこぼし扱いにしない）。
+    """
+
+    MIN_WAIT_SEC = 0.5   # read() の待ちの下限
+
+    def __init__(self, cfg: Dict[str, Any]):
+        self.cfg = dict(cfg)
+        self.cap = open_video_capture(self.cfg)
+        self.grab_latest = bool(self.cfg.get("grab_latest", True))
+
+        fps = float(self.cfg.get("fps") or 30)
+        self._interval = 1.0 / max(fps, 1.0)  # フレームが届く間隔（実測で更新する）
+
+        self._cap_lock = threading.Lock()  # grab / retrieve / set を同時に呼ばない
+        self._cond = threading.Condition()
+        self._want = False
+        self._frame: Optional[Tuple[bool, Any]] = None
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+        if self.grab_latest and self.cap.isOpened():
+            self._thread = threading.Thread(target=self._grab_loop, name="camera-grab", daemon=True)
+            self._thread.start()
+
+    # ---- 裏スレッド ----
+    def _grab_loop(self):
+        last_t = None
+        while not self._stop:
+            with self._cap_lock:
+                ok = self.cap.grab()
+            if not ok:
+                last_t = None
+                with self._cond:
+                    if self._want:
+                        self._frame = (False, None)
+                        self._want = False
+                        self._cond.notify_all()
+                    # デバイス切断などで grab が失敗し続けるときに空回りしない
+                    self._cond.wait(timeout=0.05)
+                continue
+            now = time.perf_counter()
+            if last_t is not None:
+                self._interval += 0.1 * ((now - last_t) - self._interval)
+            last_t = now
+            with self._cond:
+                if self._want:
+                    with self._cap_lock:
+                        self._frame = self.cap.retrieve()
+                    self._want = False
+                    self._cond.notify_all()
+
+    # ---- VideoCapture 互換 ----
+    def read(self):
+        if self._thread is None:
+            return self.cap.read()
+        with self._cond:
+            self._frame = None
+            self._want = True
+            self._cond.wait_for(lambda: self._frame is not None, timeout=self.wait_timeout)
+            frame = self._frame
+            self._frame = None
+            self._want = False
+        return frame if frame is not None else (False, None)
+
+    @property
+    def wait_timeout(self) -> float:
+        return max(self.MIN_WAIT_SEC, 3.0 * self._interval)
+
+    def get(self, prop):
+        with self._cap_lock:
+            return self.cap.get(prop)
+
+    def set(self, prop, value):
+        # 裏スレッドの grab() と同時に呼ぶとドライバによっては落ちるので同じロックで守る
+        with self._cap_lock:
+            return self.cap.set(prop, value)
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def release(self) -> None:
+        self._stop = True
+        if self._thread is not None:
+            with self._cond:
+                self._cond.notify_all()
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.cap.release()
+
+
+def open_source(source, cfg: Dict[str, Any], realtime: bool = True, loop: bool = False):
+    """
+    取得元を開く。
+      - int / 数字の文字列 → カメラ番号（cfg の解像度・FPS などを適用）
+      - フォルダ → 連番画像（ImageSequenceSource）
+      - それ以外 → 動画ファイル（VideoFileSource）
+    realtime=False なら動画・連番画像をできるだけ速く流す（ベンチマーク用）。
+    """
+    from app.infra.camera.file_source import ImageSequenceSource, VideoFileSource
+
+    if isinstance(source, int) or str(source).strip().isdigit():
+        return CameraCapture({**cfg, "device": int(source)})
+    if Path(str(source)).is_dir():
+        return ImageSequenceSource(str(source), realtime=realtime, loop=loop,
+                                   fps=float(cfg.get("fps") or 30))
+    return VideoFileSource(str(source), realtime=realtime, loop=loop)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import cv2
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class _PlaybackClock:
+    """
+    realtime=True のときだけ、元の FPS どおりの時刻までフレームの受け渡しを待たせる。
+    処理が遅れた分は追いつこうとせず、そのまま遅れて返す（実カメラと違い捨てはしない）。
+    """
+
+    def __init__(self, fps: float, realtime: bool):
+        self.period = 1.0 / fps if fps > 0 else 0.0
+        self.realtime = realtime and self.period > 0
+        self._next_t: Optional[float] = None
+
+    def wait(self) -> None:
+        if not self.realtime:
+            return
+        now = time.perf_counter()
+        if self._next_t is None:
+            self._next_t = now
+        elif now < self._next_t:
+            time.sleep(self._next_t - now)
+        self._next_t = max(self._next_t + self.period, time.perf_counter())
+
+
+class VideoFileSource:
+    """
+    動画ファイルを cv2.VideoCapture と同じ使い方（read / get / isOpened / release）で読む。
+      - realtime=True  : 動画の FPS どおりに返す（カメラの代わり）
+      - realtime=False : できるだけ速く返す（スループット測定用）
+      - loop=True      : 最後まで読んだら先頭に戻る
+    """
+
+    finite = True  # 終わりがある取得元（カメラと区別する）
+
+    def __init__(self, path: str, realtime: bool = True, loop: bool = False, fps: float = 0.0):
+        self.path = str(path)
+        self.cap = cv2.VideoCapture(self.path)
+        self.loop = loop
+        self.fps = float(fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0)
+        self._clock = _PlaybackClock(self.fps, realtime)
+
+    def read(self):
+        self._clock.wait()
+        ok, frame = self.cap.read()
+        if not ok and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read()
+        return ok, frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def release(self) -> None:
+        self.cap.release()
+
+
+class ImageSequenceSource:
+    """
+    フォルダ内の画像（ファイル名順）を 1 枚 = 1 フレームとして読む。
+    使い方・realtime / loop の意味は VideoFileSource と同じ。
+    """
+
+    finite = True  # 終わりがある取得元（カメラと区別する）
+
+    def __init__(self, folder: str, realtime: bool = True, loop: bool = False, fps: float = 30.0):
+        self.folder = Path(folder)
+        self.files: List[Path] = sorted(
+            p for p in self.folder.iterdir() if p.suffix.lower() in IMAGE_EXTS
+        ) if self.folder.is_dir() else []
+        self.loop = loop
+        self.fps = float(fps or 30.0)
+        self._clock = _PlaybackClock(self.fps, realtime)
+        self._pos = 0
+        self._w = self._h = 0
+
+    def read(self):
+        if self._pos >= len(self.files):
+            if not (self.loop and self.files):
+                return False, None
+            self._pos = 0
+        self._clock.wait()
+        path = self.files[self._pos]
+        self._pos += 1
+        frame = cv2.imread(str(path))
+        if frame is None:
+            return False, None
+        self._h, self._w = frame.shape[:2]
+        return True, frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self.files))
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self._pos)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self._w)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self._h)
+        return 0.0
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self._pos = max(0, min(int(value), len(self.files)))
+            return True
+        return False
+
+    def isOpened(self) -> bool:
+        return bool(self.files)
+
+    def release(self) -> None:
+        self.files = []
@@ -2,8 +2,10 @@
 import sqlite3
 from pathlib import Path
 from typing import Optional, Dict
-import bcrypt
 
+from app.services import instrumentation as inst
+
+@inst.instrument_methods("repo.admin")
 class AdminRepo:
     def __init__(self):
         self.db_path = Path(__file__).resolve().parents[3] / "data" / "db" / "kintai.sqlite3"
@@ -51,6 +53,7 @@ class AdminRepo:
 
     # app/infra/db/admin_repo.py の create() を置き換え
     def create(self, *, username: str, display_name: str, password_plain: str, role: str = "admin", is_active: bool = True) -> int:
+        import bcrypt  # 起動時間短縮のため使う時に読み込む
         role = (role or "admin").lower()
         if role not in ("admin", "su"):
             role = "admin"
@@ -86,6 +89,7 @@ class AdminRepo:
         user = self.find_by_username(username)
         if not user or not user["is_active"]:
             return None
+        import bcrypt  # 起動時間短縮のため使う時に読み込む
         try:
             if bcrypt.checkpw(password_plain.encode("utf-8"), user["pw_hash"]):
                 return user
@@ -2,6 +2,9 @@ import sqlite3
 from pathlib import Path
 from datetime import datetime
 
+from app.services import instrumentation as inst
+
+@inst.instrument_methods("repo.attendance")
 class AttendanceRepo:
     def __init__(self):
         self.project_root = Path(__file__).resolve().parents[3]
@@ -26,6 +29,11 @@ class AttendanceRepo:
             # 検索高速化
             con.execute("CREATE INDEX IF NOT EXISTS idx_attendance_emp_ts ON attendance(employee_code, ts);")
             con.execute("CREATE INDEX IF NOT EXISTS idx_attendance_ts ON attendance(ts);")
+            # 打刻キュー（PunchQueue）の打刻ID。ジャーナルを再生しても二重に入らないようにする
+            cols = [r[1] for r in con.execute("PRAGMA table_info(attendance)").fetchall()]
+            if "punch_uid" not in cols:
+                con.execute("ALTER TABLE attendance ADD COLUMN punch_uid TEXT")
+            con.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_uid ON attendance(punch_uid);")
             con.commit()
 
     # ========= CRUD =========
@@ -38,6 +46,18 @@ class AttendanceRepo:
             )
             con.commit()
 
+    def add_many(self, rows):
+        """
+        rows: [(punch_uid, employee_code, punch_type, ts)] を 1 トランザクションで追加（commit = fsync 1 回）。
+        同じ punch_uid が既にあれば飛ばす（ジャーナル再生の二重登録防止）。
+        """
+        with self._connect() as con:
+            con.executemany(
+                "INSERT OR IGNORE INTO attendance(punch_uid,employee_code,punch_type,ts) VALUES (?,?,?,?)",
+                rows,
+            )
+            con.commit()
+
     def get_last(self, employee_code: str):
         """その従業員の直近の打刻1件を返す（なければ None）。"""
         with self._connect() as con:
@@ -3,6 +3,9 @@ import sqlite3, string, random
 from pathlib import Path
 from datetime import datetime
 
+from app.services import instrumentation as inst
+
+@inst.instrument_methods("repo.employee")
 class EmployeeRepo:
     def __init__(self):
         # プロジェクトルート/ data/db/kintai.sqlite3
@@ -87,6 +90,34 @@ class EmployeeRepo:
             con.commit()
         return code
 
+    def create_many(self, rows: list[dict]) -> list[str]:
+        """
+        複数の従業員を 1 トランザクションで登録し、採番したコードを rows と同じ順で返す。
+        rows: [{"name": str, "role": str, "wage": float | None}, ...]
+        途中で失敗した場合は全件ロールバック。
+        """
+        now = datetime.now().isoformat()
+        codes: list[str] = []
+        con = self._connect()
+        try:
+            with con:
+                used = {r[0] for r in con.execute("SELECT code FROM employees")}
+                params = []
+                for row in rows:
+                    code = self._generate_unique_code(used=used)
+                    used.add(code)
+                    codes.append(code)
+                    params.append(
+                        (code, row["name"], row.get("role") or "USER", 1, now, row.get("wage"))
+                    )
+                con.executemany(
+                    "INSERT INTO employees(code,name,role,active,created_at,wage) VALUES (?,?,?,?,?,?)",
+                    params,
+                )
+        finally:
+            con.close()
+        return codes
+
     def update(self, code: str, name: str, role: str, active: bool, wage: float | None = None):
         with self._connect() as con:
             if wage is None:
@@ -117,9 +148,12 @@ class EmployeeRepo:
             con.commit()
 
     # ===== helpers =====
-    def _generate_unique_code(self, length: int = 8) -> str:
+    def _generate_unique_code(self, length: int = 8, used: set[str] | None = None) -> str:
         chars = string.ascii_uppercase + string.digits
         while True:
             code = "".join(random.choices(chars, k=length))
-            if not self.get(code):
+            if used is not None:
+                if code not in used:
+                    return code
+            elif not self.get(code):
                 return code
@@ -0,0 +1,278 @@
+# app/infra/db/face_image_repo.py
+import sqlite3
+from pathlib import Path
+from datetime import datetime
+
+from app.services import instrumentation as inst
+
+
+@inst.instrument_methods("repo.face_image")
+class FaceImageRepo:
+    """
+    登録顔画像の索引（FaceStore が保存・削除のたびに更新する）。
+    一覧・枚数・ギャラリー用の選別はフォルダを走査せずにこの表への問い合わせで行う。
+      path              : 顔データフォルダ（data/faces）からの相対パス "<code>/<file>.jpg"
+      size              : ファイルサイズ（バイト）
+      quality           : face_quality.score（顔が無ければ 0）
+      measured          : 品質を測ったか（0 = 取込直後などで未計測）
+      descriptor_offset : 記述子キャッシュ（<code>.npz の des）内の開始行。未計算なら NULL
+      is_crop           : 1 = 顔切り抜き（face_features.FACE_CROP_SIZE）を保存。0 = 撮影フレーム全体（旧形式）
+      face_x..face_h    : 撮影フレーム上の検出枠
+      full_path         : 撮影フレーム全体も残した場合の相対パス
+    """
+
+    def __init__(self):
+        # プロジェクトルート/ data/db/kintai.sqlite3
+        self.project_root = Path(__file__).resolve().parents[3]
+        self.db_path = self.project_root / "data" / "db" / "kintai.sqlite3"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_schema()
+        self._ensure_index_columns()  # 品質だけ記録していた既存DBにも列を足す
+
+    # ===== 基本接続 =====
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+    # ===== スキーマ初期化 =====
+    def _init_schema(self):
+        with self._connect() as con:
+            con.execute("""
+            CREATE TABLE IF NOT EXISTS face_images(
+              id                INTEGER PRIMARY KEY AUTOINCREMENT,
+              employee_code     TEXT NOT NULL,
+              path              TEXT NOT NULL UNIQUE,
+              captured_at       TEXT NOT NULL,
+              area_ratio        REAL,
+              blur              REAL,
+              brightness        REAL,
+              eyes              INTEGER,
+              quality           REAL NOT NULL DEFAULT 0,   -- face_quality.score（顔が無ければ 0）
+              size              INTEGER NOT NULL DEFAULT 0,
+              measured          INTEGER NOT NULL DEFAULT 1,
+              descriptor_offset INTEGER,
+              is_crop           INTEGER NOT NULL DEFAULT 0,
+              face_x            INTEGER,
+              face_y            INTEGER,
+              face_w            INTEGER,
+              face_h            INTEGER,
+              full_path         TEXT
+            );
+            """)
+            con.execute(
+                "CREATE INDEX IF NOT EXISTS idx_face_images_code_quality "
+                "ON face_images(employee_code, quality DESC)"
+            )
+            con.commit()
+
+    def _ensure_index_columns(self):
+        """品質指標だけの face_images（旧版）に索引用の列を追加（後方互換）。"""
+        with self._connect() as con:
+            cols = [r[1] for r in con.execute("PRAGMA table_info(face_images)").fetchall()]
+            if "size" not in cols:
+                con.execute("ALTER TABLE face_images ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            if "measured" not in cols:
+                con.execute("ALTER TABLE face_images ADD COLUMN measured INTEGER NOT NULL DEFAULT 1")
+            if "descriptor_offset" not in cols:
+                con.execute("ALTER TABLE face_images ADD COLUMN descriptor_offset INTEGER")
+            if "is_crop" not in cols:
+                con.execute("ALTER TABLE face_images ADD COLUMN is_crop INTEGER NOT NULL DEFAULT 0")
+                for c in ("face_x", "face_y", "face_w", "face_h"):
+                    con.execute(f"ALTER TABLE face_images ADD COLUMN {c} INTEGER")
+                con.execute("ALTER TABLE face_images ADD COLUMN full_path TEXT")
+            con.commit()
+
+    # ===== 登録 =====
+    @staticmethod
+    def _row(employee_code: str, path: str, size: int, metrics: dict | None,
+             quality: float | None, captured_at: str | None,
+             face_rect=None, full_path: str | None = None):
+        m = metrics or {}
+        fx, fy, fw, fh = (int(v) for v in face_rect) if face_rect is not None else (None,) * 4
+        return (
+            employee_code,
+            path,
+            captured_at or datetime.now().isoformat(timespec="seconds"),
+            int(size),
+            m.get("area_ratio"),
+            m.get("blur"),
+            m.get("brightness"),
+            m.get("eyes"),
+            float(quality or 0.0),
+            0 if quality is None else 1,
+            0 if face_rect is None else 1,
+            fx, fy, fw, fh,
+            full_path,
+        )
+
+    _INSERT = """
+        INSERT INTO face_images(employee_code,path,captured_at,size,area_ratio,blur,brightness,eyes,quality,measured,
+                                is_crop,face_x,face_y,face_w,face_h,full_path)
+        VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+        ON CONFLICT(path) DO UPDATE SET
+          size=excluded.size, area_ratio=excluded.area_ratio, blur=excluded.blur,
+          brightness=excluded.brightness, eyes=excluded.eyes, quality=excluded.quality,
+          measured=excluded.measured, descriptor_offset=NULL,
+          is_crop=excluded.is_crop, face_x=excluded.face_x, face_y=excluded.face_y,
+          face_w=excluded.face_w, face_h=excluded.face_h, full_path=excluded.full_path
+    """
+
+    def add(self, employee_code: str, path: str, size: int, metrics: dict | None = None,
+            quality: float | None = None, captured_at: str | None = None,
+            face_rect=None, full_path: str | None = None):
+        """
+        画像 1 枚を索引に登録。quality=None なら未計測として登録（後でギャラリー構築時に測る）。
+        face_rect を渡すと path は顔切り抜きとして登録する。
+        """
+        with self._connect() as con:
+            con.execute(self._INSERT, self._row(employee_code, path, size, metrics, quality, captured_at,
+                                                face_rect, full_path))
+            con.commit()
+
+    def add_many(self, rows: list[tuple]):
+        """rows: [(employee_code, path, size, metrics, quality, captured_at), ...] を 1 トランザクションで登録。"""
+        if not rows:
+            return
+        con = self._connect()
+        try:
+            with con:
+                con.executemany(self._INSERT, [self._row(*r) for r in rows])
+        finally:
+            con.close()
+
+    def set_quality_many(self, rows: list[tuple]):
+        """rows: [(path, metrics, quality), ...] 後追いで測った品質指標を記録。"""
+        if not rows:
+            return
+        con = self._connect()
+        try:
+            with con:
+                con.executemany(
+                    "UPDATE face_images SET area_ratio=?, blur=?, brightness=?, eyes=?, quality=?, measured=1 "
+                    "WHERE path=?",
+                    [
+                        ((m or {}).get("area_ratio"), (m or {}).get("blur"), (m or {}).get("brightness"),
+                         (m or {}).get("eyes"), float(q), p)
+                        for p, m, q in rows
+                    ],
+                )
+        finally:
+            con.close()
+
+    def set_descriptor_offsets(self, offsets: dict[str, int]):
+        """{相対パス: 記述子キャッシュ内の開始行}"""
+        if not offsets:
+            return
+        con = self._connect()
+        try:
+            with con:
+                con.executemany(
+                    "UPDATE face_images SET descriptor_offset=? WHERE path=?",
+                    [(int(o), p) for p, o in offsets.items()],
+                )
+        finally:
+            con.close()
+
+    # ===== 削除 =====
+    def full_path_of(self, path: str) -> str | None:
+        with self._connect() as con:
+            r = con.execute("SELECT full_path FROM face_images WHERE path=?", (path,)).fetchone()
+            return r[0] if r else None
+
+    def delete(self, path: str) -> int:
+        with self._connect() as con:
+            cur = con.execute("DELETE FROM face_images WHERE path=?", (path,))
+            con.commit()
+            return cur.rowcount
+
+    def delete_many(self, paths: list[str]) -> None:
+        if not paths:
+            return
+        con = self._connect()
+        try:
+            with con:
+                con.executemany("DELETE FROM face_images WHERE path=?", [(p,) for p in paths])
+        finally:
+            con.close()
+
+    def delete_employee(self, employee_code: str) -> int:
+        with self._connect() as con:
+            cur = con.execute("DELETE FROM face_images WHERE employee_code=?", (employee_code,))
+            con.commit()
+            return cur.rowcount
+
+    # ===== 参照 =====
+    @staticmethod
+    def _to_dict(r) -> dict:
+        return {
+            "employee_code": r[0],
+            "path": r[1],
+            "captured_at": r[2],
+            "size": r[3],
+            "quality": float(r[4]),
+            "measured": bool(r[5]),
+            "descriptor_offset": r[6],
+            "is_crop": bool(r[7]),
+            "face_rect": None if r[8] is None else (r[8], r[9], r[10], r[11]),
+            "full_path": r[12],
+        }
+
+    _COLS = ("employee_code,path,captured_at,size,quality,measured,descriptor_offset,"
+             "is_crop,face_x,face_y,face_w,face_h,full_path")
+
+    def list_by_employee(self, employee_code: str) -> list[dict]:
+        """撮影順（古い → 新しい）"""
+        with self._connect() as con:
+            cur = con.execute(
+                f"SELECT {self._COLS} FROM face_images WHERE employee_code=? ORDER BY path",
+                (employee_code,),
+            )
+            return [self._to_dict(r) for r in cur.fetchall()]
+
+    def best(self, employee_code: str, limit: int) -> list[tuple[str, bool]]:
+        """品質の高い順（同点は新しい順）に limit 件の (相対パス, 顔切り抜きか)。limit<=0 なら全件。"""
+        with self._connect() as con:
+            cur = con.execute(
+                "SELECT path, is_crop FROM face_images WHERE employee_code=? "
+                "ORDER BY quality DESC, path DESC LIMIT ?",
+                (employee_code, limit if limit > 0 else -1),
+            )
+            return [(r[0], bool(r[1])) for r in cur.fetchall()]
+
+    def unmeasured(self, employee_codes: list[str] | None = None) -> list[tuple[str, str]]:
+        """品質未計測の [(employee_code, 相対パス)]"""
+        with self._connect() as con:
+            cur = con.execute("SELECT employee_code, path FROM face_images WHERE measured=0")
+            rows = cur.fetchall()
+        if employee_codes is not None:
+            wanted = set(employee_codes)
+            rows = [r for r in rows if r[0] in wanted]
+        return [(r[0], r[1]) for r in rows]
+
+    def count(self, employee_code: str) -> int:
+        with self._connect() as con:
+            cur = con.execute("SELECT COUNT(*) FROM face_images WHERE employee_code=?", (employee_code,))
+            return int(cur.fetchone()[0])
+
+    def counts(self) -> dict[str, int]:
+        """{従業員コード: 枚数}（画像のある従業員のみ）"""
+        with self._connect() as con:
+            cur = con.execute("SELECT employee_code, COUNT(*) FROM face_images GROUP BY employee_code")
+            return {r[0]: int(r[1]) for r in cur.fetchall()}
+
+    def all_sizes(self) -> dict[str, int]:
+        """{相対パス: サイズ}（索引とフォルダの突き合わせ用）"""
+        with self._connect() as con:
+            return {r[0]: int(r[1]) for r in con.execute("SELECT path, size FROM face_images")}
+
+    def set_sizes(self, sizes: dict[str, int]):
+        if not sizes:
+            return
+        con = self._connect()
+        try:
+            with con:
+                con.executemany(
+                    "UPDATE face_images SET size=? WHERE path=?",
+                    [(int(n), p) for p, n in sizes.items()],
+                )
+        finally:
+            con.close()
@@ -6,7 +6,10 @@ from datetime import date, datetime
 from calendar import monthrange
 import re
 
+from app.services import instrumentation as inst
 
+
+@inst.instrument_methods("repo.shift")
 class ShiftRepo:
     def __init__(self):
         self.db_path = Path(__file__).resolve().parents[3] / "data" / "db" / "kintai.sqlite3"
@@ -0,0 +1,128 @@
+from __future__ import annotations
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+def _app_root() -> Path:
+    # FaceStore と同じ基準（exe化時は exe のあるフォルダ）
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).resolve().parent
+    return Path(__file__).resolve().parents[3]
+
+
+# 画像ファイル名 → (mtime, 記述子)
+Entries = Dict[str, Tuple[float, np.ndarray]]
+
+
+class DescriptorCache:
+    """
+    登録画像ごとの ORB 記述子キャッシュ（従業員ごとに 1 ファイル）。
+      data/cache/descriptors/<code>.npz
+        sig     : 特徴量パラメータ（face_features.FEATURE_SIGNATURE）
+        names   : 画像ファイル名
+        mtimes  : 画像の更新時刻（変わっていたら無効）
+        offsets : des 内の開始行（len(names)+1 個）
+        des     : 全画像の記述子を縦に連結したもの（uint8 N x 32）
+    """
+
+    def __init__(self, signature: str, subdir: str = "descriptors"):
+        self.signature = signature
+        # 埋め込み（embedding_matcher）も同じ形式で subdir="embeddings" に保存する
+        self.root = _app_root() / "data" / "cache" / subdir
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, employee_code: str) -> Path:
+        return self.root / f"{employee_code}.npz"
+
+    # ---- public ----
+    def load(self, employee_code: str) -> Entries:
+        p = self.path_for(employee_code)
+        if not p.exists():
+            return {}
+        try:
+            with np.load(p, allow_pickle=False) as z:
+                if str(z["sig"]) != self.signature:
+                    return {}
+                names = [str(n) for n in z["names"]]
+                mtimes = z["mtimes"]
+                offsets = z["offsets"]
+                des = z["des"]
+        except Exception:
+            # 壊れていたら作り直し扱い
+            return {}
+        return {
+            n: (float(mtimes[i]), des[offsets[i]: offsets[i + 1]])
+            for i, n in enumerate(names)
+        }
+
+    def get_valid(self, employee_code: str, image_paths) -> Dict[str, np.ndarray]:
+        """画像パスのうち、キャッシュが有効なものだけ {パス文字列: 記述子} で返す。"""
+        entries = self.load(employee_code)
+        out: Dict[str, np.ndarray] = {}
+        for p in image_paths:
+            p = Path(p)
+            hit = entries.get(p.name)
+            if hit is None:
+                continue
+            try:
+                if hit[0] != p.stat().st_mtime:
+                    continue
+            except OSError:
+                continue
+            out[str(p)] = hit[1]
+        return out
+
+    def update(self, employee_code: str, new_entries: Entries) -> Dict[str, int]:
+        """既存エントリにマージして保存（同名は上書き）。戻り値は save と同じ。"""
+        if not new_entries:
+            return {}
+        entries = self.load(employee_code)
+        entries.update(new_entries)
+        return self.save(employee_code, entries)
+
+    def update_from_paths(self, employee_code: str, des_by_path: Dict[str, np.ndarray]) -> Dict[str, int]:
+        new_entries: Entries = {}
+        for p, des in des_by_path.items():
+            if des is None:
+                continue
+            p = Path(p)
+            try:
+                new_entries[p.name] = (p.stat().st_mtime, des)
+            except OSError:
+                continue
+        return self.update(employee_code, new_entries)
+
+    def save(self, employee_code: str, entries: Entries) -> Dict[str, int]:
+        """保存して {画像ファイル名: des 内の開始行} を返す（画像索引の descriptor_offset 用）。"""
+        names = sorted(entries.keys())
+        offsets = [0]
+        chunks = []
+        for n in names:
+            des = entries[n][1]
+            chunks.append(des)
+            offsets.append(offsets[-1] + len(des))
+        des_all = np.vstack(chunks) if chunks else np.zeros((0, 32), dtype=np.uint8)
+
+        p = self.path_for(employee_code)
+        tmp = p.with_name(p.stem + ".tmp.npz")
+        np.savez(
+            tmp,
+            sig=np.array(self.signature),
+            names=np.array(names, dtype=str),
+            mtimes=np.array([entries[n][0] for n in names], dtype=np.float64),
+            offsets=np.array(offsets, dtype=np.int64),
+            des=des_all,
+        )
+        # 書き込み途中で落ちても壊れたファイルを残さない
+        os.replace(tmp, p)
+        return {n: offsets[i] for i, n in enumerate(names)}
+
+    def invalidate(self, employee_code: str) -> None:
+        try:
+            self.path_for(employee_code).unlink()
+        except FileNotFoundError:
+            pass
@@ -1,6 +1,6 @@
 from pathlib import Path
 from datetime import datetime
-import cv2
+import shutil
 import sys  # ← 追加
 
 
@@ -16,15 +16,169 @@ class FaceStore:
     def __init__(self):
         self.root = _app_root() / "data" / "faces"
         self.root.mkdir(parents=True, exist_ok=True)
+        self._image_repo = None
+
+    @property
+    def image_repo(self):
+        # 登録画像の索引（使う時に初めて DB を開く。初回だけ既存フォルダを取り込む）
+        if self._image_repo is None:
+            from app.infra.db.face_image_repo import FaceImageRepo
+            self._image_repo = FaceImageRepo()
+            if not (self.root / self.INDEX_MARKER).exists():
+                self.sync_index()
+        return self._image_repo
+
+    def rel_path(self, p: Path) -> str:
+        """data/faces からの相対パス（DB に記録する形）"""
+        return Path(p).resolve().relative_to(self.root.resolve()).as_posix()
+
+    def abs_path(self, rel: str) -> Path:
+        return self.root / rel
 
     def dir_for(self, employee_code: str) -> Path:
         d = self.root / employee_code
         d.mkdir(parents=True, exist_ok=True)
         return d
 
-    def save_image(self, employee_code: str, img_bgr) -> Path:
+    def _new_path(self, d: Path) -> Path:
+        # 連続保存（一括取込など）で時刻が重なっても上書きしないように連番を付ける
+        stem = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        p = d / f"{stem}.jpg"
+        n = 1
+        while p.exists():
+            p = d / f"{stem}_{n}.jpg"
+            n += 1
+        return p
+
+    # ===== 保存 =====
+    def save_image(self, employee_code: str, img_bgr, metrics: dict | None = None,
+                   face_rect=None, keep_full: bool = False) -> Path:
+        """
+        画像を保存して索引に登録する（撮影時の品質指標 = face_quality.measure の結果も一緒に）。
+          - 検出枠（face_rect、省略時は metrics["face"]）があれば顔だけを
+            face_features.FACE_CROP_SIZE に揃えて保存し、枠も記録する（読み込み時の検出が不要）。
+            keep_full=True なら撮影フレーム全体も <code>/full/ に残す。
+          - 枠が無ければフレーム全体を保存する（従来どおり）。
+        metrics 省略時は未計測として登録（ギャラリー構築時に一度だけ測る）。
+        """
+        import cv2  # 起動時間短縮のため使う時に読み込む
+        from app.services import face_features
+        d = self.dir_for(employee_code)
+        p = self._new_path(d)
+        if face_rect is None and metrics:
+            face_rect = metrics.get("face")
+
+        full_rel = None
+        if face_rect is not None:
+            cv2.imwrite(str(p), face_features.crop_face(img_bgr, face_rect))
+            if keep_full:
+                full = d / "full" / p.name
+                full.parent.mkdir(exist_ok=True)
+                cv2.imwrite(str(full), img_bgr)
+                full_rel = self.rel_path(full)
+        else:
+            cv2.imwrite(str(p), img_bgr)
+
+        quality = None
+        if metrics is not None:
+            from app.services import face_quality
+            quality = face_quality.score(metrics)
+        self.image_repo.add(
+            employee_code, self.rel_path(p), p.stat().st_size, metrics, quality,
+            face_rect=face_rect, full_path=full_rel,
+        )
+        return p
+
+    def import_file(self, employee_code: str, src: Path, record: bool = True) -> Path | None:
+        """
+        既存の写真ファイルを取り込む（JPEG はそのままコピー、それ以外は JPEG に変換）。
+        一括取込では record=False にして、最後に index_files でまとめて登録する。
+        """
+        src = Path(src)
         d = self.dir_for(employee_code)
-        fn = datetime.now().strftime("%Y%m%d_%H%M%S_%f") + ".jpg"
-        p = d / fn
-        cv2.imwrite(str(p), img_bgr)
+        p = self._new_path(d)
+        if src.suffix.lower() in (".jpg", ".jpeg"):
+            shutil.copyfile(src, p)
+        else:
+            import cv2
+            img = cv2.imread(str(src))
+            if img is None:
+                return None
+            cv2.imwrite(str(p), img)
+        if record:
+            self.index_files(employee_code, [p])
         return p
+
+    def index_files(self, employee_code: str, paths) -> None:
+        """保存済みファイルを未計測として索引に登録（1 トランザクション）。"""
+        self.image_repo.add_many([
+            (employee_code, self.rel_path(p), Path(p).stat().st_size, None, None, None)
+            for p in paths
+        ])
+
+    # ===== 参照（フォルダは走査せず索引から） =====
+    def list_images(self, employee_code: str) -> list[Path]:
+        """撮影順の画像パス"""
+        return [self.abs_path(r["path"]) for r in self.image_repo.list_by_employee(employee_code)]
+
+    def count(self, employee_code: str) -> int:
+        return self.image_repo.count(employee_code)
+
+    def counts(self) -> dict[str, int]:
+        return self.image_repo.counts()
+
+    # ===== 削除 =====
+    def delete_image(self, path) -> bool:
+        """
+        画像 1 枚を削除（ファイルと索引の両方）。path は絶対パスでも相対パスでもよい。
+        記述子キャッシュの該当エントリはファイルが無くなった時点で無効扱いになる。
+        """
+        p = Path(path)
+        if not p.is_absolute():
+            p = self.abs_path(str(path))
+        rel = self.rel_path(p)
+        full_rel = self.image_repo.full_path_of(rel)
+        for f in (p, self.abs_path(full_rel) if full_rel else None):
+            try:
+                if f is not None:
+                    f.unlink()
+            except FileNotFoundError:
+                pass
+        return self.image_repo.delete(rel) > 0
+
+    def delete_employee_images(self, employee_code: str) -> int:
+        """従業員の画像をすべて削除し、消した件数（索引上）を返す。"""
+        n = self.image_repo.delete_employee(employee_code)
+        shutil.rmtree(self.root / employee_code, ignore_errors=True)
+        return n
+
+    # ===== 索引の同期 =====
+    INDEX_MARKER = ".index_v1"
+
+    def sync_index(self) -> dict:
+        """
+        フォルダの実体と索引を突き合わせる（索引導入前のデータ取り込み・手作業でのファイル操作の後）。
+        無い行は未計測として追加、ファイルが消えた行は削除、サイズ未記録の行は埋める。
+        初回（INDEX_MARKER が無いとき）と、顔データ登録画面の「再スキャン」から呼ばれる。
+        戻り値: {"added": n, "removed": n}
+        """
+        repo = self.image_repo
+        known = repo.all_sizes()
+        on_disk = {}
+        for d in self.root.iterdir():
+            if not d.is_dir():
+                continue
+            for p in d.glob("*.jpg"):
+                on_disk[f"{d.name}/{p.name}"] = (d.name, p)
+        added = [
+            (code, rel, p.stat().st_size, None, None,
+             datetime.fromtimestamp(p.stat().st_mtime).isoformat(timespec="seconds"))
+            for rel, (code, p) in on_disk.items() if rel not in known
+        ]
+        removed = [rel for rel in known if rel not in on_disk]
+        sized = {rel: on_disk[rel][1].stat().st_size for rel, n in known.items() if not n and rel in on_disk}
+        repo.add_many(added)
+        repo.delete_many(removed)
+        repo.set_sizes(sized)
+        (self.root / self.INDEX_MARKER).touch()
+        return {"added": len(added), "removed": len(removed)}
@@ -0,0 +1,58 @@
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+from typing import Dict, List
+
+
+class PunchJournal:
+    """
+    打刻の先行書き込みログ（DB に入る前の打刻を 1 行 1 件の JSON で持つ）。
+      append : 行を OS へ書き出す（ここでプロセスが落ちても残る）
+      sync   : fsync（電源断にも耐える）。まとめて書く直前に 1 回だけ呼ぶ
+      clear  : 全件 DB に入ったら空にする
+    書き込み途中で切れた最後の行は read_all で読み飛ばし、読めた行だけで書き直す
+    （残したままだと次の append がその行の続きに書かれて 2 件とも読めなくなる）。
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "a", encoding="utf-8")
+
+    def read_all(self) -> List[Dict]:
+        out = []
+        damaged = False
+        with open(self.path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    damaged = True
+                    continue
+                damaged = damaged or not line.endswith("\n")
+        if damaged:
+            self._rewrite(out)
+        return out
+
+    def _rewrite(self, entries: List[Dict]) -> None:
+        self._f.truncate(0)
+        for e in entries:
+            self._f.write(json.dumps(e, ensure_ascii=False) + "\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def append(self, entry: Dict) -> None:
+        self._f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._f.flush()
+
+    def sync(self) -> None:
+        os.fsync(self._f.fileno())
+
+    def clear(self) -> None:
+        self._f.truncate(0)
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        self._f.close()
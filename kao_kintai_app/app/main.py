@@ -1,14 +1,18 @@
 # app/main.py
 import sys
 import json
+import multiprocessing
 from pathlib import Path
 
 # --- 直実行でも -m 実行でもインポートが通るようにパス調整 ---
 if __package__ is None or __package__ == "":
     sys.path.append(str(Path(__file__).resolve().parents[1]))
 
+from app.services import startup_timer
 from app.gui.app_shell import run_app
 
+startup_timer.mark("imports")
+
 DEFAULT_CONFIG = {
     "app_name": "Kao-Kintai (Skeleton)"
 }
@@ -41,7 +45,10 @@ def load_config() -> dict:
 
 def main() -> None:
     cfg = load_config()
+    startup_timer.mark("config loaded")
     run_app(cfg)
 
 if __name__ == "__main__":
+    # exe化後にプロセスプール（顔特徴量の並列計算）を使うため
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,230 @@
+# app/pipeline_bench.py
+"""
+顔認識パイプラインのベンチマーク（画面なし・カメラなしで動く）。
+打刻画面のループと同じ RecognitionPipeline に、動画ファイルや連番画像フォルダを流して
+処理できたフレーム数 / 秒と段ごとの所要時間を出す。
+
+  python -m app.pipeline_bench data/bench/clip.mp4
+  python app/pipeline_bench.py data/bench/frames --realtime --seconds 30
+  python app/pipeline_bench.py 0 --frames 300            # 実カメラ
+  python -m app.pipeline_bench data/bench/clip.mp4 --alloc  # 1 フレームあたりのメモリ確保量
+  python -m app.pipeline_bench data/bench/clip.mp4 --no-gallery --alloc-max-kb 64  # 超えたら終了コード 1
+
+--alloc は tracemalloc で pipeline.process 1 回の間に一時的に確保された量（ピーク - 開始時）を測る。
+numpy 配列（OpenCV の出力を含む）は数えるが、OpenCV 内部の C++ 側の確保は数えない。
+計測中は遅くなるので、時間の数字は --alloc なしで取ること。
+照合のフレームは記述子の確保が避けられないので、検出ループだけを見るときは --no-gallery を付ける
+（tests/test_recognition_pipeline.py も同じ上限で確かめている）。
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# --- 直実行でも -m 実行でもインポートが通るようにパス調整 ---
+if __package__ is None or __package__ == "":
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.infra.camera.capture import open_source
+from app.services.config_service import ConfigService
+from app.services.face_gallery_service import FaceGalleryService
+from app.services.face_matcher import RECOGNIZERS, create_matcher
+from app.services.instrumentation import RollingWindow
+from app.services.pipeline_stats import PipelineStats
+from app.services.recognition_pipeline import RecognitionPipeline
+
+
+def run(
+    source,
+    realtime: bool = False,
+    loop: bool = False,
+    max_frames: int = 0,
+    seconds: float = 0.0,
+    vision_overrides: dict | None = None,
+    load_gallery: bool = True,
+    trace_alloc: bool = False,
+    alloc_warmup: int = 10,
+) -> dict:
+    """
+    source を最後まで（または max_frames / seconds まで）流して結果を dict で返す。
+    trace_alloc=True なら最初の alloc_warmup フレーム（バッファ確保）を除いて 1 フレームの確保量も測る。
+    """
+    cfg = ConfigService()
+    vcfg = {**cfg.get_vision(), **(vision_overrides or {})}
+    camera_cfg = cfg.get_camera()
+
+    matcher = create_matcher(vcfg)
+    if matcher.empty():
+        raise SystemExit(f"照合モデルを読み込めませんでした（{matcher.error}）")
+    t0 = time.perf_counter()
+    if load_gallery:
+        matcher.load(FaceGalleryService(), int(vcfg.get("top_k_images", 5)))
+    gallery_ms = (time.perf_counter() - t0) * 1000.0
+
+    cap = open_source(source, camera_cfg, realtime=realtime, loop=loop)
+    if not cap.isOpened():
+        raise SystemExit(f"取得元を開けませんでした: {source}")
+
+    stats = PipelineStats(window=100_000)
+    pipeline = RecognitionPipeline(matcher, vcfg, stats=stats, span_prefix="bench")
+    if pipeline.detector.empty():
+        raise SystemExit(f"顔検出器を読み込めませんでした（{pipeline.detector.error}）")
+
+    frames = read_failed = idle = recognized = verified = 0
+    confirmed: dict[str, int] = {}
+    read_s = 0.0
+    alloc = RollingWindow(1_000_000)
+    if trace_alloc:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        while True:
+            if max_frames and frames >= max_frames:
+                break
+            if seconds and (time.perf_counter() - start) >= seconds:
+                break
+            r0 = time.perf_counter()
+            ok, frame = cap.read()
+            read_s += time.perf_counter() - r0
+            if not ok or frame is None:
+                if getattr(cap, "finite", False):
+                    break
+                read_failed += 1
+                continue
+
+            stats.on_frame()
+            measure = trace_alloc and frames >= alloc_warmup
+            if measure:
+                base = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            res = pipeline.process(frame)
+            if measure:
+                alloc.add((tracemalloc.get_traced_memory()[1] - base) / 1024.0)
+            frames += 1
+            idle += int(res.idle)
+            recognized += int(res.recognized)
+            verified += int(res.verified)
+            if res.confirmed and res.code:
+                confirmed[res.code] = confirmed.get(res.code, 0) + 1
+    finally:
+        cap.release()
+        if trace_alloc:
+            tracemalloc.stop()
+    elapsed = time.perf_counter() - start
+
+    stages = {}
+    for name, w in stats.stages.items():
+        if len(w):
+            p50, p95 = w.percentiles(50, 95)
+            stages[name] = {"count": len(w), "mean_ms": round(w.mean(), 3),
+                            "p50_ms": round(p50, 3), "p95_ms": round(p95, 3)}
+
+    result = {
+        "source": str(source),
+        "mode": "realtime" if realtime else "max",
+        "gallery_ms": round(gallery_ms, 1),
+        "gallery_people": len(matcher.des_map),
+        "gallery_descriptors": sum(len(d) for v in matcher.des_map.values() for d in v),
+        "frames": frames,
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+        "read_ms_mean": round(read_s * 1000.0 / max(frames, 1), 3),
+        "read_failed": read_failed,
+        "idle_frames": idle,
+        "recognized_frames": recognized,
+        "verified_frames": verified,
+        "confirmed": confirmed,
+        "stages": stages,
+    }
+    if len(alloc):
+        p50, p95 = alloc.percentiles(50, 95)
+        result["alloc_kb"] = {"count": len(alloc), "mean": round(alloc.mean(), 2),
+                              "p50": round(p50, 2), "p95": round(p95, 2), "max": round(max(alloc.values()), 2)}
+    return result
+
+
+def format_report(r: dict) -> str:
+    lines = [
+        f"source    {r['source']}  ({r['mode']})",
+        f"gallery   {r['gallery_people']} 人  記述子 {r['gallery_descriptors']}  {r['gallery_ms']:.0f} ms",
+        f"frames    {r['frames']}  in {r['elapsed_s']:.2f} s  →  {r['fps']:.1f} fps",
+        f"read      {r['read_ms_mean']:.2f} ms/frame  (失敗 {r['read_failed']})",
+        f"motion    検出を省いたフレーム {r['idle_frames']}",
+        f"recognize 照合 {r['recognized_frames']} 回（うち 1:1 確認 {r['verified_frames']}）  確定 {r['confirmed'] or '-'}",
+    ]
+    for name, s in r["stages"].items():
+        lines.append(f"{name:<9} p50 {s['p50_ms']:7.2f} ms  p95 {s['p95_ms']:7.2f} ms  (n={s['count']})")
+    if "alloc_kb" in r:
+        a = r["alloc_kb"]
+        lines.append(f"alloc     p50 {a['p50']:7.1f} KB  p95 {a['p95']:7.1f} KB  max {a['max']:.1f} KB  (n={a['count']}, 1 フレームあたり)")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="顔認識パイプラインのベンチマーク（画面なし）")
+    ap.add_argument("source", help="動画ファイル / 連番画像フォルダ / カメラ番号")
+    ap.add_argument("--realtime", action="store_true", help="元の FPS どおりに流す（既定: できるだけ速く）")
+    ap.add_argument("--loop", action="store_true", help="最後まで読んだら先頭に戻る")
+    ap.add_argument("--frames", type=int, default=0, help="処理するフレーム数の上限")
+    ap.add_argument("--seconds", type=float, default=0.0, help="計測する秒数の上限")
+    ap.add_argument("--no-motion", action="store_true", help="動き検知ゲートを無効にする")
+    ap.add_argument("--recog-interval", type=int, default=0, help="認識の間引き（既定: 設定値）")
+    ap.add_argument("--no-gallery", action="store_true", help="顔データを読まない（検出のみ）")
+    ap.add_argument("--detector", choices=["haar", "yunet", "ssd"], help="顔検出器（既定: 設定値）")
+    ap.add_argument("--recognizer", choices=list(RECOGNIZERS), help="照合方式（既定: 設定値）")
+    ap.add_argument("--shortlist", choices=["off", "votes", "bow"], help="照合の候補絞り込み（既定: 設定値、off 以外なら有効にする）")
+    ap.add_argument("--compact-radius", type=int, default=-1, help="記述子の重複除去距離（0 で無効、既定: 設定値）")
+    ap.add_argument("--alloc", action="store_true", help="1 フレームあたりのメモリ確保量も測る（tracemalloc）")
+    ap.add_argument("--alloc-max-kb", type=float, default=0.0,
+                    help="1 フレームあたりの確保量（p95）の上限。超えたら終了コード 1（--alloc も有効になる）")
+    ap.add_argument("--json", help="結果を JSON で書き出すパス")
+    args = ap.parse_args(argv)
+    if args.loop and not (args.frames or args.seconds):
+        ap.error("--loop には --frames か --seconds を指定してください")
+
+    overrides = {}
+    if args.no_motion:
+        overrides["motion_gate"] = False
+    if args.recog_interval > 0:
+        overrides["recog_interval"] = args.recog_interval
+    if args.detector:
+        overrides["detector"] = args.detector
+    if args.recognizer:
+        overrides["recognizer"] = args.recognizer
+    if args.shortlist == "off":
+        overrides["shortlist_size"] = 0
+    elif args.shortlist:
+        overrides["shortlist_method"] = args.shortlist
+        # 既定では絞り込みが無効なので、指定されたら設定の人数（0 なら 3 人）で有効にする
+        overrides["shortlist_size"] = int(ConfigService().get_vision().get("shortlist_size", 0)) or 3
+    if args.compact_radius >= 0:
+        overrides["gallery_compact_radius"] = args.compact_radius
+
+    result = run(
+        args.source,
+        realtime=args.realtime,
+        loop=args.loop,
+        max_frames=args.frames,
+        seconds=args.seconds,
+        vision_overrides=overrides,
+        load_gallery=not args.no_gallery,
+        trace_alloc=args.alloc or args.alloc_max_kb > 0,
+    )
+    print(format_report(result))
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.alloc_max_kb > 0:
+        p95 = result.get("alloc_kb", {}).get("p95")
+        if p95 is None:
+            print("alloc     計測できたフレームがありません（--frames / 動画の長さを確認）")
+            return 1
+        if p95 > args.alloc_max_kb:
+            print(f"alloc     p95 {p95:.1f} KB が上限 {args.alloc_max_kb:.1f} KB を超えました")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
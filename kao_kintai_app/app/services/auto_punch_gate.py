@@ -0,0 +1,50 @@
+from __future__ import annotations
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+
+class AutoPunchGate:
+    """
+    自動打刻（punch.auto_punch）をしてよいかの判定。打刻画面から切り出したもの。
+      - 次に打てる打刻が 1 つだけのときだけ、その打刻を返す
+      - カメラの前にいる間は 1 回だけ（reset() で「いなくなった」とする）
+      - 離れて戻っても cooldown_sec の間は同じ人を自動打刻しない
+      - 手動で打刻した人も同じ扱い（punched() で記録する。休憩開始の直後に休憩終了、などを防ぐ）
+    """
+
+    def __init__(self, enabled: bool = False, cooldown_sec: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.enabled = bool(enabled)
+        self.cooldown_sec = float(cooldown_sec)
+        self._clock = clock
+        self._present_code = ""            # 今カメラの前にいる人を打刻済み（手動・自動）なら、そのコード
+        self._last_at: Dict[str, float] = {}  # code → 最後に打刻した時刻
+
+    @classmethod
+    def from_config(cls, pcfg: dict) -> "AutoPunchGate":
+        return cls(
+            enabled=bool(pcfg.get("auto_punch", False)),
+            cooldown_sec=float(pcfg.get("auto_punch_cooldown_sec", 60)),
+        )
+
+    def choose(self, code: str, allowed: Iterable[str]) -> Optional[str]:
+        """自動打刻する種別（しないなら None）。返したら打刻したものとして記録する。"""
+        allowed = list(allowed)
+        if not (self.enabled and code) or len(allowed) != 1:
+            return None
+        if code == self._present_code:
+            return None
+        last = self._last_at.get(code)
+        if last is not None and self._clock() - last < self.cooldown_sec:
+            return None
+        # 打刻に失敗しても毎フレーム打ち直さないように、ここで記録しておく
+        self.punched(code)
+        return allowed[0]
+
+    def punched(self, code: str) -> None:
+        self._present_code = code
+        self._last_at[code] = self._clock()
+
+    def reset(self) -> None:
+        """カメラの前から人がいなくなった。"""
+        self._present_code = ""
@@ -0,0 +1,258 @@
+from __future__ import annotations
+import math
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 8bit 値 → 立っているビット数（ハミング距離の計算用）
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _hamming(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """a (..., 32) と b (..., 32) のハミング距離（ブロードキャスト可）"""
+    return _POPCOUNT[np.bitwise_xor(a, b)].sum(axis=-1, dtype=np.int32)
+
+
+def _majority(des: np.ndarray) -> np.ndarray:
+    """2値記述子の「ビットごとの多数決」= ハミング距離での中心"""
+    bits = np.unpackbits(des, axis=1)
+    return np.packbits(bits.mean(axis=0) >= 0.5)
+
+
+class Vocabulary:
+    """
+    ORB 記述子の語彙木（DBoW 方式）。各節点を branching 個の子に k-majority で分け、depth 段で葉 = 単語。
+      centers  : 節点の中心（uint8 n x 32、0 番は根でダミー）
+      children : 節点の子（int32 n x branching、無ければ -1）
+      word     : 葉なら単語番号、内部節点なら -1
+    """
+
+    def __init__(self, centers: np.ndarray, children: np.ndarray, word: np.ndarray):
+        self.centers = centers
+        self.children = children
+        self.word = word
+        self.size = int((word >= 0).sum())
+
+    @classmethod
+    def train(cls, des: np.ndarray, branching: int = 8, depth: int = 3,
+              iterations: int = 6, seed: int = 0) -> "Vocabulary":
+        rng = np.random.default_rng(seed)
+        centers = [np.zeros(32, dtype=np.uint8)]
+        children: List[List[int]] = [[]]
+        word = [-1]
+
+        def split(node: int, sub: np.ndarray, level: int) -> None:
+            if level == depth or len(sub) <= branching:
+                word[node] = sum(1 for w in word if w >= 0)
+                return
+            k = branching
+            cent = sub[rng.choice(len(sub), size=k, replace=False)]
+            for _ in range(iterations):
+                assign = np.argmin(_hamming(sub[:, None, :], cent[None, :, :]), axis=1)
+                cent = np.stack([
+                    _majority(sub[assign == j]) if np.any(assign == j) else cent[j]
+                    for j in range(k)
+                ])
+            assign = np.argmin(_hamming(sub[:, None, :], cent[None, :, :]), axis=1)
+            for j in range(k):
+                part = sub[assign == j]
+                if len(part) == 0:
+                    continue
+                child = len(centers)
+                centers.append(cent[j])
+                children.append([])
+                word.append(-1)
+                children[node].append(child)
+                split(child, part, level + 1)
+
+        split(0, des, 0)
+        ch = np.full((len(centers), branching), -1, dtype=np.int32)
+        for i, c in enumerate(children):
+            ch[i, : len(c)] = c
+        return cls(np.stack(centers), ch, np.asarray(word, dtype=np.int32))
+
+    def quantize(self, des: np.ndarray) -> np.ndarray:
+        """記述子 N x 32 → 単語番号 N（根から毎段いちばん近い子へ降りる）"""
+        node = np.zeros(len(des), dtype=np.int32)
+        while True:
+            inner = self.word[node] < 0
+            if not inner.any():
+                break
+            kids = self.children[node[inner]]                    # m x branching
+            d = _hamming(des[inner][:, None, :], self.centers[np.maximum(kids, 0)])
+            d[kids < 0] = np.iinfo(np.int32).max
+            node[inner] = kids[np.arange(len(kids)), np.argmin(d, axis=1)]
+        return self.word[node]
+
+
+class BowIndex:
+    """
+    登録画像ごとの単語ヒストグラム（TF-IDF, L2 正規化）と転置ファイル。
+    照合の候補絞り込み用: query(記述子) → {code: 類似度}。照合コストは登録画像数ではなく
+    顔に出た単語の出現リストの長さで決まる。
+
+    画像（doc）は "<code>/<ファイル名>" で識別し、単語の出現数だけを保存する
+    （IDF は読み込み・更新のたびに数え直す）。語彙は最初に 1 回だけ学習する。
+    """
+
+    def __init__(self, signature: str, vocab: Optional[Vocabulary] = None):
+        self.signature = signature
+        self.vocab = vocab
+        # doc ごと: mtime, 単語番号, 出現数
+        self.docs: Dict[str, Tuple[float, np.ndarray, np.ndarray]] = {}
+        self._inverted = None
+
+    # ---- 構築・更新 ----
+    def sync(self, images: Dict[str, List[str]], des_by_path: Dict[str, np.ndarray],
+             train_limit: int = 50_000) -> bool:
+        """
+        images {code: [画像パス]} と doc を揃える（増えた画像だけ単語化、無くなった・更新された画像は外す）。
+        変更があれば True。
+        """
+        wanted: Dict[str, Tuple[str, str]] = {}
+        for code, paths in images.items():
+            for p in paths:
+                if des_by_path.get(p) is not None:
+                    wanted[f"{code}/{Path(p).name}"] = (code, p)
+
+        changed = False
+        if self.vocab is None:
+            pool = [des_by_path[p] for _c, p in wanted.values()]
+            if not pool:
+                return False
+            des = np.vstack(pool)
+            if len(des) > train_limit:
+                des = des[np.random.default_rng(0).choice(len(des), train_limit, replace=False)]
+            self.vocab = Vocabulary.train(des)
+            self.docs.clear()
+            changed = True
+
+        for key in list(self.docs):
+            p = wanted.get(key, (None, None))[1]
+            if p is None or self.docs[key][0] != _mtime(p):
+                del self.docs[key]
+                changed = True
+
+        for key, (_code, p) in wanted.items():
+            if key in self.docs:
+                continue
+            words, counts = np.unique(self.vocab.quantize(des_by_path[p]), return_counts=True)
+            self.docs[key] = (_mtime(p), words.astype(np.int32), counts.astype(np.int32))
+            changed = True
+
+        if changed:
+            self._inverted = None
+        return changed
+
+    def prepare(self) -> None:
+        """転置ファイルを作っておく（照合スレッドに渡す前に呼ぶ）。"""
+        if self._inverted is None and self.vocab is not None:
+            self._build_inverted()
+
+    def _build_inverted(self):
+        keys = sorted(self.docs)
+        codes = sorted({k.split("/", 1)[0] for k in keys})
+        code_idx = {c: i for i, c in enumerate(codes)}
+        n_words = self.vocab.size
+
+        df = np.zeros(n_words, dtype=np.float64)
+        for k in keys:
+            df[self.docs[k][1]] += 1
+        idf = np.log(max(len(keys), 1) / np.maximum(df, 1))
+
+        post_word, post_doc, post_w = [], [], []
+        for d, k in enumerate(keys):
+            words, counts = self.docs[k][1], self.docs[k][2]
+            v = counts / counts.sum() * idf[words]
+            norm = np.linalg.norm(v)
+            if norm == 0:
+                continue
+            post_word.append(words)
+            post_doc.append(np.full(len(words), d, dtype=np.int32))
+            post_w.append(v / norm)
+
+        if post_word:
+            w = np.concatenate(post_word)
+            order = np.argsort(w, kind="stable")
+            w, doc, weight = w[order], np.concatenate(post_doc)[order], np.concatenate(post_w)[order]
+        else:
+            w = doc = np.zeros(0, dtype=np.int32)
+            weight = np.zeros(0)
+        ptr = np.searchsorted(w, np.arange(n_words + 1))
+        owner = np.array([code_idx[k.split("/", 1)[0]] for k in keys], dtype=np.int32)
+        self._inverted = (codes, owner, idf, ptr, doc, weight)
+
+    # ---- 照合 ----
+    def query(self, des: np.ndarray) -> Dict[str, float]:
+        """顔の記述子 → {code: 類似度（その人の画像のうち最大のコサイン類似度）}"""
+        if self.vocab is None or not self.docs:
+            return {}
+        if self._inverted is None:
+            self._build_inverted()
+        codes, owner, idf, ptr, doc, weight = self._inverted
+
+        words, counts = np.unique(self.vocab.quantize(des), return_counts=True)
+        q = counts / counts.sum() * idf[words]
+        norm = np.linalg.norm(q)
+        if norm == 0:
+            return {}
+        q /= norm
+
+        doc_score = np.zeros(len(owner))
+        for w, qw in zip(words, q):
+            a, b = ptr[w], ptr[w + 1]
+            if a != b:
+                doc_score[doc[a:b]] += qw * weight[a:b]
+        code_score = np.zeros(len(codes))
+        np.maximum.at(code_score, owner, doc_score)
+        return {c: float(s) for c, s in zip(codes, code_score)}
+
+    # ---- 保存 ----
+    def save(self, path: Path) -> None:
+        keys = sorted(self.docs)
+        lens = [len(self.docs[k][1]) for k in keys]
+        ptr = np.concatenate([[0], np.cumsum(lens)]).astype(np.int64)
+        empty = np.zeros(0, dtype=np.int32)
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez(
+            tmp,
+            sig=np.array(self.signature),
+            centers=self.vocab.centers,
+            children=self.vocab.children,
+            word=self.vocab.word,
+            keys=np.array(keys, dtype=str),
+            mtimes=np.array([self.docs[k][0] for k in keys], dtype=np.float64),
+            ptr=ptr,
+            words=np.concatenate([self.docs[k][1] for k in keys]) if keys else empty,
+            counts=np.concatenate([self.docs[k][2] for k in keys]) if keys else empty,
+        )
+        # 書き込み途中で落ちても壊れたファイルを残さない
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, signature: str) -> "BowIndex":
+        """無い・壊れている・特徴量パラメータが違うなら空の索引（次の sync で作り直し）"""
+        idx = cls(signature)
+        if not path.exists():
+            return idx
+        try:
+            with np.load(path, allow_pickle=False) as z:
+                if str(z["sig"]) != signature:
+                    return idx
+                idx.vocab = Vocabulary(z["centers"], z["children"], z["word"])
+                ptr, words, counts, mtimes = z["ptr"], z["words"], z["counts"], z["mtimes"]
+                for i, k in enumerate(z["keys"]):
+                    a, b = ptr[i], ptr[i + 1]
+                    idx.docs[str(k)] = (float(mtimes[i]), words[a:b], counts[a:b])
+        except Exception:
+            return cls(signature)
+        return idx
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return math.nan
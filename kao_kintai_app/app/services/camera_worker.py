@@ -0,0 +1,146 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from app.infra.camera.capture import open_source
+from app.services import instrumentation as inst
+from app.services.face_gallery_service import FaceGalleryService
+from app.services.face_matcher import FaceMatcher, create_matcher
+from app.services.frame_pacer import FramePacer
+from app.services.recognition_pipeline import FrameResult, RecognitionPipeline
+
+
+class CameraWorker:
+    """
+    カメラ 1 台 = スレッド 1 本（取得 → 動き検知 → 検出 → 照合）。
+    結果は最新の 1 件だけ保持し、画面側が latest() で取りに来る（Tk にはスレッドから触らない）。
+    FaceMatcher は全ワーカーで共有する。
+    """
+
+    def __init__(self, name: str, source, matcher: FaceMatcher, vcfg: dict, camera_cfg: dict):
+        self.name = name
+        self.source = source
+        self.matcher = matcher
+        self.vcfg = vcfg
+        self.camera_cfg = camera_cfg
+
+        self.error: Optional[str] = None
+        self.frames = 0
+        self._started_at = 0.0
+
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._result: Optional[FrameResult] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- 制御 ----------
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"camera-{self.name}", daemon=True)
+        self._thread.start()
+
+    def request_stop(self) -> None:
+        self._stop.set()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ---------- 参照 ----------
+    def latest(self) -> Tuple[int, Optional[FrameResult]]:
+        """(連番, 最新の結果)。連番が前回と同じなら新しいフレームは来ていない。"""
+        with self._lock:
+            return self._seq, self._result
+
+    def fps(self) -> float:
+        dt = time.perf_counter() - self._started_at
+        return self.frames / dt if self._started_at and dt > 0 else 0.0
+
+    # ---------- スレッド本体 ----------
+    def _run(self) -> None:
+        prefix = f"camera.{self.name}"
+        with inst.span(f"{prefix}.open"):
+            cap = open_source(self.source, self.camera_cfg)
+        if not cap.isOpened():
+            self.error = f"カメラを開けませんでした（{self.source}）"
+            cap.release()
+            return
+
+        pipeline = RecognitionPipeline(self.matcher, self.vcfg, span_prefix=prefix)
+        pacer = FramePacer.from_config(self.vcfg)
+        self._started_at = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                pacer.begin()
+                with inst.span(f"{prefix}.read"):
+                    ok, frame = cap.read()
+                if not ok or frame is None:
+                    if getattr(cap, "finite", False) and not getattr(cap, "loop", False):
+                        self.error = f"再生が終わりました（{self.source}）"
+                        break
+                    self._stop.wait(0.05)
+                    continue
+
+                res = pipeline.process(frame)
+                self.frames += 1
+                with self._lock:
+                    self._seq += 1
+                    self._result = res
+
+                self._stop.wait(pacer.next_delay_ms(pipeline.face_seen) / 1000.0)
+        finally:
+            cap.release()
+
+
+class CameraWorkerPool:
+    """
+    複数カメラをまとめて動かす。ギャラリーは台数に関係なく 1 回だけ読み込み、
+    1 つの FaceMatcher を全ワーカーで共有する。
+    """
+
+    def __init__(
+        self,
+        sources: List,
+        vcfg: dict,
+        camera_cfg: dict,
+        matcher: Optional[FaceMatcher] = None,
+        gallery: Optional[FaceGalleryService] = None,
+    ):
+        self.vcfg = vcfg
+        self.matcher = matcher or create_matcher(vcfg)
+        self.gallery = gallery or FaceGalleryService()
+        self.workers = [
+            CameraWorker(f"cam{i}", src, self.matcher, vcfg, camera_cfg)
+            for i, src in enumerate(sources)
+        ]
+        self.load_error: Optional[str] = None
+
+    def load_gallery(self, progress: Optional[Callable[[int, int], None]] = None) -> None:
+        try:
+            self.matcher.load(self.gallery, int(self.vcfg.get("top_k_images", 5)), progress=progress)
+        except Exception as ex:
+            self.load_error = str(ex)
+
+    def start(self, load_gallery: bool = True) -> None:
+        # 照合はギャラリーが揃うまで自動で止まる（RecognitionPipeline が matcher.ready を見る）
+        if load_gallery:
+            threading.Thread(target=self.load_gallery, name="gallery-load", daemon=True).start()
+        for w in self.workers:
+            w.start()
+
+    def stop(self) -> None:
+        # 先に全台へ停止を伝えてから待つ（1 台ずつ待つと台数分遅くなる）
+        for w in self.workers:
+            w.request_stop()
+        for w in self.workers:
+            w.stop()
@@ -7,13 +7,64 @@ from typing import Dict, Any
 DEFAULT_CFG: Dict[str, Any] = {
     "app_name": "Kao-Kintai (Skeleton)",
     "vision": {
+        "detector": "haar",       # 顔検出: haar / yunet / ssd（DNN はモデルファイルを models/ に置く）
+        "detector_model": "",     # DNN モデルのパス（空なら既定のファイル名）
+        "detector_score": 0.7,    # DNN の信頼度しきい値
+        "detector_input_width": 320,  # DNN に入れる前に縮小する幅（0 で縮小しない）
+        "recognizer": "orb",      # 照合方式: orb（ORB 特徴点）/ embedding（顔埋め込みモデル, models/ に置く）
+        "embed_model": "models/face_embedding.onnx",  # 埋め込みモデル（ONNX, 112x112 入力の ArcFace 系）
+        "embed_input": 112,       # モデルの入力サイズ(px)
+        "embed_mean": 127.5,      # 入力の正規化: (画素 - mean) * scale
+        "embed_scale": 0.0078125,
+        "embed_swap_rb": True,    # BGR → RGB にして入れる
+        "embed_threshold": 0.36,  # 本人とみなすコサイン類似度の下限
+        "embed_margin": 0.05,     # 1位と2位の類似度の差の下限
         "min_area_ratio": 0.12,   # 顔面積/フレーム
         "min_blur_var": 100.0,    # ぼけ(Laplacian)
         "bright_min": 60,         # 明るさ下限
         "bright_max": 190,        # 明るさ上限
         "match_threshold": 24,    # ORBマッチ数
         "top_k_images": 5,        # 学習に使う登録画像数
-        "recog_interval": 3       # 認識間引き(フレーム)
+        "gallery_compact_radius": 0,   # 従業員ごとの記述子を重複除去する距離(ハミング)。0 で無効（有効にすると点が下がるので match_threshold も合わせる）
+        "shortlist_size": 0,      # 照合の1段目で絞り込む候補人数。0 で全員を本採点（既定）
+        "shortlist_method": "votes",  # 1段目の方式: votes（記述子の間引き照合）/ bow（単語ヒストグラム索引）
+        "shortlist_probe": 96,    # votes で使う顔の記述子の数（反応の強い順）
+        "recog_interval": 3,      # 認識間引き(フレーム)
+        "verify_fast_path": True, # 直前に特定した人が立ち続けている間は 1:1 の確認で済ませる
+        "verify_ttl_sec": 5.0,    # 1:1 確認を続ける最長秒数（過ぎたら全員と照合し直す）
+        "target_fps": 30,         # カメラループの目標FPS
+        "idle_fps": 5,            # 顔が見えないときのFPS
+        "idle_after_sec": 10,     # 何秒顔が見えなければ idle_fps に落とすか
+        "motion_gate": True,      # 動きが無いフレームでは顔検出を省く
+        "motion_threshold": 18,   # 差分とみなす画素差(0-255)
+        "motion_min_ratio": 0.005,  # 動きありとみなす変化画素の割合
+        "motion_hold_sec": 2.0,   # 動きが止まってから検出を続ける秒数
+        "show_hud": False,        # 打刻画面に性能HUD（FPS・段ごとのms）を表示
+        "keep_full_frame": False  # 顔登録で切り抜きに加えて撮影フレーム全体も保存する
+    },
+    "camera": {
+        "device": 0,              # カメラ番号
+        "backend": "auto",        # auto / dshow / msmf / v4l2
+        "width": 1280,
+        "height": 720,
+        "fps": 30,                # カメラに要求するFPS
+        "fourcc": "MJPG",         # 空文字ならドライバ既定（多くは非圧縮で高解像度時にFPSが落ちる）
+        "buffer_size": 1,         # ドライバ側のフレームバッファ数
+        "grab_latest": True,      # 常に最新フレームだけをデコードして処理する
+        "sources": [0]            # 複数カメラ画面で使う取得元（カメラ番号 or 動画ファイル）
+    },
+    "punch": {
+        "auto_punch": False,      # 次に打てる打刻が 1 つだけなら、顔が確定した時点でボタンを押さずに打刻する
+        "auto_punch_cooldown_sec": 60,  # 同じ人を続けて自動打刻しない秒数（退勤直後に出勤されないように）
+        "toast_sec": 2.5          # 打刻結果の通知を出しておく秒数
+    },
+    "instrumentation": {
+        "enabled": False,         # 計測（スパン記録）の有効/無効
+        "trace": True,            # data/logs/trace.jsonl に書き出す
+        "trace_max_kb": 2048,     # トレース1ファイルの上限
+        "trace_backups": 3,       # ローテーションで残す世代数
+        "window": 512,            # パーセンタイル計算に使う直近件数
+        "overlay": True           # F12 で計測オーバーレイを表示
     }
 }
 
@@ -45,7 +96,9 @@ class ConfigService:
         # デフォルトとマージ（不足キーを補う）
         merged = DEFAULT_CFG.copy()
         merged.update(cfg)
-        merged["vision"] = {**DEFAULT_CFG["vision"], **cfg.get("vision", {})}
+        for section, defaults in DEFAULT_CFG.items():
+            if isinstance(defaults, dict):
+                merged[section] = {**defaults, **cfg.get(section, {})}
         return merged
 
     def save_vision(self, vision: Dict[str, Any]) -> None:
@@ -56,6 +109,20 @@ class ConfigService:
     def get_vision(self) -> Dict[str, Any]:
         return self.load()["vision"]
     
+    def get_camera(self) -> Dict[str, Any]:
+        return self.load()["camera"]
+
+    def save_camera(self, camera: Dict[str, Any]) -> None:
+        cfg = self.load()
+        cfg["camera"].update(camera)
+        self._write(cfg)
+
+    def get_punch(self) -> Dict[str, Any]:
+        return self.load()["punch"]
+
+    def get_instrumentation(self) -> Dict[str, Any]:
+        return self.load()["instrumentation"]
+
     def get_app_name(self) -> str:
         cfg = self.load()
         return cfg.get("app_name", "Kao-Kintai 勤怠")
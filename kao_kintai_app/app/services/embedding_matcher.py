@@ -0,0 +1,283 @@
+from __future__ import annotations
+import functools
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.services import face_features
+from app.services.face_detector import resolve_model_path
+
+# 既定の埋め込みモデル（ネットワークが無いので models/ に手で置く）
+DEFAULT_EMBED_MODEL = "models/face_embedding.onnx"
+
+
+def embed_config(vcfg: dict) -> dict:
+    """vision 設定のうち埋め込みモデルに関する部分（ワーカープロセスへ渡す用に dict にまとめる）"""
+    return {
+        "model": vcfg.get("embed_model") or DEFAULT_EMBED_MODEL,
+        "input": int(vcfg.get("embed_input", 112)),
+        "mean": float(vcfg.get("embed_mean", 127.5)),
+        "scale": float(vcfg.get("embed_scale", 1.0 / 127.5)),
+        "swap_rb": bool(vcfg.get("embed_swap_rb", True)),
+    }
+
+
+def embed_signature(cfg: dict) -> str:
+    """埋め込みキャッシュの互換キー（モデル・前処理を変えたら自動で作り直し）"""
+    path = resolve_model_path(cfg["model"])
+    try:
+        mtime = int(path.stat().st_mtime)
+    except OSError:
+        mtime = 0
+    return f"emb-{path.name}-{mtime}-{cfg['input']}-{cfg['mean']}-{cfg['scale']:.6f}-{int(cfg['swap_rb'])}"
+
+
+class FaceEmbedder:
+    """
+    顔画像 → L2 正規化した埋め込みベクトル（cv2.dnn で ONNX モデルを CPU 推論）。
+    入力は input x input に縮小し、(画素 - mean) * scale で正規化する（ArcFace / MobileFaceNet 系の既定値）。
+    モデルが読めなければ empty() が True になり、error に理由が入る。
+    cv2.dnn.Net はスレッド間で共有しないこと（EmbeddingMatcher はスレッドごとに作る）。
+    """
+
+    def __init__(self, cfg: dict):
+        self.cfg = cfg
+        self.error = ""
+        self.net = None
+        path = resolve_model_path(cfg["model"])
+        if not path.exists():
+            self.error = f"モデルがありません: {path}"
+            return
+        try:
+            self.net = cv2.dnn.readNetFromONNX(str(path))
+        except cv2.error as e:
+            self.error = f"モデルを読み込めません: {e}"
+
+    def empty(self) -> bool:
+        return self.net is None
+
+    def embed(self, face_img) -> Optional[np.ndarray]:
+        if self.net is None or face_img is None or face_img.size == 0:
+            return None
+        if face_img.ndim == 2:
+            face_img = cv2.cvtColor(face_img, cv2.COLOR_GRAY2BGR)
+        c = self.cfg
+        blob = cv2.dnn.blobFromImage(
+            face_img, c["scale"], (c["input"], c["input"]), (c["mean"],) * 3, swapRB=c["swap_rb"]
+        )
+        self.net.setInput(blob)
+        v = self.net.forward().reshape(-1).astype(np.float32)
+        n = float(np.linalg.norm(v))
+        return v / n if n > 0 else None
+
+
+# ---------- 登録画像の一括計算（プロセスプール用） ----------
+_worker_embedder: Optional[FaceEmbedder] = None
+
+
+def _embed_job(path: str, cfg: dict, crop: bool):
+    # ワーカープロセスごとに 1 回だけモデルを読む
+    global _worker_embedder
+    if _worker_embedder is None or _worker_embedder.cfg != cfg:
+        _worker_embedder = FaceEmbedder(cfg)
+    img = cv2.imread(str(path))
+    if img is None:
+        return path, None
+    if not crop:
+        rect = face_features.largest_face(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))
+        if rect is not None:
+            x, y, w, h = rect
+            img = img[y: y + h, x: x + w]
+    return path, _worker_embedder.embed(img)
+
+
+def embed_many(
+    paths: Iterable[str],
+    cfg: dict,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    crops: Iterable[str] = (),
+) -> Dict[str, Optional[np.ndarray]]:
+    """複数画像の埋め込みをまとめて計算する（face_features.extract_many と同じ使い方）。"""
+    paths = [str(p) for p in paths]
+    crop_set = {str(p) for p in crops}
+    crop_paths = [p for p in paths if p in crop_set]
+    frame_paths = [p for p in paths if p not in crop_set]
+    total = len(paths)
+
+    out = face_features.map_files(
+        functools.partial(_embed_job, cfg=cfg, crop=True), crop_paths, workers=workers,
+        progress=(lambda d, _t: progress(d, total)) if progress else None,
+    )
+    base = len(crop_paths)
+    out.update(face_features.map_files(
+        functools.partial(_embed_job, cfg=cfg, crop=False), frame_paths, workers=workers,
+        progress=(lambda d, _t: progress(base + d, total)) if progress else None,
+    ))
+    return out
+
+
+# ---------- 照合 ----------
+class _EmbGallery(NamedTuple):
+    names: Dict[str, str]
+    emb: Dict[str, np.ndarray]     # code → 画像ごとの埋め込み（n x D）
+    matrix: np.ndarray             # 全員分を縦に連結（M x D, L2 正規化済み）
+    owner: np.ndarray              # matrix の各行が codes の何番目の人のものか
+    codes: List[str]
+    generation: int = 0
+
+
+def _stack(name_map, emb_map, generation: int = 0) -> _EmbGallery:
+    # FaceMatcher と同じく、写して書き換え不可にしたものを公開する
+    name_map = dict(name_map)
+    emb_map = {c: _freeze(e) for c, e in emb_map.items()}
+    codes = [c for c, e in emb_map.items() if len(e)]
+    matrix = np.vstack([emb_map[c] for c in codes]).astype(np.float32) if codes else np.zeros((0, 0), np.float32)
+    owner = np.repeat(np.arange(len(codes), dtype=np.int32), [len(emb_map[c]) for c in codes])
+    return _EmbGallery(name_map, emb_map, _freeze(matrix), _freeze(owner), codes, generation)
+
+
+def _freeze(a: np.ndarray) -> np.ndarray:
+    a.flags.writeable = False
+    return a
+
+
+class EmbeddingMatcher:
+    """
+    埋め込みベクトルのコサイン類似度による照合（FaceMatcher と同じ使い方ができる）。
+    1:N は「全登録画像の行列 × 顔のベクトル」1 回で、人ごとに最大の類似度を点とする。
+    点（best / second）は 0〜1 の類似度なので、しきい値は embed_threshold / embed_margin を使う。
+    モデルが読めなければ empty() が True になり、error に理由が入る（照合は常に Unknown）。
+    """
+
+    wants_color = True  # 顔領域はカラーで渡してもらう
+
+    def __init__(self, cfg: dict, threshold: float = 0.36, margin: float = 0.05):
+        self.cfg = cfg
+        self.threshold = float(threshold)
+        self.margin = float(margin)
+        self._gallery: _EmbGallery = _stack({}, {})
+        self._ready = False
+        self._loaded_at = 0.0
+        self._load_lock = threading.Lock()
+        self._local = threading.local()
+        self._error: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, vcfg: dict) -> "EmbeddingMatcher":
+        return cls(
+            embed_config(vcfg),
+            threshold=float(vcfg.get("embed_threshold", 0.36)),
+            margin=float(vcfg.get("embed_margin", 0.05)),
+        )
+
+    # ---------- ギャラリー ----------
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    @property
+    def snapshot(self) -> _EmbGallery:
+        return self._gallery
+
+    @property
+    def generation(self) -> int:
+        return self._gallery.generation
+
+    @property
+    def name_map(self) -> Dict[str, str]:
+        return self._gallery.names
+
+    @property
+    def des_map(self) -> Dict[str, List[np.ndarray]]:
+        # 件数表示用（FaceMatcher と同じ形: code → [配列]）
+        return {c: [e] for c, e in self._gallery.emb.items()}
+
+    def name_of(self, code: str, default: str = "--") -> str:
+        return self._gallery.names.get(code, default)
+
+    def set_gallery(self, name_map: Dict[str, str], emb_map: Dict[str, np.ndarray]) -> None:
+        self._gallery = _stack(name_map, emb_map, self._gallery.generation + 1)
+        self._ready = True
+
+    def export(self) -> tuple:
+        """set_gallery にそのまま渡せる形（バッチ処理のワーカーへ配る用）"""
+        return self._gallery.names, self._gallery.emb
+
+    def load(self, gallery, top_k: int, progress: Optional[Callable[[int, int], None]] = None) -> None:
+        started = time.monotonic()
+        with self._load_lock:
+            if self._ready and self._loaded_at >= started:
+                return
+            name_map, emb_map = gallery.build_embeddings(top_k, self.cfg, progress=progress)
+            self.set_gallery(name_map, emb_map)
+            self._loaded_at = time.monotonic()
+
+    # ---------- スレッドごとのモデル ----------
+    def _embedder(self) -> FaceEmbedder:
+        loc = self._local
+        if getattr(loc, "embedder", None) is None:
+            loc.embedder = FaceEmbedder(self.cfg)
+        return loc.embedder
+
+    @property
+    def error(self) -> str:
+        """モデルが読めない理由（読めれば ""）。初回だけ呼んだスレッドのモデルで確かめる。"""
+        if self._error is None:
+            self._error = self._embedder().error
+        return self._error
+
+    def empty(self) -> bool:
+        return bool(self.error)
+
+    # ---------- 照合 ----------
+    def describe(self, roi, stats=None):
+        """顔領域 → (None, 埋め込み)。FaceMatcher.describe と同じ形で返す。"""
+        if stats is not None:
+            t0 = time.perf_counter()
+        v = self._embedder().embed(roi)
+        if stats is not None:
+            stats.add("embed", (time.perf_counter() - t0) * 1000.0)
+        return None, v
+
+    def recognize(self, roi, stats=None, features=None) -> Tuple[Optional[str], float, float]:
+        """顔領域 → (code, best, second)。best / second は人ごとの最大コサイン類似度。"""
+        _none, q = features if features is not None else self.describe(roi, stats)
+        g = self._gallery
+        if q is None or not g.codes:
+            return None, 0.0, 0.0
+        if stats is not None:
+            t0 = time.perf_counter()
+
+        sims = g.matrix @ q
+        per_code = np.full(len(g.codes), -1.0, dtype=np.float32)
+        np.maximum.at(per_code, g.owner, sims)
+        order = np.argsort(-per_code)
+
+        if stats is not None:
+            stats.add("match", (time.perf_counter() - t0) * 1000.0)
+        best = float(per_code[order[0]])
+        second = float(per_code[order[1]]) if len(order) >= 2 else 0.0
+        if best <= 0:
+            return None, 0.0, 0.0
+        return g.codes[order[0]], round(best, 4), round(max(second, 0.0), 4)
+
+    def verify(self, roi, code: str, second: float, stats=None):
+        """1:1 の確認（FaceMatcher.verify と同じ使い方）。"""
+        features = self.describe(roi, stats)
+        q = features[1]
+        emb = self._gallery.emb.get(code)
+        if q is None or emb is None or not len(emb):
+            return False, 0.0, features
+        if stats is not None:
+            t0 = time.perf_counter()
+        score = round(float((emb @ q).max()), 4)
+        if stats is not None:
+            stats.add("verify", (time.perf_counter() - t0) * 1000.0)
+        return not self.is_unknown(code, score, second), score, features
+
+    def is_unknown(self, code: Optional[str], best: float, second: float) -> bool:
+        return code is None or best < self.threshold or (best - second) < self.margin
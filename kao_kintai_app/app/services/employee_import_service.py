@@ -0,0 +1,177 @@
+from __future__ import annotations
+import csv
+import io
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.infra.db.employee_repo import EmployeeRepo
+from app.infra.storage.face_store import FaceStore
+from app.infra.storage.descriptor_cache import DescriptorCache
+from app.services import face_features
+
+ROLES = ("USER", "MANAGER", "ADMIN")
+PHOTO_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+_EXTRA = "__extra__"  # ヘッダーより多い列（csv.DictReader の restkey）
+
+
+class EmployeeImportService:
+    """
+    従業員の一括登録（CSV + 顔写真フォルダ）。
+
+    CSV（1行目はヘッダー。UTF-8(BOM可) / Shift_JIS）:
+        name,role,wage,face_key
+        山田 太郎,USER,1100,yamada
+      - name     : 必須
+      - role     : USER / MANAGER / ADMIN（省略時 USER）
+      - wage     : 時給（省略可）
+      - face_key : 写真の探し先（省略時は name）
+
+    顔写真フォルダ:
+        <faces_dir>/<face_key>/*.jpg   または
+        <faces_dir>/<face_key>.jpg, <faces_dir>/<face_key>_*.jpg
+    """
+
+    def __init__(
+        self,
+        repo: EmployeeRepo | None = None,
+        store: FaceStore | None = None,
+        cache: DescriptorCache | None = None,
+    ):
+        self.repo = repo or EmployeeRepo()
+        self.store = store or FaceStore()
+        self.cache = cache or DescriptorCache(face_features.FEATURE_SIGNATURE)
+
+    # ===== CSV 読み込み =====
+    def read_csv(self, csv_path: Path) -> Tuple[List[dict], List[str]]:
+        """CSV → (登録行, エラーメッセージ)。エラー行は登録対象に含めない。"""
+        text = None
+        raw = Path(csv_path).read_bytes()
+        for enc in ("utf-8-sig", "cp932"):
+            try:
+                text = raw.decode(enc)
+                break
+            except UnicodeDecodeError:
+                continue
+        if text is None:
+            return [], ["CSV の文字コードを判別できません（UTF-8 / Shift_JIS で保存してください）。"]
+
+        rows: List[dict] = []
+        errors: List[str] = []
+        # 引用符の中の改行を保つため、行に割らずにそのまま読ませる
+        reader = csv.DictReader(io.StringIO(text, newline=""), restkey=_EXTRA)
+        if not reader.fieldnames or "name" not in [f.strip() for f in reader.fieldnames]:
+            return [], ["ヘッダーに name 列がありません。"]
+
+        for rec in reader:
+            line_no = reader.line_num  # 行の終わりの行番号（複数行にまたがる行でもずれない）
+            if rec.pop(_EXTRA, None):
+                errors.append(f"{line_no}行目: 列がヘッダーより多いです（区切りの , を確認してください）。")
+                continue
+            rec = {(k or "").strip(): (v or "").strip() for k, v in rec.items()}
+            name = rec.get("name", "")
+            if not name:
+                errors.append(f"{line_no}行目: 氏名が空です。")
+                continue
+
+            role = (rec.get("role") or "USER").upper()
+            if role not in ROLES:
+                errors.append(f"{line_no}行目: ロール '{role}' は使えません（{' / '.join(ROLES)}）。")
+                continue
+
+            wage = None
+            if rec.get("wage"):
+                try:
+                    wage = float(rec["wage"].replace(",", ""))
+                except ValueError:
+                    errors.append(f"{line_no}行目: 時給 '{rec['wage']}' が数値ではありません。")
+                    continue
+
+            rows.append({
+                "name": name,
+                "role": role,
+                "wage": wage,
+                "face_key": rec.get("face_key") or name,
+            })
+        return rows, errors
+
+    # ===== 写真探索 =====
+    @staticmethod
+    def find_photos(faces_dir: Path, face_key: str) -> List[Path]:
+        faces_dir = Path(faces_dir)
+        sub = faces_dir / face_key
+        if sub.is_dir():
+            found = [p for p in sub.iterdir() if p.suffix.lower() in PHOTO_EXTS]
+        else:
+            found = [
+                p for p in faces_dir.glob(f"{face_key}*")
+                if p.suffix.lower() in PHOTO_EXTS
+                and (p.stem == face_key or p.stem.startswith(face_key + "_"))
+            ]
+        return sorted(found)
+
+    # ===== 実行 =====
+    def run(
+        self,
+        csv_path: Path,
+        faces_dir: Optional[Path] = None,
+        progress: Optional[Callable[[str, int, int], None]] = None,
+        workers: Optional[int] = None,
+    ) -> dict:
+        """
+        CSV の従業員を一括登録し、写真があれば FaceStore に保存して記述子キャッシュも作る。
+        progress(stage, done, total) で進捗を通知（stage: "employees" / "photos" / "features"）。
+        戻り値: {"created": [(code, name)], "images": 保存枚数, "faces": 記述子が取れた枚数, "errors": [...]}
+        """
+        rows, errors = self.read_csv(csv_path)
+        result = {"created": [], "images": 0, "faces": 0, "errors": errors}
+        if not rows:
+            return result
+
+        # 1) 従業員を 1 トランザクションで登録
+        codes = self.repo.create_many(rows)
+        result["created"] = [(c, r["name"]) for c, r in zip(codes, rows)]
+        if progress:
+            progress("employees", len(codes), len(codes))
+
+        if not faces_dir:
+            return result
+
+        # 2) 写真を FaceStore にコピー
+        saved_by_code: Dict[str, List[str]] = defaultdict(list)
+        jobs = [(c, self.find_photos(faces_dir, r["face_key"]), r) for c, r in zip(codes, rows)]
+        total_photos = sum(len(photos) for _c, photos, _r in jobs)
+        done = 0
+        for code, photos, row in jobs:
+            if not photos:
+                errors.append(f"{row['name']}: 顔写真が見つかりません（{row['face_key']}）。")
+                continue
+            for src in photos:
+                dst = self.store.import_file(code, src, record=False)
+                done += 1
+                if dst is None:
+                    errors.append(f"{row['name']}: 画像を読み込めません（{src.name}）。")
+                else:
+                    saved_by_code[code].append(str(dst))
+                if progress:
+                    progress("photos", done, total_photos)
+        for code, paths in saved_by_code.items():
+            self.store.index_files(code, paths)
+        result["images"] = sum(len(v) for v in saved_by_code.values())
+
+        # 3) 記述子をプロセスプールで計算 → キャッシュへ
+        all_paths = [p for paths in saved_by_code.values() for p in paths]
+        des_by_path = face_features.extract_many(
+            all_paths,
+            workers=workers,
+            progress=(lambda d, t: progress("features", d, t)) if progress else None,
+        )
+        for code, paths in saved_by_code.items():
+            found = {p: des_by_path.get(p) for p in paths if des_by_path.get(p) is not None}
+            result["faces"] += len(found)
+            offsets = self.cache.update_from_paths(code, found)
+            self.store.image_repo.set_descriptor_offsets(
+                {f"{code}/{name}": off for name, off in offsets.items()}
+            )
+
+        return result
@@ -0,0 +1,183 @@
+from __future__ import annotations
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.services import face_features
+
+Rect = Tuple[int, int, int, int]
+
+# vision.detector の選択肢
+DETECTORS = ("haar", "yunet", "ssd")
+
+# モデルファイルの既定の置き場所（ネットワークが無いので手で配置する）
+DEFAULT_MODELS = {
+    "yunet": ("models/face_detection_yunet_2023mar.onnx", ""),
+    "ssd": ("models/res10_300x300_ssd_iter_140000.caffemodel", "models/deploy.prototxt"),
+}
+
+
+def _app_root() -> Path:
+    # exe化時は exe のあるフォルダ、開発時はプロジェクトルート（FaceStore と同じ基準）
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).resolve().parent
+    return Path(__file__).resolve().parents[2]
+
+
+def resolve_model_path(path: str) -> Path:
+    """モデルファイルのパス（相対パスはアプリのフォルダ基準）"""
+    p = Path(path)
+    return p if p.is_absolute() else _app_root() / p
+
+
+class HaarDetector:
+    """従来の Haar cascade（モデルは OpenCV 同梱なので常に使える）。"""
+
+    name = "haar"
+
+    def __init__(self, min_size=(120, 120), scale_factor: float = 1.1, min_neighbors: int = 5):
+        self.min_size = tuple(min_size)
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.cascade = cv2.CascadeClassifier(cv2.data.haarcascades + face_features.CASCADE_FILE)
+        self.error = "Cascade が空です" if self.cascade.empty() else ""
+
+    def empty(self) -> bool:
+        return self.cascade.empty()
+
+    def detect(self, frame_bgr, gray) -> List[Rect]:
+        faces = self.cascade.detectMultiScale(
+            gray,
+            scaleFactor=self.scale_factor,
+            minNeighbors=self.min_neighbors,
+            flags=cv2.CASCADE_SCALE_IMAGE,   # 互換性向上
+            minSize=self.min_size,
+        )
+        return [tuple(int(v) for v in r) for r in faces]
+
+
+class _DnnDetector:
+    """
+    DNN 検出器の共通部分。フレームを input_width まで縮小して推論し、枠を元の座標に戻す。
+    モデルが読めなければ empty() が True になり、error に理由が入る（打刻画面がそのまま表示する）。
+    """
+
+    name = ""
+
+    def __init__(self, model: str, config: str = "", score: float = 0.7,
+                 input_width: int = 320, min_size=(120, 120)):
+        self.score = float(score)
+        self.input_width = int(input_width)
+        self.min_size = tuple(min_size)
+        self.error = ""
+        self.net = None
+        model_path = resolve_model_path(model)
+        config_path = resolve_model_path(config) if config else None
+        if not model_path.exists():
+            self.error = f"モデルがありません: {model_path}"
+            return
+        if config_path is not None and not config_path.exists():
+            self.error = f"モデル設定がありません: {config_path}"
+            return
+        try:
+            self.net = self._load(str(model_path), str(config_path) if config_path else "")
+        except cv2.error as e:
+            self.error = f"モデルを読み込めません: {e}"
+
+    def empty(self) -> bool:
+        return self.net is None
+
+    def _scale(self, frame_bgr):
+        h, w = frame_bgr.shape[:2]
+        if self.input_width <= 0 or w <= self.input_width:
+            return frame_bgr, 1.0
+        s = self.input_width / float(w)
+        return cv2.resize(frame_bgr, (self.input_width, int(round(h * s))), interpolation=cv2.INTER_AREA), s
+
+    def _keep(self, rects, s: float, shape) -> List[Rect]:
+        h, w = shape[:2]
+        out = []
+        for x, y, fw, fh in rects:
+            x, y, fw, fh = (int(round(v / s)) for v in (x, y, fw, fh))
+            x, y = max(0, x), max(0, y)
+            fw, fh = min(fw, w - x), min(fh, h - y)
+            if fw >= self.min_size[0] and fh >= self.min_size[1]:
+                out.append((x, y, fw, fh))
+        return out
+
+
+class YuNetDetector(_DnnDetector):
+    """OpenCV の FaceDetectorYN（YuNet, ONNX）。"""
+
+    name = "yunet"
+
+    def _load(self, model: str, config: str):
+        return cv2.FaceDetectorYN.create(model, config, (320, 320), self.score, 0.3, 50)
+
+    def detect(self, frame_bgr, gray) -> List[Rect]:
+        if self.net is None:
+            return []
+        if frame_bgr is None:
+            frame_bgr = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        img, s = self._scale(frame_bgr)
+        self.net.setInputSize((img.shape[1], img.shape[0]))
+        _ok, faces = self.net.detect(img)
+        if faces is None:
+            return []
+        return self._keep((f[:4] for f in faces), s, frame_bgr.shape)
+
+
+class SsdDetector(_DnnDetector):
+    """OpenCV dnn の ResNet-10 SSD（Caffe, 300x300）。"""
+
+    name = "ssd"
+    INPUT = (300, 300)
+    MEAN = (104.0, 177.0, 123.0)
+
+    def _load(self, model: str, config: str):
+        return cv2.dnn.readNetFromCaffe(config, model)
+
+    def detect(self, frame_bgr, gray) -> List[Rect]:
+        if self.net is None:
+            return []
+        if frame_bgr is None:
+            frame_bgr = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        h, w = frame_bgr.shape[:2]
+        blob = cv2.dnn.blobFromImage(frame_bgr, 1.0, self.INPUT, self.MEAN)
+        self.net.setInput(blob)
+        det = self.net.forward()[0, 0]   # N x 7: _, _, score, x1, y1, x2, y2（0〜1）
+        rects = []
+        for d in det[det[:, 2] >= self.score]:
+            x1, y1, x2, y2 = d[3:7] * np.array([w, h, w, h])
+            rects.append((x1, y1, x2 - x1, y2 - y1))
+        return self._keep(rects, 1.0, frame_bgr.shape)
+
+
+def create_detector(vcfg: dict, name: Optional[str] = None, min_size=(120, 120)):
+    """
+    vision 設定から検出器を作る。
+      detector         : haar / yunet / ssd
+      detector_model   : モデルファイル（省略時は DEFAULT_MODELS、相対パスはアプリのフォルダ基準）
+      detector_config  : SSD の prototxt
+      detector_score   : DNN の信頼度しきい値
+      detector_input_width : DNN に入れる前に縮小する幅（0 で縮小しない）
+    """
+    name = (name or vcfg.get("detector", "haar")).lower()
+    if name == "haar":
+        return HaarDetector(min_size=min_size)
+    if name not in DEFAULT_MODELS:
+        raise ValueError(f"未対応の顔検出器です: {name}（{' / '.join(DETECTORS)}）")
+    default_model, default_config = DEFAULT_MODELS[name]
+    # モデル指定は選んだ方式のときだけ使う（方式を切り替えても別のモデルを読まない）
+    same = vcfg.get("detector", "haar").lower() == name
+    cls = YuNetDetector if name == "yunet" else SsdDetector
+    return cls(
+        model=(same and vcfg.get("detector_model")) or default_model,
+        config=(same and vcfg.get("detector_config")) or default_config,
+        score=float(vcfg.get("detector_score", 0.7)),
+        input_width=int(vcfg.get("detector_input_width", 320)),
+        min_size=min_size,
+    )
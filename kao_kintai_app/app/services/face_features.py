@@ -0,0 +1,202 @@
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# 登録画像から特徴量を作るときのパラメータ（FaceClockScreen と同じ値）
+ORB_NFEATURES = 700
+DATASET_MIN_FACE = (100, 100)
+
+# 登録時に保存する顔切り抜きの大きさ（検出枠をそのまま切り出してこの大きさに揃える）
+# 打刻時の顔（720p で最小面積比 0.12 ≒ 330px 角）と同程度にして特徴点の数を揃える
+FACE_CROP_SIZE = (320, 320)
+
+# 特徴量キャッシュの互換キー（上のパラメータを変えたら自動で作り直しになる）
+FEATURE_SIGNATURE = f"orb{ORB_NFEATURES}-haar{DATASET_MIN_FACE[0]}"
+
+CASCADE_FILE = "haarcascade_frontalface_default.xml"
+
+# プロセス（ワーカー）ごとに1回だけ作るモデル
+_cascade = None
+_orb = None
+
+
+def _models():
+    global _cascade, _orb
+    if _cascade is None:
+        _cascade = cv2.CascadeClassifier(cv2.data.haarcascades + CASCADE_FILE)
+    if _orb is None:
+        _orb = cv2.ORB_create(nfeatures=ORB_NFEATURES)
+    return _cascade, _orb
+
+
+def largest_face(gray) -> Optional[tuple]:
+    """登録画像(グレー)の最大の顔 (x, y, w, h)。見つからなければ None。"""
+    cascade, _orb = _models()
+    # 環境によって detectMultiScale が例外を出すことがあるので保護
+    try:
+        faces = cascade.detectMultiScale(
+            gray,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            flags=cv2.CASCADE_SCALE_IMAGE,
+            minSize=DATASET_MIN_FACE,
+        )
+    except cv2.error:
+        faces = []
+    if len(faces) == 0:
+        return None
+    return tuple(int(v) for v in max(faces, key=lambda r: r[2] * r[3]))
+
+
+def descriptors_from_image(img_bgr) -> Optional[np.ndarray]:
+    """登録画像(BGR) → 最大の顔領域の ORB 記述子。取れなければ None。"""
+    if img_bgr is None:
+        return None
+    _cascade, orb = _models()
+    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+
+    roi = gray
+    rect = largest_face(gray)
+    if rect is not None:
+        x, y, w, h = rect
+        roi = gray[y: y + h, x: x + w]
+
+    _kp, des = orb.detectAndCompute(roi, None)
+    if des is None or len(des) == 0:
+        return None
+    return des
+
+
+def crop_face(img_bgr, rect) -> np.ndarray:
+    """検出枠 (x, y, w, h) を切り出して FACE_CROP_SIZE に揃える（保存用）。"""
+    x, y, w, h = (int(v) for v in rect)
+    roi = img_bgr[max(0, y): y + h, max(0, x): x + w]
+    return cv2.resize(roi, FACE_CROP_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def descriptors_from_crop(img_bgr) -> Optional[np.ndarray]:
+    """顔切り抜き(BGR) → ORB 記述子。既に顔だけなので検出は行わない。"""
+    if img_bgr is None:
+        return None
+    _cascade, orb = _models()
+    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+    _kp, des = orb.detectAndCompute(gray, None)
+    if des is None or len(des) == 0:
+        return None
+    return des
+
+
+def compact_descriptors(desc_list, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    1 人分の記述子（画像ごとの配列のリスト）を重複除去して代表記述子と重みにまとめる。
+      - ハミング距離 radius 以内の記述子を同じ群とみなし、近傍の多い順に代表を選ぶ（貪欲な被覆）
+      - 重み = その群を含む画像の割合（全画像に出る特徴 = 1.0、1 枚だけの特徴 = 1/枚数）
+    戻り値: (代表記述子 uint8 M x 32, 重み float32 M)
+    """
+    arrays = [d for d in desc_list if d is not None and len(d) > 0]
+    if not arrays:
+        return np.zeros((0, 32), dtype=np.uint8), np.zeros(0, dtype=np.float32)
+    des = np.vstack(arrays)
+    img_of = np.repeat(np.arange(len(arrays)), [len(d) for d in arrays])
+
+    bf = cv2.BFMatcher(cv2.NORM_HAMMING)
+    neighbors = bf.radiusMatch(des, des, maxDistance=float(radius))
+    order = sorted(range(len(des)), key=lambda i: len(neighbors[i]), reverse=True)
+
+    covered = np.zeros(len(des), dtype=bool)
+    reps: List[int] = []
+    weights: List[float] = []
+    for i in order:
+        if covered[i]:
+            continue
+        members = [m.trainIdx for m in neighbors[i] if not covered[m.trainIdx]]
+        members.append(i)
+        covered[members] = True
+        reps.append(i)
+        weights.append(len(set(img_of[members].tolist())) / len(arrays))
+    return des[reps], np.asarray(weights, dtype=np.float32)
+
+
+def descriptors_from_file(path: str) -> Optional[np.ndarray]:
+    return descriptors_from_image(cv2.imread(str(path)))
+
+
+def _extract_job(path: str):
+    # ProcessPoolExecutor から呼ぶのでモジュール直下の関数にしておく（pickle 可能）
+    return path, descriptors_from_file(path)
+
+
+def _extract_crop_job(path: str):
+    return path, descriptors_from_crop(cv2.imread(str(path)))
+
+
+def default_workers() -> int:
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def map_files(
+    job: Callable[[str], tuple],
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, object]:
+    """
+    job(path) -> (path, 結果) を画像ごとに実行して {path: 結果} を返す。
+    workers > 1 ならプロセスプールで並列実行（画像が少ないときは直列）。
+    job はモジュール直下の関数にすること（pickle するため）。
+    progress(done, total) は呼び出し元スレッドで呼ばれる。
+    """
+    paths = [str(p) for p in paths]
+    total = len(paths)
+    out: Dict[str, object] = {}
+    if total == 0:
+        return out
+
+    workers = default_workers() if workers is None else max(1, int(workers))
+    if workers == 1 or total < 4:
+        for i, p in enumerate(paths, start=1):
+            _p, res = job(p)
+            out[p] = res
+            if progress:
+                progress(i, total)
+        return out
+
+    chunk = max(1, total // (workers * 4))
+    with ProcessPoolExecutor(max_workers=min(workers, total)) as ex:
+        for i, (p, res) in enumerate(ex.map(job, paths, chunksize=chunk), start=1):
+            out[p] = res
+            if progress:
+                progress(i, total)
+    return out
+
+
+def extract_many(
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    crops: Iterable[str] = (),
+) -> Dict[str, Optional[np.ndarray]]:
+    """
+    複数画像の記述子をまとめて計算する（map_files 参照）。
+    crops に含まれるパスは顔切り抜きとして検出を省く（それ以外は画像全体から顔を探す）。
+    """
+    paths = [str(p) for p in paths]
+    crop_set = {str(p) for p in crops}
+    crop_paths = [p for p in paths if p in crop_set]
+    frame_paths = [p for p in paths if p not in crop_set]
+    total = len(paths)
+
+    out = map_files(
+        _extract_crop_job, crop_paths, workers=workers,
+        progress=(lambda d, _t: progress(d, total)) if progress else None,
+    )
+    base = len(crop_paths)
+    out.update(map_files(
+        _extract_job, frame_paths, workers=workers,
+        progress=(lambda d, _t: progress(base + d, total)) if progress else None,
+    ))
+    return out
@@ -0,0 +1,190 @@
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.infra.db.employee_repo import EmployeeRepo
+from app.infra.storage.face_store import FaceStore
+from app.infra.storage.descriptor_cache import DescriptorCache
+from app.services import face_features
+from app.services.bow_index import BowIndex
+from app.services import embedding_matcher
+from app.services import face_quality
+from app.services import instrumentation as inst
+
+
+class FaceGalleryService:
+    """
+    認識用ギャラリー（従業員ごとの登録画像の ORB 記述子）を組み立てる。
+      - 画像は FaceStore の索引（face_images）から選ぶ（フォルダは走査しない）
+      - 使う画像は撮影時の品質スコアが高い順に top_k 枚（未計測の画像は一度だけ測って記録）
+      - キャッシュが有効な画像はそのまま使う
+      - 足りない画像だけまとめてプロセスプールで計算し、キャッシュへ書き戻す
+      - with_bow=True なら単語ヒストグラムの索引（BowIndex）も増えた画像の分だけ更新して保存する
+    埋め込み方式（vision.recognizer="embedding"）では build_embeddings が同じ画像選びで
+    画像ごとの埋め込みベクトルを作る（キャッシュは data/cache/embeddings/）。
+    """
+
+    BOW_FILE = "bow_index.npz"
+    BOW_SIGNATURE = f"{face_features.FEATURE_SIGNATURE}-bow8x3"
+
+    def __init__(
+        self,
+        emp_repo: EmployeeRepo | None = None,
+        store: FaceStore | None = None,
+        cache: DescriptorCache | None = None,
+    ):
+        self.emp_repo = emp_repo or EmployeeRepo()
+        self.store = store or FaceStore()
+        self.cache = cache or DescriptorCache(face_features.FEATURE_SIGNATURE)
+        self.bow_index: Optional[BowIndex] = None
+
+    def _measure_missing(self, employee_codes: List[str], workers: Optional[int]) -> None:
+        """品質未計測の画像（取込直後・索引導入前のもの等）を一度だけ測って索引に記録する。"""
+        pending = self.store.image_repo.unmeasured(employee_codes)
+        if not pending:
+            return
+        paths = {str(self.store.abs_path(rel)): rel for _code, rel in pending}
+        with inst.span("gallery.measure", images=len(paths)):
+            measured = face_quality.measure_many(list(paths), workers=workers)
+        self.store.image_repo.set_quality_many(
+            [(paths[p], m, face_quality.score(m)) for p, m in measured.items()]
+        )
+
+    def _pick_best(self, employee_code: str, top_k: int) -> Tuple[List[str], List[str]]:
+        """
+        品質の高い順（同点なら新しい順）に top_k 枚を索引から選ぶ。
+        戻り値: (撮影順の画像パス, そのうち顔切り抜きのパス)
+        """
+        rows = [(str(self.store.abs_path(rel)), crop) for rel, crop in self.store.image_repo.best(employee_code, top_k)]
+        return sorted(p for p, _c in rows), [p for p, crop in rows if crop]
+
+    def list_images(self, employee_code: str, top_k: int, workers: Optional[int] = None) -> List[str]:
+        self._measure_missing([employee_code], workers)
+        return self._pick_best(employee_code, top_k)[0]
+
+    def _select(self, top_k: int, workers: Optional[int]):
+        """戻り値: (name_map, {code: 使う画像パス}, そのうち顔切り抜きのパス)"""
+        name_map = {r["code"]: r["name"] for r in self.emp_repo.list_all()}
+
+        with_images = [code for code in self.store.counts() if code in name_map]
+        self._measure_missing(with_images, workers)
+
+        imgs_by_code: Dict[str, List[str]] = {}
+        crops: List[str] = []
+        for code in with_images:
+            imgs, code_crops = self._pick_best(code, top_k)
+            imgs_by_code[code] = imgs
+            crops.extend(code_crops)
+        return name_map, imgs_by_code, crops
+
+    @inst.timed("gallery.build")
+    def build(
+        self,
+        top_k: int,
+        workers: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        with_bow: bool = False,
+    ) -> Tuple[Dict[str, str], Dict[str, List[np.ndarray]]]:
+        """
+        戻り値: (name_map {code: 氏名}, des_map {code: [記述子, ...]})
+        progress(done, total) は画像単位（キャッシュヒット分は最初にまとめて進む）。
+        with_bow=True なら self.bow_index も最新にする。
+        """
+        name_map, imgs_by_code, crops = self._select(top_k, workers)
+        cached: Dict[str, np.ndarray] = {}
+        for code, imgs in imgs_by_code.items():
+            cached.update(self.cache.get_valid(code, imgs))
+
+        missing = [p for imgs in imgs_by_code.values() for p in imgs if p not in cached]
+        total = sum(len(v) for v in imgs_by_code.values())
+        hits = total - len(missing)
+        if progress:
+            progress(hits, total)
+
+        with inst.span("gallery.extract", images=len(missing), cached=hits):
+            fresh = face_features.extract_many(
+                missing,
+                workers=workers,
+                progress=(lambda d, _t: progress(hits + d, total)) if progress else None,
+                crops=crops,  # 顔切り抜きは検出を省く
+            )
+
+        des_map: Dict[str, List[np.ndarray]] = {}
+        des_by_path: Dict[str, np.ndarray] = {}
+        for code, imgs in imgs_by_code.items():
+            new_for_code = {p: fresh[p] for p in imgs if p in fresh}
+            offsets = self.cache.update_from_paths(code, new_for_code)
+            self.store.image_repo.set_descriptor_offsets(
+                {f"{code}/{name}": off for name, off in offsets.items()}
+            )
+
+            desc_list: List[np.ndarray] = []
+            for p in imgs:
+                des = cached.get(p)
+                if des is None:
+                    des = fresh.get(p)
+                if des is not None and len(des) > 0:
+                    desc_list.append(des)
+                    des_by_path[p] = des
+            if desc_list:
+                des_map[code] = desc_list
+
+        if with_bow:
+            self._sync_bow(imgs_by_code, des_by_path)
+        return name_map, des_map
+
+    def _sync_bow(self, imgs_by_code: Dict[str, List[str]], des_by_path: Dict[str, np.ndarray]) -> None:
+        # 照合中のスレッドが前の索引を使っていても触らないよう、毎回別のインスタンスを作る
+        path = self.cache.root / self.BOW_FILE
+        idx = BowIndex.load(path, self.BOW_SIGNATURE)
+        with inst.span("gallery.bow", docs=len(des_by_path)):
+            if idx.sync(imgs_by_code, des_by_path):
+                idx.save(path)
+            idx.prepare()
+        self.bow_index = idx
+
+    @inst.timed("gallery.build_embeddings")
+    def build_embeddings(
+        self,
+        top_k: int,
+        embed_cfg: dict,
+        workers: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Tuple[Dict[str, str], Dict[str, np.ndarray]]:
+        """
+        戻り値: (name_map {code: 氏名}, emb_map {code: 埋め込み n x D（L2 正規化済み）})
+        embed_cfg は embedding_matcher.embed_config の戻り値。モデルが変わればキャッシュは作り直し。
+        """
+        cache = DescriptorCache(embedding_matcher.embed_signature(embed_cfg), subdir="embeddings")
+        name_map, imgs_by_code, crops = self._select(top_k, workers)
+        cached: Dict[str, np.ndarray] = {}
+        for code, imgs in imgs_by_code.items():
+            cached.update(cache.get_valid(code, imgs))
+
+        missing = [p for imgs in imgs_by_code.values() for p in imgs if p not in cached]
+        total = sum(len(v) for v in imgs_by_code.values())
+        hits = total - len(missing)
+        if progress:
+            progress(hits, total)
+
+        with inst.span("gallery.embed", images=len(missing), cached=hits):
+            fresh = embedding_matcher.embed_many(
+                missing,
+                embed_cfg,
+                workers=workers,
+                progress=(lambda d, _t: progress(hits + d, total)) if progress else None,
+                crops=crops,
+            )
+
+        emb_map: Dict[str, np.ndarray] = {}
+        for code, imgs in imgs_by_code.items():
+            # キャッシュは 1 画像 1 行（1 x D）で持つ
+            cache.update_from_paths(
+                code, {p: v[None, :] for p in imgs if (v := fresh.get(p)) is not None}
+            )
+            rows = [cached[p] if p in cached else fresh[p][None, :]
+                    for p in imgs if p in cached or fresh.get(p) is not None]
+            if rows:
+                emb_map[code] = np.vstack(rows).astype(np.float32)
+        return name_map, emb_map
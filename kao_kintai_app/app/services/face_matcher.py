@@ -0,0 +1,393 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.services import face_features
+from app.services import instrumentation as inst
+from app.services.embedding_matcher import EmbeddingMatcher
+
+
+class _Gallery(NamedTuple):
+    names: Dict[str, str]
+    des: Dict[str, List[np.ndarray]]
+    weights: Dict[str, np.ndarray]     # 重複除去した従業員の分だけ
+    codes: List[str]                   # 候補絞り込み用: all_des の持ち主（owner の添字 → code）
+    all_des: np.ndarray                # 全員の記述子を縦に連結したもの
+    owner: np.ndarray                  # all_des の各行が codes の何番目の人のものか
+    bow: Optional[object]              # 単語ヒストグラムの索引（shortlist_method="bow" のとき）
+    generation: int = 0                # 差し替えのたびに 1 増える（1:1 確認の打ち切り判定用）
+
+
+def _freeze(a: np.ndarray) -> np.ndarray:
+    """公開したギャラリーの配列は書き換え不可にする（読む側がロックなしで使えることの保証）"""
+    a.flags.writeable = False
+    return a
+
+
+def _stack(name_map, des_map, weights_map, bow=None, generation: int = 0) -> _Gallery:
+    # 受け取った dict は写してから使う（呼び出し側が後で書き換えても公開済みの版は変わらない）
+    name_map = dict(name_map)
+    des_map = {c: [_freeze(d) for d in lst] for c, lst in des_map.items()}
+    weights_map = {c: _freeze(w) for c, w in weights_map.items()}
+    codes = [c for c, lst in des_map.items() if lst]
+    chunks = [d for c in codes for d in des_map[c]]
+    owner = np.repeat(
+        np.arange(len(codes), dtype=np.int32),
+        [sum(len(d) for d in des_map[c]) for c in codes],
+    )
+    all_des = np.vstack(chunks) if chunks else np.zeros((0, 32), dtype=np.uint8)
+    return _Gallery(name_map, des_map, weights_map, codes, _freeze(all_des), _freeze(owner), bow, generation)
+
+
+class FaceMatcher:
+    """
+    登録者ギャラリー（name_map / des_map）との照合と Unknown 判定。
+    複数のカメラ（スレッド）から 1 つを共有して使う前提:
+      - ギャラリーは書き換え不可のスナップショット（_Gallery）で、再読込は新しい版を作って
+        参照を 1 回代入で差し替える。照合は呼び出しの最初に snapshot を 1 回読むだけ（ロック不要）
+      - ORB / BFMatcher はスレッドごとに持つ（OpenCV のオブジェクトはスレッド間で共有しない）
+    compact_radius > 0 なら、差し替え時に従業員ごとの記述子を重複除去して 1 つの代表集合にまとめ、
+    画像ごとの最大値ではなく「良いマッチの重みの合計」で採点する（face_features.compact_descriptors）。
+
+    照合は 2 段（shortlist_size > 0 のとき）:
+      1) 候補を shortlist_size 人に絞る（shortlist_method）
+           "votes": 顔の記述子のうち反応の強い shortlist_probe 個だけを全員分まとめて 1 回で
+                    最近傍検索し、持ち主ごとの票数で選ぶ
+           "bow"  : 単語ヒストグラムの転置ファイル（bow_index.BowIndex）の類似度で選ぶ
+      2) 1 段目の点の高い順に ratio test で本採点。1 位の本採点がしきい値に届いた後、
+         残りの候補の推定点（1 位の本採点 × 1 段目の点の比）が判定（確定 / Unknown）を覆さない見込みになった時点で打ち切る（打ち切った分の推定点は 2 位の点に含める）
+    """
+
+    wants_color = False  # 顔領域はグレーで足りる（埋め込み方式は True）
+    error = ""           # ORB は読み込むモデルが無いので常に空（EmbeddingMatcher と同じ形）
+
+    def __init__(
+        self,
+        match_threshold: int = 22,
+        ratio_test: float = 0.75,
+        unknown_min_gap: int = 8,
+        unknown_margin_ratio: float = 0.25,
+        best_second_ratio: float = 1.35,
+        compact_radius: int = 0,
+        shortlist_size: int = 0,
+        shortlist_probe: int = 96,
+        shortlist_max_dist: int = 64,
+        shortlist_method: str = "votes",
+    ):
+        self.match_threshold = int(match_threshold)
+        self.ratio_test = float(ratio_test)
+        self.unknown_min_gap = int(unknown_min_gap)
+        self.unknown_margin_ratio = float(unknown_margin_ratio)
+        self.best_second_ratio = float(best_second_ratio)
+        self.compact_radius = int(compact_radius)
+        self.shortlist_size = int(shortlist_size)
+        self.shortlist_probe = int(shortlist_probe)
+        self.shortlist_max_dist = int(shortlist_max_dist)
+        self.shortlist_method = str(shortlist_method)
+
+        self._gallery: _Gallery = _stack({}, {}, {})
+        self._ready = False
+        self._loaded_at = 0.0
+        self._load_lock = threading.Lock()
+        self._local = threading.local()
+
+    @classmethod
+    def from_config(cls, vcfg: dict) -> "FaceMatcher":
+        return cls(
+            match_threshold=int(vcfg.get("match_threshold", 22)),
+            ratio_test=float(vcfg.get("ratio_test", 0.75)),
+            unknown_min_gap=int(vcfg.get("unknown_min_gap", 8)),
+            unknown_margin_ratio=float(vcfg.get("unknown_margin_ratio", 0.25)),
+            best_second_ratio=float(vcfg.get("best_second_ratio", 1.35)),
+            compact_radius=int(vcfg.get("gallery_compact_radius", 0)),
+            shortlist_size=int(vcfg.get("shortlist_size", 0)),
+            shortlist_probe=int(vcfg.get("shortlist_probe", 96)),
+            shortlist_max_dist=int(vcfg.get("shortlist_max_dist", 64)),
+            shortlist_method=str(vcfg.get("shortlist_method", "votes")),
+        )
+
+    # ---------- ギャラリー ----------
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    @property
+    def snapshot(self) -> _Gallery:
+        """今のギャラリー（書き換え不可）。複数の項目を揃えて読みたいときはこれを 1 回だけ取る。"""
+        return self._gallery
+
+    @property
+    def generation(self) -> int:
+        return self._gallery.generation
+
+    @property
+    def name_map(self) -> Dict[str, str]:
+        return self._gallery.names
+
+    @property
+    def des_map(self) -> Dict[str, List[np.ndarray]]:
+        return self._gallery.des
+
+    @property
+    def weights_map(self) -> Dict[str, np.ndarray]:
+        return self._gallery.weights
+
+    @property
+    def bow_index(self):
+        return self._gallery.bow
+
+    @property
+    def use_bow(self) -> bool:
+        return self.shortlist_size > 0 and self.shortlist_method == "bow"
+
+    def name_of(self, code: str, default: str = "--") -> str:
+        return self._gallery.names.get(code, default)
+
+    def set_gallery(
+        self,
+        name_map: Dict[str, str],
+        des_map: Dict[str, List[np.ndarray]],
+        weights_map: Optional[Dict[str, np.ndarray]] = None,
+        bow=None,
+    ) -> None:
+        """
+        組み上がったものを丸ごと差し替える（読込中も旧データで認識を続けられる）。
+        weights_map を渡すと重複除去済みとしてそのまま使う。bow は FaceGalleryService.bow_index。
+        """
+        if weights_map is None:
+            weights_map = {}
+            if self.compact_radius > 0:
+                des_map, weights_map = self._compact(des_map)
+        self._gallery = _stack(name_map, des_map, weights_map, bow, self._gallery.generation + 1)
+        self._ready = True
+
+    @inst.timed("gallery.compact")
+    def _compact(self, des_map: Dict[str, List[np.ndarray]]):
+        compact: Dict[str, List[np.ndarray]] = {}
+        weights: Dict[str, np.ndarray] = {}
+        for code, desc_list in des_map.items():
+            des, w = face_features.compact_descriptors(desc_list, self.compact_radius)
+            if len(des):
+                compact[code] = [des]
+                weights[code] = w
+        return compact, weights
+
+    def export(self) -> tuple:
+        """set_gallery にそのまま渡せる形（バッチ処理のワーカーへ配る用）"""
+        g = self._gallery
+        return g.names, g.des, g.weights, g.bow
+
+    def load(self, gallery, top_k: int, progress: Optional[Callable[[int, int], None]] = None) -> None:
+        """
+        FaceGalleryService からギャラリーを組み立てて差し替える。
+        複数カメラから同時に呼ばれても実際の読込は 1 回だけ（後から来た側は待って終わる）。
+        """
+        started = time.monotonic()
+        with self._load_lock:
+            if self._ready and self._loaded_at >= started:
+                return
+            name_map, des_map = gallery.build(top_k, progress=progress, with_bow=self.use_bow)
+            self.set_gallery(name_map, des_map, bow=gallery.bow_index if self.use_bow else None)
+            self._loaded_at = time.monotonic()
+
+    def empty(self) -> bool:
+        return False
+
+    # ---------- スレッドごとの OpenCV オブジェクト ----------
+    def _cv(self):
+        loc = self._local
+        if getattr(loc, "orb", None) is None:
+            loc.orb = cv2.ORB_create(nfeatures=face_features.ORB_NFEATURES)
+            # KNN を使うので crossCheck=False
+            loc.bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=False)
+        return loc.orb, loc.bf
+
+    # ---------- 照合（KNN + ratio test） ----------
+    def describe(self, roi_gray, stats=None):
+        """顔領域(グレー) → (キーポイント, 記述子)。照合・検証で使い回せるように分けてある。"""
+        orb, _bf = self._cv()
+        if stats is not None:
+            t0 = time.perf_counter()
+        kp, des = orb.detectAndCompute(roi_gray, None)
+        if stats is not None:
+            stats.add("orb", (time.perf_counter() - t0) * 1000.0)
+        return kp, des
+
+    def recognize(self, roi_gray, stats=None, features=None) -> Tuple[Optional[str], int, int]:
+        """
+        顔領域(グレー) → (code, best, second)。stats(PipelineStats) があれば段ごとの時間を記録。
+        features に describe の結果を渡すと ORB を計算し直さない。
+        """
+        _orb, bf = self._cv()
+        kp, des_l = features if features is not None else self.describe(roi_gray, stats)
+        if stats is not None:
+            t1 = time.perf_counter()
+        if des_l is None or len(des_l) == 0:
+            return None, 0, 0
+
+        g = self._gallery
+        shortlist = self._shortlist(bf, kp, des_l, g)
+        if stats is not None:
+            t2 = time.perf_counter()
+            if shortlist is not None:
+                stats.add("shortlist", (t2 - t1) * 1000.0)
+
+        scores: list[tuple[str, int]] = []
+        skipped = 0  # 採点を省いた候補の点の見込み（最大）
+        if shortlist is None:
+            for code in g.des:
+                scores.append((code, self._score(bf, des_l, g, code)))
+        else:
+            best = 0
+            for code, strength in shortlist:
+                # 打ち切るのは 1 位がしきい値に届いてから（届いていなければ残りに本人がいるかもしれない）
+                if best >= self.match_threshold:
+                    estimate = scores[0][1] * strength
+                    if estimate <= self._overturn_limit(best):
+                        # 残りは見込みでは判定を変えない（見込みは経験則なので 2 位の点には含めておく）。
+                        # 切り捨てなので、含めても上限を超えて Unknown に倒すことはない
+                        skipped = int(estimate)
+                        break
+                c = self._score(bf, des_l, g, code)
+                scores.append((code, c))
+                best = max(best, c)
+
+        if stats is not None:
+            stats.add("match", (time.perf_counter() - t2) * 1000.0)
+
+        if not scores:
+            return None, 0, 0
+
+        scores.sort(key=lambda x: x[1], reverse=True)
+        best_code, best = scores[0]
+        second = max(scores[1][1] if len(scores) >= 2 else 0, skipped)
+
+        if best <= 0:
+            return None, 0, 0
+        return best_code, best, second
+
+    def verify(self, roi_gray, code: str, second: int, stats=None):
+        """
+        1:1 の確認: 直前に特定できた code の記述子とだけ照合する。
+        second は特定したときの 2 位の点（他人の点は数フレームではほぼ変わらないので使い回す）。
+        戻り値: (確認できたか, 点, describe の結果)。失敗したら呼び出し側で features を渡して全員照合する。
+        """
+        features = self.describe(roi_gray, stats)
+        des_l = features[1]
+        g = self._gallery
+        if des_l is None or len(des_l) == 0 or code not in g.des:
+            return False, 0, features
+        _orb, bf = self._cv()
+        if stats is not None:
+            t0 = time.perf_counter()
+        score = self._score(bf, des_l, g, code)
+        if stats is not None:
+            stats.add("verify", (time.perf_counter() - t0) * 1000.0)
+        return not self.is_unknown(code, score, second), score, features
+
+    def _score(self, bf, des_l: np.ndarray, g: _Gallery, code: str) -> int:
+        """1 人分の本採点: ratio test を通ったマッチ数（重複除去済みなら重みの合計）。画像ごとなら最大値。"""
+        ratio = self.ratio_test  # 0.70〜0.85 で調整
+        weights = g.weights.get(code)
+        best_for_code = 0
+        for des_ref in g.des[code]:
+            try:
+                knn = bf.knnMatch(des_l, des_ref, k=2)
+            except cv2.error:
+                continue
+
+            good = 0.0
+            for pair in knn:
+                if len(pair) < 2:
+                    continue
+                m, n = pair[0], pair[1]
+                if m.distance < ratio * n.distance:
+                    good += 1.0 if weights is None else float(weights[m.trainIdx])
+            best_for_code = max(best_for_code, int(round(good)))
+        return best_for_code
+
+    def _shortlist(self, bf, kp, des_l: np.ndarray, g: _Gallery) -> Optional[List[Tuple[str, float]]]:
+        """
+        1 段目: 候補 [(code, 1 位に対する点の比 0〜1)] を点の高い順に返す。
+        絞り込みが無効・不要なら None（全員を本採点）。
+        """
+        if self.shortlist_size <= 0 or len(g.codes) <= 1:
+            return None
+        if self.shortlist_method == "bow" and g.bow is not None:
+            points = g.bow.query(des_l)
+        else:
+            points = self._votes(bf, kp, des_l, g)
+        if not points:
+            return None
+        ranked = sorted(points.items(), key=lambda x: x[1], reverse=True)[: self.shortlist_size]
+        top = max(ranked[0][1], 1e-9)
+        return [(code, p / top) for code, p in ranked]
+
+    def _votes(self, bf, kp, des_l: np.ndarray, g: _Gallery) -> Dict[str, float]:
+        """反応の強い shortlist_probe 個の記述子の最近傍が誰の記述子か → {code: 票数}"""
+        n = min(self.shortlist_probe, len(des_l))
+        strongest = np.argsort([-k.response for k in kp])[:n]
+        try:
+            matches = bf.match(des_l[strongest], g.all_des)
+        except cv2.error:
+            return {}
+
+        votes = np.zeros(len(g.codes), dtype=np.int32)
+        for m in matches:
+            if m.distance < self.shortlist_max_dist:
+                votes[g.owner[m.trainIdx]] += 1
+        return {c: float(v) for c, v in zip(g.codes, votes)}
+
+    def _overturn_limit(self, best: int) -> float:
+        """
+        1 位の点 best（しきい値以上）に対して、候補の点の見込みがこれ以下なら採点を省く、という上限。
+        2 位がこれを超えると Unknown に倒れる値。
+        見込み（1 位の点 × 候補の強さ）は経験則で、実際の点が上回ることもある。
+        そのため省いた候補の見込みは recognize が 2 位の点に含める。
+        """
+        return min(
+            best - self.unknown_min_gap,
+            best / self.best_second_ratio,
+            best * (1.0 - self.unknown_margin_ratio),
+        )
+
+    # ---------- Unknown 判定 ----------
+    def is_unknown(self, code: Optional[str], best: int, second: int) -> bool:
+        """誤認識を減らすため、どれか 1 つでも弱ければ Unknown に倒す。"""
+        if code is None or best < self.match_threshold:
+            return True
+        gap = best - second
+
+        # margin_ratio: (best-second)/best（大きいほど「独走」）
+        margin_ratio = (best - second) / max(best, 1)
+
+        # best/second の比（大きいほど「独走」）
+        best_second_ratio = best / max(second, 1)
+
+        return (
+            gap < self.unknown_min_gap
+            or margin_ratio < self.unknown_margin_ratio
+            or best_second_ratio < self.best_second_ratio
+        )
+
+
+# vision.recognizer の選択肢
+RECOGNIZERS = ("orb", "embedding")
+
+
+def create_matcher(vcfg: dict):
+    """
+    vision 設定から照合器を作る。
+      recognizer : orb（ORB 特徴点の照合, 既定） / embedding（顔埋め込みモデルのコサイン類似度）
+    どちらも load / set_gallery / describe / recognize / verify / is_unknown が同じ形で使える。
+    """
+    name = str(vcfg.get("recognizer", "orb")).lower()
+    if name == "orb":
+        return FaceMatcher.from_config(vcfg)
+    if name == "embedding":
+        return EmbeddingMatcher.from_config(vcfg)
+    raise ValueError(f"未対応の照合方式です: {name}（{' / '.join(RECOGNIZERS)}）")
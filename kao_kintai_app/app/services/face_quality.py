@@ -0,0 +1,105 @@
+from __future__ import annotations
+from typing import Callable, Dict, Iterable, Optional
+
+import cv2
+
+from app.services import face_features
+
+EYE_CASCADE_FILE = "haarcascade_eye.xml"
+
+# プロセス（ワーカー）ごとに1回だけ作るモデル
+_face_cascade = None
+_eye_cascade = None
+
+
+def _models():
+    global _face_cascade, _eye_cascade
+    if _face_cascade is None:
+        _face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + face_features.CASCADE_FILE)
+    if _eye_cascade is None:
+        _eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + EYE_CASCADE_FILE)
+    return _face_cascade, _eye_cascade
+
+
+def sharpness_brightness(roi_gray, lap=None) -> tuple:
+    """
+    顔領域(グレー) → (Laplacian 分散, 平均輝度)。
+    ksize=1 の Laplacian は整数なので int16 で計算しても float64 と同じ分散になる（8 分の 1 のメモリ）。
+    lap に roi と同じ大きさの int16 配列を渡すとそこへ書き込む（毎フレームの確保を避ける用）。
+    """
+    lap = cv2.Laplacian(roi_gray, cv2.CV_16S, dst=lap)
+    _mean, std = cv2.meanStdDev(lap)
+    return float(std[0, 0]) ** 2, float(cv2.mean(roi_gray)[0])
+
+
+def measure(img_bgr, face_cascade=None, eye_cascade=None, min_size=(120, 120), detector=None) -> Optional[dict]:
+    """
+    画像の最大の顔について品質指標を測る。顔が無ければ None。
+      area_ratio : 顔面積 / 画像面積
+      blur       : 顔領域の Laplacian 分散（大きいほどくっきり）
+      brightness : 顔領域の平均輝度
+      eyes       : 顔領域内で見つかった目の数
+      face       : (x, y, w, h)
+    detector（face_detector の検出器）を渡すと顔探しはそちらで行う（目の検出は Haar のまま）。
+    """
+    if img_bgr is None:
+        return None
+    if face_cascade is None or eye_cascade is None:
+        face_cascade, eye_cascade = _models()
+
+    h, w = img_bgr.shape[:2]
+    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+    try:
+        if detector is not None:
+            faces = detector.detect(img_bgr, gray)
+        else:
+            faces = face_cascade.detectMultiScale(gray, 1.1, 5, minSize=min_size)
+    except cv2.error:
+        return None
+    if len(faces) == 0:
+        return None
+
+    x, y, fw, fh = (int(v) for v in max(faces, key=lambda r: r[2] * r[3]))
+    roi_gray = gray[y:y + fh, x:x + fw]
+    eyes = eye_cascade.detectMultiScale(roi_gray, 1.1, 8)
+    blur, brightness = sharpness_brightness(roi_gray)
+    return {
+        "area_ratio": (fw * fh) / float(w * h),
+        "blur": blur,
+        "brightness": brightness,
+        "eyes": int(len(eyes)),
+        "face": (x, y, fw, fh),
+    }
+
+
+def score(m: Optional[dict]) -> float:
+    """
+    品質指標 → 0〜1 のスコア（ギャラリーに使う画像の順位付け用）。
+    くっきり 50% / 明るさが中庸 30% / 顔の大きさ 20%、目が見つからなければ 0.8 倍。
+    """
+    if not m:
+        return 0.0
+    sharp = min(m["blur"] / 300.0, 1.0)
+    light = max(0.0, 1.0 - abs(m["brightness"] - 125.0) / 125.0)
+    size = min(m["area_ratio"] / 0.25, 1.0)
+    s = 0.5 * sharp + 0.3 * light + 0.2 * size
+    return round(s * (1.0 if m["eyes"] >= 1 else 0.8), 4)
+
+
+def measure_file(path: str) -> Optional[dict]:
+    # 登録画像は顔が大きく写っているので特徴量計算と同じ最小サイズで探す
+    return measure(cv2.imread(str(path)), min_size=face_features.DATASET_MIN_FACE)
+
+
+def _measure_job(path: str):
+    # ProcessPoolExecutor から呼ぶのでモジュール直下の関数にしておく（pickle 可能）
+    return path, measure_file(path)
+
+
+def measure_many(
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Optional[dict]]:
+    """複数画像の品質指標をまとめて測る（既存画像の後追い計測用）。"""
+    return face_features.map_files(_measure_job, paths, workers=workers, progress=progress)
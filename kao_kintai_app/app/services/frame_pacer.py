@@ -0,0 +1,42 @@
+from __future__ import annotations
+import time
+
+
+class FramePacer:
+    """
+    カメラループの次回呼び出しまでの待ち時間を決める。
+      - 1 周の処理時間を差し引いて target_fps に合わせる（固定 30ms 待ちをやめる）
+      - 顔が idle_after_sec 秒見えていなければ idle_fps まで落とす
+      - 顔が見えたら次の周からすぐ target_fps に戻す
+    """
+
+    def __init__(self, target_fps: float = 30.0, idle_fps: float = 5.0,
+                 idle_after_sec: float = 10.0, min_delay_ms: int = 1):
+        self.target_period = 1.0 / max(1.0, float(target_fps))
+        self.idle_period = 1.0 / max(0.5, min(float(idle_fps), float(target_fps)))
+        self.idle_after = float(idle_after_sec)
+        self.min_delay_ms = int(min_delay_ms)
+        now = time.perf_counter()
+        self._iter_start = now
+        self._last_face_t = now  # 起動直後は通常速度から始める
+
+    @classmethod
+    def from_config(cls, vcfg: dict) -> "FramePacer":
+        return cls(
+            target_fps=float(vcfg.get("target_fps", 30)),
+            idle_fps=float(vcfg.get("idle_fps", 5)),
+            idle_after_sec=float(vcfg.get("idle_after_sec", 10)),
+        )
+
+    def begin(self) -> None:
+        """ループ 1 周の先頭で呼ぶ。"""
+        self._iter_start = time.perf_counter()
+
+    def next_delay_ms(self, face_seen: bool) -> int:
+        """ループ 1 周の最後で呼び、after() に渡す待ち時間(ms)を返す。"""
+        now = time.perf_counter()
+        if face_seen:
+            self._last_face_t = now
+        period = self.idle_period if (now - self._last_face_t) >= self.idle_after else self.target_period
+        remaining = period - (now - self._iter_start)
+        return max(self.min_delay_ms, int(remaining * 1000))
@@ -0,0 +1,240 @@
+"""
+軽量な計測（スパン / タイマー）。
+
+    from app.services import instrumentation as inst
+
+    with inst.span("clock.detect"):
+        ...
+
+    @inst.timed("repo.employee.list_all")
+    def list_all(self): ...
+
+app_config.json の "instrumentation.enabled" が false のときは何もしない
+（with / デコレータのコストはフラグ判定 1 回だけ）。
+有効時は data/logs/trace.jsonl にローテーションしながら 1 行 1 スパンで書き出し、
+名前ごとの直近の所要時間を RollingWindow に保持する（オーバーレイ表示用）。
+"""
+from __future__ import annotations
+import functools
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def _app_root() -> Path:
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).resolve().parent
+    return Path(__file__).resolve().parents[2]
+
+
+class RollingWindow:
+    """直近 maxlen 件の値を保持し、パーセンタイルを返すリングバッファ。"""
+
+    def __init__(self, maxlen: int = 512):
+        self._buf: deque = deque(maxlen=maxlen)
+        self.count = 0  # 累計件数（リングから溢れた分も含む）
+
+    def add(self, value: float) -> None:
+        self._buf.append(value)
+        self.count += 1
+
+    def __len__(self) -> int:
+        return len(self._buf)
+
+    def values(self) -> list:
+        return list(self._buf)
+
+    def copy(self) -> "RollingWindow":
+        w = RollingWindow(self._buf.maxlen or 0)
+        w._buf.extend(self._buf)
+        w.count = self.count
+        return w
+
+    def mean(self) -> float:
+        vals = self.values()
+        return sum(vals) / len(vals) if vals else 0.0
+
+    def percentiles(self, *qs: float) -> tuple:
+        vals = sorted(self.values())
+        if not vals:
+            return tuple(0.0 for _ in qs)
+        n = len(vals)
+        return tuple(vals[min(n - 1, int(q / 100.0 * n))] for q in qs)
+
+
+class _State:
+    def __init__(self):
+        self.enabled = False
+        self.window = 512
+        self.windows: Dict[str, RollingWindow] = {}
+        self.lock = threading.Lock()
+        self.logger: Optional[logging.Logger] = None
+        self.listener: Optional[logging.handlers.QueueListener] = None
+
+
+_state = _State()
+
+
+# ===== 設定 =====
+def configure(cfg: Dict[str, Any]) -> None:
+    """
+    cfg: ConfigService.get_instrumentation() の戻り値
+      enabled        : 計測の有効/無効
+      trace          : JSONL トレースを書き出すか
+      trace_max_kb   : トレース 1 ファイルの上限（超えたらローテーション）
+      trace_backups  : 残す世代数
+      window         : パーセンタイル計算に使う直近件数
+    """
+    shutdown()
+    _state.enabled = bool(cfg.get("enabled", False))
+    _state.window = int(cfg.get("window", 512))
+    if not _state.enabled or not cfg.get("trace", True):
+        return
+
+    log_dir = _app_root() / "data" / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        log_dir / "trace.jsonl",
+        maxBytes=int(cfg.get("trace_max_kb", 2048)) * 1024,
+        backupCount=int(cfg.get("trace_backups", 3)),
+        encoding="utf-8",
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    # ファイル書き込みは別スレッド（UI / カメラループを止めない）
+    q: queue.Queue = queue.Queue(-1)
+    logger = logging.getLogger("kao_kintai.trace")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.handlers[:] = [logging.handlers.QueueHandler(q)]
+    _state.listener = logging.handlers.QueueListener(q, handler)
+    _state.listener.start()
+    _state.logger = logger
+
+
+def shutdown() -> None:
+    if _state.listener is not None:
+        _state.listener.stop()
+        for h in _state.listener.handlers:
+            h.close()
+    _state.listener = None
+    _state.logger = None
+
+
+def enabled() -> bool:
+    return _state.enabled
+
+
+# ===== 記録 =====
+def record(name: str, ms: float, **attrs) -> None:
+    if not _state.enabled:
+        return
+    with _state.lock:
+        w = _state.windows.get(name)
+        if w is None:
+            w = _state.windows[name] = RollingWindow(_state.window)
+        w.add(ms)
+    if _state.logger is not None:
+        rec = {"ts": round(time.time(), 3), "name": name, "ms": round(ms, 3),
+               "thread": threading.current_thread().name}
+        if attrs:
+            rec.update(attrs)
+        _state.logger.info(json.dumps(rec, ensure_ascii=False, default=str))
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "t0")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.t0) * 1000.0
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        record(self.name, ms, **self.attrs)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **attrs):
+    """with で囲んだ区間の所要時間を記録する。無効時は何もしない。"""
+    if not _state.enabled:
+        return _NULL_SPAN
+    return _Span(name, attrs)
+
+
+def timed(name: str | None = None):
+    """関数の所要時間を記録するデコレータ。name 省略時は修飾名。"""
+    def deco(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(label, (time.perf_counter() - t0) * 1000.0)
+        return wrapper
+    return deco
+
+
+def instrument_methods(prefix: str):
+    """
+    クラスデコレータ：__init__ と公開メソッドをすべて timed で包む。
+    （リポジトリの DDL は __init__ で走るのでここで拾える）
+    """
+    def deco(cls):
+        for attr, fn in list(vars(cls).items()):
+            if not callable(fn) or isinstance(fn, (staticmethod, classmethod, type)):
+                continue
+            if attr.startswith("_") and attr != "__init__":
+                continue
+            setattr(cls, attr, timed(f"{prefix}.{attr}")(fn))
+        return cls
+    return deco
+
+
+# ===== 参照（オーバーレイ用） =====
+def snapshot() -> Dict[str, Dict[str, float]]:
+    """{name: {count, p50, p95, p99, max}}（ms）"""
+    # 記録側（別スレッド）と競合しないようロック中にコピーしてから計算する
+    with _state.lock:
+        items = [(name, w.count, w.copy()) for name, w in _state.windows.items()]
+    out: Dict[str, Dict[str, float]] = {}
+    for name, count, w in items:
+        p50, p95, p99, mx = w.percentiles(50, 95, 99, 100)
+        out[name] = {"count": count, "p50": p50, "p95": p95, "p99": p99, "max": mx}
+    return out
+
+
+def reset() -> None:
+    with _state.lock:
+        _state.windows.clear()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    フレーム差分による動き検知ゲート。
+    縮小グレー画像の前フレームとの差分で「動きがあるか」だけを安く判定し、
+    動きが無い間は顔検出・認識を丸ごと省く。
+
+      - threshold : 画素差(0-255) がこれを超えたら変化とみなす
+      - min_ratio : 変化画素の割合がこれ以上なら「動きあり」
+      - hold_sec  : 動きが止まってからもこの秒数はゲートを開けておく
+    顔を検出している間は hold() で開けたままにする（静止して立っている人のため）。
+    """
+
+    def __init__(self, threshold: int = 18, min_ratio: float = 0.005,
+                 hold_sec: float = 2.0, width: int = 160):
+        self.threshold = int(threshold)
+        self.min_ratio = float(min_ratio)
+        self.hold_sec = float(hold_sec)
+        self.width = int(width)
+        self._size: tuple[int, int] | None = None
+        self._last_motion = time.perf_counter()  # 起動直後は開けておく
+        self.changed_ratio = 0.0
+
+    @classmethod
+    def from_config(cls, vcfg: dict) -> "MotionGate":
+        return cls(
+            threshold=int(vcfg.get("motion_threshold", 18)),
+            min_ratio=float(vcfg.get("motion_min_ratio", 0.005)),
+            hold_sec=float(vcfg.get("motion_hold_sec", 2.0)),
+        )
+
+    def _allocate(self, fw: int, fh: int) -> None:
+        w = self.width
+        h = max(1, int(round(fh * w / fw)))
+        self._size = (w, h)
+        self._small = np.empty((h, w, 3), dtype=np.uint8)
+        self._gray = np.empty((h, w), dtype=np.uint8)
+        self._prev = np.empty((h, w), dtype=np.uint8)
+        self._diff = np.empty((h, w), dtype=np.uint8)
+        self._has_prev = False
+
+    def hold(self) -> None:
+        """顔が見えている間はゲートを開けたままにする。"""
+        self._last_motion = time.perf_counter()
+
+    def update(self, frame_bgr) -> bool:
+        """フレームを与えて、重い処理を走らせるべきか（True=開）を返す。"""
+        fh, fw = frame_bgr.shape[:2]
+        if self._size is None or self._frame_shape != (fw, fh):
+            self._frame_shape = (fw, fh)
+            self._allocate(fw, fh)
+
+        cv2.resize(frame_bgr, self._size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        cv2.GaussianBlur(self._gray, (5, 5), 0, dst=self._gray)
+
+        now = time.perf_counter()
+        if self._has_prev:
+            cv2.absdiff(self._gray, self._prev, dst=self._diff)
+            cv2.threshold(self._diff, self.threshold, 255, cv2.THRESH_BINARY, dst=self._diff)
+            self.changed_ratio = cv2.countNonZero(self._diff) / float(self._diff.size)
+            if self.changed_ratio >= self.min_ratio:
+                self._last_motion = now
+        # 前フレームとして保持（確保済みバッファを入れ替えるだけ）
+        self._gray, self._prev = self._prev, self._gray
+        self._has_prev = True
+
+        return (now - self._last_motion) < self.hold_sec
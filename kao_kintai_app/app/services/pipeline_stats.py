@@ -0,0 +1,56 @@
+from __future__ import annotations
+import time
+from typing import Dict, List, Optional
+
+from app.services.instrumentation import RollingWindow
+
+
+class PipelineStats:
+    """
+    カメラループの段ごとの所要時間（ms）とフレームレートを直近 N 件で保持する。
+    HUD が無効なときは生成しない（呼び出し側は None チェックのみ）。
+    """
+
+    STAGES = ("detect", "orb", "embed", "verify", "shortlist", "match", "render")
+
+    def __init__(self, window: int = 120, camera_fps: float = 0.0):
+        self.window = window
+        self.stages: Dict[str, RollingWindow] = {s: RollingWindow(window) for s in self.STAGES}
+        self.frame_interval = RollingWindow(window)
+        self.camera_fps = camera_fps  # カメラの公称 FPS（0 なら取りこぼし推定なし）
+        self.dropped = 0
+        self._last_frame_t: Optional[float] = None
+
+    # ---- 記録 ----
+    def add(self, stage: str, ms: float) -> None:
+        self.stages[stage].add(ms)
+
+    def on_frame(self) -> None:
+        """フレームを 1 枚処理するたびに呼ぶ（取得 FPS と取りこぼし推定）。"""
+        now = time.perf_counter()
+        if self._last_frame_t is not None:
+            dt = now - self._last_frame_t
+            self.frame_interval.add(dt)
+            if self.camera_fps > 0:
+                # 前回から今回までにカメラが出したはずの枚数 - 1 = 読まずに捨てた枚数
+                self.dropped += max(0, int(round(dt * self.camera_fps)) - 1)
+        self._last_frame_t = now
+
+    def on_read_failed(self) -> None:
+        self.dropped += 1
+
+    # ---- 参照 ----
+    def fps(self) -> float:
+        mean = self.frame_interval.mean()
+        return 1.0 / mean if mean > 0 else 0.0
+
+    def lines(self) -> List[str]:
+        out = [f"capture {self.fps():5.1f} fps   dropped {self.dropped}"]
+        for s in self.STAGES:
+            w = self.stages[s]
+            if len(w) == 0:
+                out.append(f"{s:<7}     -")
+                continue
+            p50, p95 = w.percentiles(50, 95)
+            out.append(f"{s:<7} {p50:6.1f} ms  (p95 {p95:6.1f})")
+        return out
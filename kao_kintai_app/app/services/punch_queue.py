@@ -0,0 +1,167 @@
+from __future__ import annotations
+import atexit
+import sqlite3
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+from app.infra.db.attendance_repo import AttendanceRepo
+from app.infra.storage.punch_journal import PunchJournal
+from app.services import instrumentation as inst
+from app.services.attendance_service import AttendanceService
+
+# ジャーナル 1 行に必要な項目（add_many に渡す順）
+_ENTRY_KEYS = ("punch_uid", "employee_code", "punch_type", "ts")
+
+
+class PunchQueue:
+    """
+    打刻の受付（画面のスレッドで即座に返す）と DB への書き込み（専用スレッド）を分ける。
+      - 受付: 打刻できるかは手元の状態（従業員ごとの直前の打刻）で判定し、時刻を付けて
+        ジャーナルに 1 行書いてから返す。DB は待たない
+      - 書き込み: 溜まった分を最大 BATCH_SIZE 件ずつ、ジャーナルの fsync 1 回 + 1 トランザクションで入れる。
+        DB がロック中などで失敗したら、件数を保ったまま間隔を空けてやり直す
+      - 起動時: ジャーナルに残っている打刻（前回 DB に入る前に落ちた分）を最初に書き込む。
+        打刻ID（punch_uid）で重複を弾くので、DB に入った直後に落ちていても二重にならない
+    打刻の書き込みはこのキューだけが行う前提（手元の状態は DB を読むのは従業員ごとに初回だけ）。
+    AttendanceService と同じ形の last_state / allowed_next / punch を持つ。
+    """
+
+    BATCH_SIZE = 32
+    FLUSH_INTERVAL_SEC = 0.2   # 受付から書き込みまでの最大の待ち（まとめ書きのため）
+    RETRY_MAX_SEC = 10.0
+
+    def __init__(self, svc: AttendanceService | None = None, journal: PunchJournal | None = None):
+        self.svc = svc or AttendanceService(AttendanceRepo())
+        self.repo = self.svc.repo
+        self.journal = journal or PunchJournal(self.repo.db_path.with_name("punch_journal.jsonl"))
+        self.error: Optional[str] = None  # 直近の書き込み失敗（成功したら None に戻る）
+
+        self._cond = threading.Condition()
+        self._items: deque = deque()             # DB 未反映の打刻（受付順）
+        self._state: Dict[str, Optional[str]] = {}  # code → 直前の打刻種別（DB + 未反映分）
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- 起動・停止 ----------
+    def start(self) -> "PunchQueue":
+        with self._cond:
+            for e in self.journal.read_all():
+                if not self._valid(e):
+                    continue  # 手で書き換えた等で形の合わない行は入れない
+                self._items.append(e)
+                self._state[e["employee_code"]] = e["punch_type"]
+        self._thread = threading.Thread(target=self._run, name="punch-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    @staticmethod
+    def _valid(e) -> bool:
+        return isinstance(e, dict) and all(isinstance(e.get(k), str) and e[k] for k in _ENTRY_KEYS)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """残りを書き込んでから止める（書ききれなくてもジャーナルに残るので次回の起動で入る）。"""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def pending(self) -> int:
+        return len(self._items)
+
+    # ---------- 受付（AttendanceService と同じ形） ----------
+    def last_state(self, employee_code: str) -> Optional[str]:
+        with self._cond:
+            if employee_code in self._state:
+                return self._state[employee_code]
+        last = self.svc.last_state(employee_code)
+        with self._cond:
+            # DB を読んでいる間に受け付けた打刻があればそちらが新しい
+            return self._state.setdefault(employee_code, last)
+
+    def allowed_next(self, last_type: Optional[str]) -> Set[str]:
+        return self.svc.allowed_next(last_type)
+
+    @inst.timed("punch.accept")
+    def punch(self, employee_code: str, new_type: str) -> Tuple[bool, str, Set[str]]:
+        last = self.last_state(employee_code)
+        with self._cond:
+            last = self._state.get(employee_code, last)
+            allowed = self.allowed_next(last)
+            if new_type not in allowed:
+                last_label = self.svc.LABELS.get(last, "（未打刻）")
+                want_label = self.svc.LABELS.get(new_type, new_type)
+                allowed_labels = " / ".join(self.svc.LABELS[a] for a in allowed)
+                msg = f"いまの状態（直前: {last_label}）では「{want_label}」は打刻できません。次に許可: {allowed_labels}"
+                return False, msg, allowed
+
+            entry = {
+                "punch_uid": uuid.uuid4().hex,
+                "employee_code": employee_code,
+                "punch_type": new_type,
+                "ts": datetime.now().isoformat(),  # 書き込みが遅れても打刻した時刻で記録する
+            }
+            self.journal.append(entry)
+            self._items.append(entry)
+            self._state[employee_code] = new_type
+            self._cond.notify_all()
+        return True, f"{self.svc.LABELS.get(new_type, new_type)} を記録しました。", self.allowed_next(new_type)
+
+    # ---------- 書き込みスレッド ----------
+    def _run(self) -> None:
+        backoff = 0.0
+        while True:
+            with self._cond:
+                if backoff:
+                    self._cond.wait(backoff)
+                # 1 件目が来たら少しだけ待って、続けて来た分とまとめる
+                while not self._items and not self._stop:
+                    self._cond.wait()
+                if not self._items and self._stop:
+                    return
+                if len(self._items) < self.BATCH_SIZE and not self._stop:
+                    self._cond.wait(self.FLUSH_INTERVAL_SEC)
+                batch = [self._items[i] for i in range(min(self.BATCH_SIZE, len(self._items)))]
+
+            try:
+                with inst.span("punch.flush", n=len(batch)):
+                    self.journal.sync()
+                    self.repo.add_many(
+                        [tuple(e[k] for k in _ENTRY_KEYS) for e in batch]
+                    )
+            except (sqlite3.Error, OSError) as ex:
+                self.error = str(ex)
+                backoff = min(max(backoff * 2, 0.5), self.RETRY_MAX_SEC)
+                if self._stop:
+                    return  # ジャーナルに残っているので次回の起動で入る
+                continue
+
+            backoff = 0.0
+            self.error = None
+            with self._cond:
+                for _ in batch:
+                    self._items.popleft()
+                if not self._items:
+                    self.journal.clear()
+
+
+# ---------- プロセスで 1 つ ----------
+_shared: Optional[PunchQueue] = None
+_shared_lock = threading.Lock()
+
+
+def shared_punch_queue() -> PunchQueue:
+    """
+    打刻画面・複数カメラ画面で共有するキュー（手元の状態を 1 つにするため）。
+    初回に起動し、終了時に残りを書き込む。
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = PunchQueue().start()
+            atexit.register(_shared.stop)
+        return _shared
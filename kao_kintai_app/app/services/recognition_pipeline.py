@@ -0,0 +1,308 @@
+from __future__ import annotations
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.services import instrumentation as inst
+from app.services.face_quality import sharpness_brightness
+from app.services.face_detector import create_detector
+from app.services.face_matcher import FaceMatcher
+from app.services.motion_gate import MotionGate
+
+MSG_READY = "カメラに顔を向けてください。"
+MSG_UNKNOWN = "未登録の顔、または一致度が低いため認証できません。"
+MSG_CONFIRMING = "確認中…（ぶれずに少し静止してください）"
+MSG_RECOGNIZED = "顔を認識しました。打刻が可能です。"
+
+
+@dataclass
+class FrameResult:
+    """1 フレーム処理した結果（画面やワーカーはこれを見て表示を更新する）。"""
+    frame: np.ndarray                                  # 枠を描き込んだフレーム
+    face_rect: Optional[Tuple[int, int, int, int]] = None
+    stable_ok: bool = False                            # 品質 OK が QUALITY_OK_FRAMES 連続
+    message: Optional[str] = None                      # None = メッセージは変えない
+    reset: bool = False                                # 推定表示をリセットする
+    code: Optional[str] = None                         # 今回の推定コード（認識を走らせたときだけ）
+    confirmed: bool = False                            # code が ID_OK_FRAMES 連続で確定した
+    can_punch: bool = False                            # 打刻ボタンを有効にしてよい
+    recognized: bool = False                           # このフレームで照合を走らせた
+    verified: bool = False                             # 照合を直前の人との 1:1 確認で済ませた
+    idle: bool = False                                 # 動きが無く検出自体を省いた
+
+
+class RecognitionPipeline:
+    """
+    カメラ 1 台分の「動き検知 → 顔検出 + 品質評価 → 照合 → 確定判定」。
+    UI には触らない（結果は FrameResult で返す）ので、打刻画面・複数カメラのワーカー・
+    ベンチマークから同じ処理を使える。
+    照合器（FaceMatcher / EmbeddingMatcher, vision.recognizer）は複数のパイプラインで共有し、
+    顔検出器（vision.detector）はパイプラインごとに持つ。
+
+    同じ人が立ち続けている間は 1:N の照合をやり直さない: 直前に特定した顔と位置が重なり
+    （IoU >= verify_min_iou）、特定から verify_ttl_sec 以内なら、その人の記述子とだけ照合して確認する。
+    確認できなければ（別人・点が足りない）同じ記述子（埋め込み）で全員と照合し直す。
+
+    グレー画像・Laplacian・顔領域のコピーは確保済みの作業領域に書き込む（1 フレームごとの確保はほぼ無い）。
+    戻り値の FrameResult.frame 以外は次のフレームで上書きされるので、呼び出し側で持ち越さないこと。
+    """
+
+    def __init__(self, matcher: FaceMatcher, vcfg: dict, stats=None, span_prefix: str = "clock"):
+        self.matcher = matcher
+        self.stats = stats  # PipelineStats（HUD 無効時は None）
+        self.span_prefix = span_prefix
+
+        self.MIN_AREA_RATIO = float(vcfg.get("min_area_ratio", 0.10))
+        self.MIN_BLUR_VAR = float(vcfg.get("min_blur_var", 80.0))
+        self.BRIGHT_MIN = int(vcfg.get("bright_min", 50))
+        self.BRIGHT_MAX = int(vcfg.get("bright_max", 210))
+        self.RECOG_INTERVAL = int(vcfg.get("recog_interval", 3))
+        self.ID_OK_FRAMES = int(vcfg.get("id_ok_frames", 2))
+        self.QUALITY_OK_FRAMES = int(vcfg.get("quality_ok_frames", 2))
+        self.VERIFY_FAST_PATH = bool(vcfg.get("verify_fast_path", True))
+        self.VERIFY_TTL_SEC = float(vcfg.get("verify_ttl_sec", 5.0))
+        self.VERIFY_MIN_IOU = float(vcfg.get("verify_min_iou", 0.3))
+
+        with inst.span(f"{span_prefix}.detector_load"):
+            self.detector = create_detector(vcfg)
+
+        # 動き検知ゲート（静止画面では Haar 検出を走らせない）
+        self.motion = MotionGate.from_config(vcfg) if vcfg.get("motion_gate", True) else None
+        self._motion_active = True
+
+        # 状態
+        self.frame_count = 0
+        self.last_best = ("", 0)  # (code, best_matches)
+        self._quality_ok_streak = 0
+        self._id_ok_streak = 0
+        self._last_candidate = ""
+        self.face_seen = False
+        # 1:1 確認用: 1:N で特定した時刻・2位の点、直近の顔の位置
+        self._identified_at = 0.0
+        self._identified_second = 0
+        self._identified_gen = -1  # 特定したときのギャラリーの版（再読込されたら 1:1 確認をやめる）
+        self._track_rect: Optional[Tuple[int, int, int, int]] = None
+
+        # 毎フレーム使い回す作業領域（大きさが変わったときだけ確保し直す）
+        self._gray_buf: Optional[np.ndarray] = None
+        self._lap_flat = np.empty(0, dtype=np.int16)
+        self._face_flat = np.empty(0, dtype=np.uint8)
+
+    # ---------- 状態 ----------
+    @property
+    def confirmed_code(self) -> str:
+        """ID_OK_FRAMES 連続で同じ人と判定できていればそのコード、なければ空文字。"""
+        if self.last_best[0] and self._id_ok_streak >= self.ID_OK_FRAMES:
+            return self.last_best[0]
+        return ""
+
+    def reset(self) -> None:
+        self.last_best = ("", 0)
+        self._id_ok_streak = 0
+        self._last_candidate = ""
+        self._track_rect = None
+
+    def _can_verify(self, rect) -> bool:
+        if not (self.VERIFY_FAST_PATH and self._last_candidate and self._track_rect is not None):
+            return False
+        if self._identified_gen != self.matcher.generation:
+            return False
+        if time.monotonic() - self._identified_at > self.VERIFY_TTL_SEC:
+            return False
+        return _iou(rect, self._track_rect) >= self.VERIFY_MIN_IOU
+
+    # ---------- 1 フレーム処理 ----------
+    def process(self, frame) -> FrameResult:
+        p = self.span_prefix
+        stats = self.stats
+        self.face_seen = False
+        ready = self.matcher.ready
+
+        # 動きが無い（誰もいない）間は検出・認識を省いて映像だけ出す
+        if self.motion is not None:
+            with inst.span(f"{p}.motion"):
+                active = self.motion.update(frame)
+            if not active:
+                res = FrameResult(frame, idle=True)
+                if self._motion_active:
+                    self._motion_active = False
+                    self._quality_ok_streak = 0
+                    self.reset()
+                    res.reset = True
+                    res.message = MSG_READY if ready else None
+                self.frame_count += 1
+                return res
+            self._motion_active = True
+
+        if stats is not None:
+            t0 = time.perf_counter()
+        with inst.span(f"{p}.detect"):
+            res = self._evaluate_and_draw(frame, ready)
+        self.face_seen = res.face_rect is not None
+        if self.face_seen and self.motion is not None:
+            self.motion.hold()
+        if stats is not None:
+            stats.add("detect", (time.perf_counter() - t0) * 1000.0)
+
+        # 顔データがまだ準備できていない間は、映像表示だけして認識はしない
+        if not ready:
+            self.frame_count += 1
+            return res
+
+        # 認識は間引き実行
+        if (
+            res.stable_ok
+            and res.face_rect is not None
+            and (self.frame_count % self.RECOG_INTERVAL == 0)
+        ):
+            x, y, w, h = res.face_rect
+            face_roi = self._face_bgr if self.matcher.wants_color else self._gray[y: y + h, x: x + w]
+
+            features = None
+            if self._can_verify(res.face_rect):
+                with inst.span(f"{p}.verify"):
+                    ok, score, features = self.matcher.verify(
+                        face_roi, self._last_candidate, self._identified_second, stats
+                    )
+                if ok:
+                    code, best, second = self._last_candidate, score, self._identified_second
+                    res.verified = True
+            if not res.verified:
+                with inst.span(f"{p}.recognize"):
+                    code, best, second = self.matcher.recognize(face_roi, stats, features=features)
+                self._identified_at = time.monotonic()
+                self._identified_second = second
+                self._identified_gen = self.matcher.generation
+            self.last_best = (code or "", best)
+            res.recognized = True
+
+            if self.matcher.is_unknown(code, best, second):
+                self.reset()
+                res.reset = True
+                res.message = MSG_UNKNOWN
+            else:
+                if code == self._last_candidate:
+                    self._id_ok_streak += 1
+                else:
+                    self._last_candidate = code
+                    self._id_ok_streak = 1
+                self._track_rect = res.face_rect
+
+                res.code = code
+                res.confirmed = self._id_ok_streak >= self.ID_OK_FRAMES
+                res.message = MSG_RECOGNIZED if res.confirmed else MSG_CONFIRMING
+
+        res.can_punch = (
+            res.stable_ok
+            and (self._id_ok_streak >= self.ID_OK_FRAMES)
+            and (self.last_best[0] != "")
+        )
+        self.frame_count += 1
+        return res
+
+    # ---------- 顔検出 + 品質評価 ----------
+    def analyze(self, gray, frame_bgr=None):
+        """
+        グレー画像 → (最大の顔 (x, y, w, h) / 見つからなければ None, 品質 NG の理由リスト)。
+        DNN 検出器はカラーで推論するので、あれば元のフレームも渡す。
+        状態を持たないのでバッチ処理からも使える。cv2.error は呼び出し側で扱う。
+        """
+        h, w = gray.shape[:2]
+        faces = self.detector.detect(frame_bgr, gray)
+        if len(faces) == 0:
+            return None, []
+
+        x, y, fw, fh = (int(v) for v in max(faces, key=lambda r: r[2] * r[3]))
+        roi_gray = gray[y: y + fh, x: x + fw]
+        fh, fw = roi_gray.shape[:2]  # 枠が画面外にはみ出していた分を詰める
+
+        area_ratio = (fw * fh) / (w * h)
+        if len(self._lap_flat) < fw * fh:
+            self._lap_flat = np.empty(fw * fh, dtype=np.int16)
+        blur, bright = sharpness_brightness(roi_gray, self._lap_flat[: fw * fh].reshape(fh, fw))
+
+        msgs = []
+        if area_ratio < self.MIN_AREA_RATIO:
+            msgs.append("顔をもう少し近づけてください。")
+        if blur < self.MIN_BLUR_VAR:
+            msgs.append("ピントが合っていません（ぶれ/ぼけ）。")
+        if not (self.BRIGHT_MIN <= bright <= self.BRIGHT_MAX):
+            msgs.append("暗すぎ/明るすぎです。照明や露出を調整してください。")
+        return (x, y, fw, fh), msgs
+
+    def _evaluate_and_draw(self, frame_bgr, ready: bool) -> FrameResult:
+        res = FrameResult(frame_bgr)
+        self._gray = None
+        self._face_bgr = None
+
+        h, w = frame_bgr.shape[:2]
+        if h <= 0 or w <= 0:
+            return res
+
+        if self._gray_buf is None or self._gray_buf.shape != (h, w):
+            self._gray_buf = np.empty((h, w), dtype=np.uint8)
+        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY, dst=self._gray_buf)
+        if gray is None or gray.size == 0:
+            return res
+        self._gray = gray
+
+        # 検出器（Cascade / DNN モデル）が読めていなければ落ちないように
+        if self.detector.empty():
+            self._quality_ok_streak = 0
+            if ready:
+                res.message = f"顔検出器の読み込みに失敗しました（{self.detector.error}）。"
+            return res
+
+        # detectMultiScale は環境によって例外が出ることがあるので保護
+        try:
+            rect, msgs = self.analyze(gray, frame_bgr)
+        except cv2.error:
+            self._quality_ok_streak = 0
+            if ready:
+                res.message = "顔検出でエラーが発生しました。カメラ環境を確認してください。"
+            return res
+
+        if rect is None:
+            self._quality_ok_streak = 0
+            if ready:
+                res.message = "顔を映してください。（正面・適度な距離）"
+            return res
+
+        x, y, fw, fh = rect
+        if not msgs:
+            self._quality_ok_streak += 1
+        else:
+            self._quality_ok_streak = 0
+
+        stable_ok = self._quality_ok_streak >= self.QUALITY_OK_FRAMES
+        if not stable_ok and ready:
+            res.message = " / ".join(msgs) or "調整中…"
+
+        # 埋め込み方式はカラーで照合するので、枠を描き込む前に顔領域を取っておく
+        if self.matcher.wants_color:
+            face = frame_bgr[y: y + fh, x: x + fw]
+            n = face.size
+            if len(self._face_flat) < n:
+                self._face_flat = np.empty(n, dtype=np.uint8)
+            self._face_bgr = self._face_flat[:n].reshape(face.shape)
+            np.copyto(self._face_bgr, face)
+
+        color = (0, 200, 0) if stable_ok else (0, 165, 255) if msgs else (0, 200, 255)
+        cv2.rectangle(frame_bgr, (x, y), (x + fw, y + fh), color, 2)
+
+        res.face_rect = (x, y, fw, fh)
+        res.stable_ok = stable_ok
+        return res
+
+
+def _iou(a, b) -> float:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    ih = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = iw * ih
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
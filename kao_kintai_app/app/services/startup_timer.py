@@ -0,0 +1,57 @@
+from __future__ import annotations
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Tuple
+
+# main.py が最初に import するので、ここがほぼプロセス開始時刻になる
+_T0 = time.perf_counter()
+_marks: List[Tuple[str, float]] = []
+_reported = False
+
+
+def _app_root() -> Path:
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).resolve().parent
+    return Path(__file__).resolve().parents[2]
+
+
+def mark(label: str) -> None:
+    """起動からの経過時間を記録する。"""
+    _marks.append((label, time.perf_counter() - _T0))
+
+
+def elapsed_ms() -> float:
+    return (time.perf_counter() - _T0) * 1000.0
+
+
+def format_report() -> str:
+    lines = [f"[{datetime.now().isoformat(timespec='seconds')}] startup"]
+    prev = 0.0
+    for label, t in _marks:
+        lines.append(f"  {t * 1000:8.1f} ms  (+{(t - prev) * 1000:7.1f})  {label}")
+        prev = t
+    return "\n".join(lines)
+
+
+def report(echo: bool = False) -> None:
+    """
+    起動時間レポートを data/logs/startup.log に追記する（1回だけ）。
+    exe（--windowed）ではコンソールが無いのでファイルに残す。
+    echo=True のときだけコンソールにも出す（計測を有効にしたとき）。
+    """
+    global _reported
+    if _reported:
+        return
+    _reported = True
+    text = format_report()
+    try:
+        log_dir = _app_root() / "data" / "logs"
+        log_dir.mkdir(parents=True, exist_ok=True)
+        with open(log_dir / "startup.log", "a", encoding="utf-8") as f:
+            f.write(text + "\n")
+    except OSError:
+        pass
+    if echo and sys.stdout is not None:
+        print(text)
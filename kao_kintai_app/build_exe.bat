@@ -10,12 +10,28 @@ REM 念のため最新版をインストール
 pip install -r requirements.txt
 
 REM exe ビルド（まずはフォルダ形式で）
+REM 画面モジュールは遅延 import のため --hidden-import で明示する
 py -m PyInstaller ^
   --noconfirm --clean ^
   --onedir --windowed ^
   --name KaoKintai ^
   --collect-all cv2 ^
   --collect-all tkcalendar ^
+  --hidden-import app.gui.screens.home_screen ^
+  --hidden-import app.gui.screens.face_clock_screen ^
+  --hidden-import app.gui.screens.shift_submit_screen ^
+  --hidden-import app.gui.screens.my_attendance_screen ^
+  --hidden-import app.gui.screens.shift_view_screen ^
+  --hidden-import app.gui.screens.admin_login_screen ^
+  --hidden-import app.gui.screens.attendance_list_screen ^
+  --hidden-import app.gui.screens.face_data_screen ^
+  --hidden-import app.gui.screens.employee_register_screen ^
+  --hidden-import app.gui.screens.camera_settings_screen ^
+  --hidden-import app.gui.screens.multi_camera_screen ^
+  --hidden-import app.gui.screens.admin_account_register_screen ^
+  --hidden-import app.gui.screens.shift_editor_screen ^
+  --hidden-import app.gui.screens.shift_weekly_review_screen ^
+  --hidden-import app.gui.screens.employee_su_overview_screen ^
   --add-data "config;config" ^
   --add-data "data;data" ^
   --add-data "app\config;app\config" ^
@@ -0,0 +1,52 @@
+from app.services.auto_punch_gate import AutoPunchGate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _gate(enabled=True, cooldown=60.0):
+    clock = FakeClock()
+    return AutoPunchGate(enabled, cooldown, clock=clock), clock
+
+
+def test_disabled_or_ambiguous_never_punches():
+    gate, _ = _gate(enabled=False)
+    assert gate.choose("E1", {"CLOCK_IN"}) is None
+    gate, _ = _gate()
+    assert gate.choose("", {"CLOCK_IN"}) is None
+    assert gate.choose("E1", {"BREAK_START", "CLOCK_OUT"}) is None
+
+
+def test_once_per_visit_and_cooldown_after_leaving():
+    gate, clock = _gate()
+    assert gate.choose("E1", {"CLOCK_IN"}) == "CLOCK_IN"
+    assert gate.choose("E1", {"CLOCK_IN"}) is None   # 立ったまま: 1 回だけ
+
+    gate.reset()
+    clock.now += 59
+    assert gate.choose("E1", {"CLOCK_IN"}) is None   # 戻ってきても cooldown 中
+    clock.now += 1
+    assert gate.choose("E1", {"CLOCK_IN"}) == "CLOCK_IN"
+
+
+def test_cooldown_is_per_person():
+    gate, _ = _gate()
+    assert gate.choose("E1", {"CLOCK_IN"}) == "CLOCK_IN"
+    gate.reset()
+    assert gate.choose("E2", {"CLOCK_IN"}) == "CLOCK_IN"
+
+
+def test_manual_punch_blocks_the_follow_up_auto_punch():
+    gate, clock = _gate()
+    gate.punched("E1")                                # 手動で休憩開始
+    assert gate.choose("E1", {"BREAK_END"}) is None   # すぐに休憩終了を打たない
+    gate.reset()
+    clock.now += 30
+    assert gate.choose("E1", {"BREAK_END"}) is None
+    clock.now += 30
+    assert gate.choose("E1", {"BREAK_END"}) == "BREAK_END"
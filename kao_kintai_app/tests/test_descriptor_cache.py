@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.infra.storage import descriptor_cache
+from app.infra.storage.descriptor_cache import DescriptorCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(descriptor_cache, "_app_root", lambda: tmp_path)
+    return DescriptorCache("sig-1")
+
+
+def _des(n, fill):
+    return np.full((n, 32), fill, dtype=np.uint8)
+
+
+def _image(tmp_path, name, mtime):
+    p = tmp_path / name
+    p.write_bytes(b"")
+    os.utime(p, (mtime, mtime))
+    return p
+
+
+def test_round_trip_and_offsets(cache):
+    offsets = cache.save("E1", {"b.jpg": (2.0, _des(3, 2)), "a.jpg": (1.0, _des(2, 1))})
+    assert offsets == {"a.jpg": 0, "b.jpg": 2}
+    entries = cache.load("E1")
+    assert entries["a.jpg"][0] == 1.0 and np.array_equal(entries["a.jpg"][1], _des(2, 1))
+    assert entries["b.jpg"][0] == 2.0 and np.array_equal(entries["b.jpg"][1], _des(3, 2))
+
+
+def test_get_valid_drops_changed_and_missing_images(cache, tmp_path):
+    a = _image(tmp_path, "a.jpg", 1000)
+    b = _image(tmp_path, "b.jpg", 2000)
+    cache.update_from_paths("E1", {str(a): _des(2, 1), str(b): _des(2, 2), str(tmp_path / "gone.jpg"): _des(1, 3)})
+    assert set(cache.load("E1")) == {"a.jpg", "b.jpg"}
+
+    os.utime(b, (3000, 3000))  # 撮り直し
+    valid = cache.get_valid("E1", [a, b, tmp_path / "c.jpg"])
+    assert list(valid) == [str(a)]
+    assert np.array_equal(valid[str(a)], _des(2, 1))
+
+
+def test_update_merges_and_overwrites(cache):
+    cache.save("E1", {"a.jpg": (1.0, _des(1, 1)), "b.jpg": (1.0, _des(1, 2))})
+    cache.update("E1", {"b.jpg": (2.0, _des(2, 9)), "c.jpg": (1.0, _des(1, 3))})
+    entries = cache.load("E1")
+    assert sorted(entries) == ["a.jpg", "b.jpg", "c.jpg"]
+    assert entries["b.jpg"][0] == 2.0 and len(entries["b.jpg"][1]) == 2
+
+
+def test_signature_change_and_corruption_invalidate(cache, tmp_path):
+    cache.save("E1", {"a.jpg": (1.0, _des(1, 1))})
+    assert DescriptorCache("sig-2").load("E1") == {}
+
+    cache.path_for("E1").write_bytes(b"broken")
+    assert cache.load("E1") == {}
+
+
+def test_invalidate(cache):
+    cache.save("E1", {"a.jpg": (1.0, _des(1, 1))})
+    cache.invalidate("E1")
+    cache.invalidate("E1")  # 無くてもよい
+    assert cache.load("E1") == {}
@@ -0,0 +1,67 @@
+import pytest
+
+from app.services.employee_import_service import EmployeeImportService
+
+
+@pytest.fixture
+def svc():
+    # read_csv / find_photos は DB もファイル置き場も使わない
+    return EmployeeImportService(repo=object(), store=object(), cache=object())
+
+
+def _write(tmp_path, text, encoding="utf-8-sig"):
+    p = tmp_path / "employees.csv"
+    p.write_bytes(text.encode(encoding))
+    return p
+
+
+def test_reads_rows_and_defaults(svc, tmp_path):
+    rows, errors = svc.read_csv(_write(tmp_path, "name,role,wage,face_key\n山田 太郎,user,\"1,100\",yamada\n鈴木,,,\n"))
+    assert errors == []
+    assert rows == [
+        {"name": "山田 太郎", "role": "USER", "wage": 1100.0, "face_key": "yamada"},
+        {"name": "鈴木", "role": "USER", "wage": None, "face_key": "鈴木"},
+    ]
+
+
+def test_reads_shift_jis(svc, tmp_path):
+    rows, errors = svc.read_csv(_write(tmp_path, "name\r\n佐藤\r\n", encoding="cp932"))
+    assert errors == [] and [r["name"] for r in rows] == ["佐藤"]
+
+
+def test_missing_name_header(svc, tmp_path):
+    assert svc.read_csv(_write(tmp_path, "氏名,role\n山田,USER\n")) == ([], ["ヘッダーに name 列がありません。"])
+
+
+def test_bad_rows_are_reported_with_line_numbers(svc, tmp_path):
+    text = (
+        "name,role,wage,face_key\n"
+        "山田,USER,1100,yamada\n"
+        "鈴木,USER,1000,suzuki,extra\n"   # 列が多い
+        ",USER,,\n"                       # 氏名が空
+        "田中,BOSS,,\n"                   # ロール不正
+        "高橋,USER,abc,\n"                # 時給が数値でない
+        "伊藤,USER\n"                     # 列が少ないのは省略扱い
+    )
+    rows, errors = svc.read_csv(_write(tmp_path, text))
+    assert [r["name"] for r in rows] == ["山田", "伊藤"]
+    assert [e.split(":")[0] for e in errors] == ["3行目", "4行目", "5行目", "6行目"]
+    assert "列がヘッダーより多い" in errors[0]
+
+
+def test_quoted_newline_is_kept_and_line_numbers_follow(svc, tmp_path):
+    text = 'name,role\n"佐藤\n花子",ADMIN\n,USER\n'
+    rows, errors = svc.read_csv(_write(tmp_path, text))
+    assert rows[0]["name"] == "佐藤\n花子" and rows[0]["role"] == "ADMIN"
+    assert errors == ["4行目: 氏名が空です。"]
+
+
+def test_find_photos(tmp_path):
+    (tmp_path / "yamada").mkdir()
+    (tmp_path / "yamada" / "a.JPG").write_bytes(b"")
+    (tmp_path / "yamada" / "memo.txt").write_bytes(b"")
+    for name in ("suzuki.jpg", "suzuki_2.png", "suzukiX.jpg"):
+        (tmp_path / name).write_bytes(b"")
+    find = EmployeeImportService.find_photos
+    assert [p.name for p in find(tmp_path, "yamada")] == ["a.JPG"]
+    assert [p.name for p in find(tmp_path, "suzuki")] == ["suzuki.jpg", "suzuki_2.png"]
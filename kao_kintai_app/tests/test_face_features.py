@@ -0,0 +1,34 @@
+import numpy as np
+
+from app.services.face_features import compact_descriptors
+
+
+def _random(n, seed):
+    return np.random.default_rng(seed).integers(0, 256, size=(n, 32), dtype=np.uint8)
+
+
+def test_near_duplicates_merge_and_weights_count_images():
+    base = _random(10, 0)
+    noisy = base.copy()
+    noisy[:, 0] ^= 0b00000111        # 3 ビットだけ違う（同じ特徴の撮り直し）
+    only_one = _random(1, 1)          # 1 枚にしか出ない特徴
+    reps, weights = compact_descriptors([base, noisy, only_one], radius=32)
+
+    assert reps.dtype == np.uint8 and reps.shape == (11, 32)
+    assert weights.dtype == np.float32
+    assert np.allclose(sorted(weights), [1 / 3] + [2 / 3] * 10)
+
+
+def test_radius_is_inclusive():
+    a = _random(5, 2)
+    b = a.copy()
+    b[0, 0] ^= 0b01                   # 1 ビット違い → radius=1 以内なので同じ群
+    b[1, 0] ^= 0b11                   # 2 ビット違い → 別の群
+    reps, weights = compact_descriptors([a, b], radius=1)
+    assert len(reps) == 6
+    assert np.allclose(sorted(weights), [0.5, 0.5, 1, 1, 1, 1])
+
+
+def test_empty_input():
+    reps, weights = compact_descriptors([None, np.zeros((0, 32), np.uint8)], radius=32)
+    assert reps.shape == (0, 32) and weights.shape == (0,)
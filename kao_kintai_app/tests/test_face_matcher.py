@@ -0,0 +1,55 @@
+import numpy as np
+
+from app.services.face_matcher import FaceMatcher
+
+
+class ScriptedMatcher(FaceMatcher):
+    """1 段目の候補と本採点の点を決め打ちにした FaceMatcher（打ち切りの判定だけを確かめる）。"""
+
+    def __init__(self, shortlist, points, **kw):
+        super().__init__(match_threshold=24, shortlist_size=3, **kw)
+        self.shortlist = shortlist
+        self.points = points
+        self.scored = []
+
+    def _shortlist(self, bf, kp, des_l, g):
+        return self.shortlist
+
+    def _score(self, bf, des_l, g, code):
+        self.scored.append(code)
+        return self.points[code]
+
+
+FEATURES = ([], np.zeros((10, 32), dtype=np.uint8))
+
+
+def test_first_candidate_below_threshold_keeps_scoring():
+    m = ScriptedMatcher([("A", 1.0), ("B", 0.9), ("C", 0.5)], {"A": 12, "B": 31, "C": 5})
+    code, best, second = m.recognize(None, features=FEATURES)
+    assert (code, best, second) == ("B", 31, 12)
+    assert m.scored[:2] == ["A", "B"]  # 1 位（A）がしきい値未満でも打ち切らずに本人（B）まで採点する
+
+
+def test_early_exit_after_threshold_counts_skipped_estimate():
+    m = ScriptedMatcher([("A", 1.0), ("B", 0.2), ("C", 0.1)], {"A": 40, "B": 99, "C": 99})
+    code, best, second = m.recognize(None, features=FEATURES)
+    assert m.scored == ["A"]
+    assert (code, best, second) == ("A", 40, 8)  # 40 * 0.2
+    assert not m.is_unknown(code, best, second)
+
+
+def test_skipped_estimate_is_floored_below_the_overturn_limit():
+    # 40 * 0.7399 = 29.596 は上限（40 / 1.35 = 29.63）以下で打ち切り。四捨五入の 30 だと Unknown に倒れる
+    m = ScriptedMatcher([("A", 1.0), ("B", 0.7399)], {"A": 40, "B": 0})
+    code, best, second = m.recognize(None, features=FEATURES)
+    assert m.scored == ["A"]
+    assert second == 29
+    assert not m.is_unknown(code, best, second)
+
+
+def test_without_shortlist_scores_everyone():
+    m = ScriptedMatcher(None, {"A": 30, "B": 10})
+    m._gallery = m._gallery._replace(des={"A": [], "B": []})
+    code, best, second = m.recognize(None, features=FEATURES)
+    assert (code, best, second) == ("A", 30, 10)
+    assert sorted(m.scored) == ["A", "B"]
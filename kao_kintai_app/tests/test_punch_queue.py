@@ -0,0 +1,91 @@
+import json
+import sqlite3
+
+import pytest
+
+from app.infra.db.attendance_repo import AttendanceRepo
+from app.infra.storage.punch_journal import PunchJournal
+from app.services.attendance_service import AttendanceService
+from app.services.punch_queue import PunchQueue
+
+
+def _entry(uid, code="E1", kind="CLOCK_IN", ts="2026-10-19T09:00:00"):
+    return {"punch_uid": uid, "employee_code": code, "punch_type": kind, "ts": ts}
+
+
+@pytest.fixture
+def repo(tmp_path):
+    # 本番の data/db を触らないように、DB の場所だけ差し替える
+    r = AttendanceRepo.__new__(AttendanceRepo)
+    r.db_path = tmp_path / "kintai.sqlite3"
+    r._init_schema()
+    return r
+
+
+def _rows(repo):
+    with sqlite3.connect(repo.db_path) as con:
+        return con.execute("SELECT punch_uid, employee_code, punch_type FROM attendance ORDER BY id").fetchall()
+
+
+# ---------- PunchJournal ----------
+def test_journal_round_trip(tmp_path):
+    j = PunchJournal(tmp_path / "j.jsonl")
+    j.append(_entry("a"))
+    j.append(_entry("b", kind="CLOCK_OUT"))
+    j.sync()
+    assert [e["punch_uid"] for e in PunchJournal(tmp_path / "j.jsonl").read_all()] == ["a", "b"]
+    j.clear()
+    assert j.read_all() == []
+
+
+def test_journal_repairs_torn_tail(tmp_path):
+    p = tmp_path / "j.jsonl"
+    p.write_text(json.dumps(_entry("a")) + "\n" + '{"punch_uid": "b", "employee_co', encoding="utf-8")
+    j = PunchJournal(p)
+    assert [e["punch_uid"] for e in j.read_all()] == ["a"]
+
+    # 切れた行は消えているので、次の追記が前の行にくっつかない
+    j.append(_entry("c"))
+    j.close()
+    assert [e["punch_uid"] for e in PunchJournal(p).read_all()] == ["a", "c"]
+    assert p.read_text(encoding="utf-8").count("\n") == 2
+
+
+def test_journal_adds_missing_final_newline(tmp_path):
+    p = tmp_path / "j.jsonl"
+    p.write_text(json.dumps(_entry("a")), encoding="utf-8")  # 改行だけ書けずに落ちた
+    j = PunchJournal(p)
+    assert len(j.read_all()) == 1
+    j.append(_entry("b"))
+    assert [e["punch_uid"] for e in j.read_all()] == ["a", "b"]
+
+
+# ---------- PunchQueue ----------
+def test_replay_skips_punches_already_in_db(repo, tmp_path):
+    # DB に入った直後（ジャーナルを空にする前）に落ちた状態
+    repo.add_many([("a", "E1", "CLOCK_IN", "2026-10-19T09:00:00")])
+    j = PunchJournal(tmp_path / "j.jsonl")
+    j.append(_entry("a"))
+    j.append(_entry("b", kind="BREAK_START", ts="2026-10-19T12:00:00"))
+    j.append({"punch_uid": "x", "employee_code": "E1"})  # 形の合わない行は入れない
+    j.close()
+
+    q = PunchQueue(AttendanceService(repo), PunchJournal(tmp_path / "j.jsonl")).start()
+    assert q.last_state("E1") == "BREAK_START"
+    q.stop()
+
+    assert _rows(repo) == [("a", "E1", "CLOCK_IN"), ("b", "E1", "BREAK_START")]
+    assert q.pending == 0
+    assert q.journal.read_all() == []
+
+
+def test_punch_is_accepted_then_written(repo, tmp_path):
+    q = PunchQueue(AttendanceService(repo), PunchJournal(tmp_path / "j.jsonl")).start()
+    ok, _msg, allowed = q.punch("E1", "CLOCK_IN")
+    assert ok and allowed == {"BREAK_START", "CLOCK_OUT"}
+
+    ok, msg, _allowed = q.punch("E1", "CLOCK_IN")  # DB に入る前でも手元の状態で判定する
+    assert not ok and "出勤" in msg
+    q.stop()
+
+    assert [r[1:] for r in _rows(repo)] == [("E1", "CLOCK_IN")]
@@ -0,0 +1,42 @@
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from app.services.face_matcher import FaceMatcher
+from app.services.recognition_pipeline import RecognitionPipeline
+
+FACES = Path(__file__).resolve().parents[1] / "data" / "faces"
+
+# 検出ループ 1 周で一時的に確保してよい量（作業バッファを使い回していれば数 KB）
+MAX_ALLOC_KB = 64
+
+
+def _frame_with_face() -> np.ndarray:
+    face = cv2.imread(str(sorted(FACES.glob("JG0099PN/*.jpg"))[0]))
+    frame = np.full((720, 1280, 3), 128, dtype=np.uint8)
+    h, w = face.shape[:2]
+    y, x = (720 - h) // 2, (1280 - w) // 2
+    frame[y: y + h, x: x + w] = face
+    return frame
+
+
+def test_detection_loop_does_not_allocate_per_frame():
+    pipeline = RecognitionPipeline(FaceMatcher(), {"motion_gate": False})
+    frame = _frame_with_face()
+    for _ in range(10):  # 最初のフレームで作業バッファを確保する
+        pipeline.process(frame)
+    assert pipeline.face_seen
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(20):
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            pipeline.process(frame)
+            peaks.append((tracemalloc.get_traced_memory()[1] - base) / 1024.0)
+    finally:
+        tracemalloc.stop()
+    assert max(peaks) < MAX_ALLOC_KB